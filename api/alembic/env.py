@@ -1,4 +1,5 @@
 import asyncio
+import logging
 from logging.config import fileConfig
 
 from sqlalchemy import pool
@@ -8,6 +9,7 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 from alembic import context
 from app.core.settings import get_settings
 from app.db.models import Base
+from app.db.shards import configured_shards
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -28,6 +30,18 @@ target_metadata = Base.metadata
 # ... etc.
 
 settings = get_settings()
+logger = logging.getLogger("alembic.env")
+
+
+def target_shards() -> dict[str, str]:
+    """Every configured shard, or just the one named by `-x shard=<name>`."""
+    shards = configured_shards(settings)
+    only = context.get_x_argument(as_dictionary=True).get("shard")
+    if only is None:
+        return shards
+    if only not in shards:
+        raise ValueError(f"Unknown shard {only!r}; configured: {', '.join(shards)}")
+    return {only: shards[only]}
 
 
 def run_migrations_offline() -> None:
@@ -42,7 +56,8 @@ def run_migrations_offline() -> None:
     script output.
 
     """
-    url = settings.database_url
+    # SQL scripts are per database: pick one with -x shard=<name>
+    url = next(iter(target_shards().values()))
     context.configure(
         url=url,
         target_metadata=target_metadata,
@@ -68,14 +83,14 @@ def do_run_migrations(connection: Connection) -> None:
         context.run_migrations()
 
 
-async def run_async_migrations() -> None:
+async def run_async_migrations(url: str) -> None:
     """In this scenario we need to create an Engine
     and associate a connection with the context.
 
     """
 
     configuration = config.get_section(config.config_ini_section, {})
-    configuration["sqlalchemy.url"] = settings.database_url
+    configuration["sqlalchemy.url"] = url
 
     connectable = async_engine_from_config(
         configuration,
@@ -90,9 +105,11 @@ async def run_async_migrations() -> None:
 
 
 def run_migrations_online() -> None:
-    """Run migrations in 'online' mode."""
+    """Run migrations in 'online' mode, one shard after another."""
 
-    asyncio.run(run_async_migrations())
+    for name, url in target_shards().items():
+        logger.info("Migrating shard %s", name)
+        asyncio.run(run_async_migrations(url))
 
 
 if context.is_offline_mode():
@@ -0,0 +1,145 @@
+"""Partition moods and celebrations by month
+
+Revision ID: 0002_partition_moods
+Revises: 0001_init
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_partition_moods'
+down_revision: Union[str, None] = '0001_init'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Creates parent_pYYYY_MM covering [month_start, month_start + 1 month).
+# Also used by the partition maintenance job, so it must stay idempotent.
+ENSURE_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION ensure_monthly_partition(parent text, month_start date)
+RETURNS text
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    lower_bound date := date_trunc('month', month_start)::date;
+    upper_bound date := (date_trunc('month', month_start) + interval '1 month')::date;
+    partition_name text := format('%s_p%s', parent, to_char(lower_bound, 'YYYY_MM'));
+BEGIN
+    IF to_regclass(partition_name) IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+            partition_name, parent, lower_bound, upper_bound
+        );
+    END IF;
+    RETURN partition_name;
+END;
+$$;
+"""
+
+TABLES = {
+    'moods': {
+        'columns': """
+            id uuid NOT NULL,
+            user_id uuid NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            energy integer NOT NULL,
+            emotion emotion_enum NOT NULL,
+            note text,
+            created_at timestamptz NOT NULL DEFAULT now()
+        """,
+        'column_list': 'id, user_id, energy, emotion, note, created_at',
+    },
+    'celebrations': {
+        'columns': """
+            id uuid NOT NULL,
+            user_id uuid NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            step_id uuid REFERENCES steps(id) ON DELETE SET NULL,
+            kind celebration_kind_enum NOT NULL DEFAULT 'confetti',
+            created_at timestamptz NOT NULL DEFAULT now()
+        """,
+        'column_list': 'id, user_id, step_id, kind, created_at',
+    },
+}
+
+PREMAKE_MONTHS = 3
+
+
+def _partition_table(table: str, columns: str, column_list: str) -> None:
+    legacy = f'{table}_unpartitioned'
+
+    op.execute(f'ALTER TABLE {table} RENAME TO {legacy}')
+    op.execute(f'ALTER INDEX ix_{table}_user_id RENAME TO ix_{legacy}_user_id')
+    op.execute(f'ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey')
+
+    # The partition key has to be part of the primary key
+    op.execute(f"""
+        CREATE TABLE {table} (
+            {columns},
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+    # One partition per month from the oldest row up to a few months ahead
+    op.execute(f"""
+        SELECT ensure_monthly_partition('{table}', month::date)
+        FROM generate_series(
+            date_trunc(
+                'month',
+                COALESCE((SELECT min(created_at) FROM {legacy}), now())
+            ),
+            date_trunc('month', now()) + interval '{PREMAKE_MONTHS} months',
+            interval '1 month'
+        ) AS month
+    """)
+
+    op.execute(
+        f'INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {legacy}'
+    )
+    op.execute(f'DROP TABLE {legacy}')
+
+    # Serves per-user recent-history queries and prunes to recent partitions
+    op.execute(
+        f'CREATE INDEX ix_{table}_user_id_created_at '
+        f'ON {table} (user_id, created_at DESC)'
+    )
+
+
+def _unpartition_table(table: str, columns: str, column_list: str) -> None:
+    partitioned = f'{table}_partitioned'
+
+    op.execute(f'ALTER TABLE {table} RENAME TO {partitioned}')
+    op.execute(
+        f'ALTER INDEX ix_{table}_user_id_created_at '
+        f'RENAME TO ix_{partitioned}_user_id_created_at'
+    )
+    op.execute(
+        f'ALTER TABLE {partitioned} '
+        f'RENAME CONSTRAINT {table}_pkey TO {partitioned}_pkey'
+    )
+    op.execute(f"""
+        CREATE TABLE {table} (
+            {columns},
+            PRIMARY KEY (id)
+        )
+    """)
+    op.execute(
+        f'INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {partitioned}'
+    )
+    op.execute(f'DROP TABLE {partitioned} CASCADE')
+    op.execute(f'CREATE INDEX ix_{table}_user_id ON {table} (user_id)')
+
+
+def upgrade() -> None:
+    op.execute(ENSURE_PARTITION_FUNCTION)
+    for table, spec in TABLES.items():
+        _partition_table(table, spec['columns'], spec['column_list'])
+
+
+def downgrade() -> None:
+    for table, spec in TABLES.items():
+        _unpartition_table(table, spec['columns'], spec['column_list'])
+    op.execute('DROP FUNCTION IF EXISTS ensure_monthly_partition(text, date)')
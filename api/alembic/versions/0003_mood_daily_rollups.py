@@ -0,0 +1,44 @@
+"""Add mood_daily_rollups
+
+Revision ID: 0003_mood_daily_rollups
+Revises: 0002_partition_moods
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_mood_daily_rollups'
+down_revision: Union[str, None] = '0002_partition_moods'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'mood_daily_rollups',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('checkin_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('energy_sum', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('energy_min', sa.SmallInteger(), nullable=False),
+        sa.Column('energy_max', sa.SmallInteger(), nullable=False),
+        sa.Column('calm_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('anxious_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('tired_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('energized_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('low_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('mixed_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'day'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('mood_daily_rollups')
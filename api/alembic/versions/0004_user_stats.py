@@ -0,0 +1,45 @@
+"""Add user_stats
+
+Revision ID: 0004_user_stats
+Revises: 0003_mood_daily_rollups
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0004_user_stats'
+down_revision: Union[str, None] = '0003_mood_daily_rollups'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_stats',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column(
+            'completions_total', sa.Integer(), nullable=False, server_default='0'
+        ),
+        sa.Column(
+            'completions_today', sa.Integer(), nullable=False, server_default='0'
+        ),
+        sa.Column('completions_week', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_completion_day', sa.Date(), nullable=False),
+        sa.Column('week_start', sa.Date(), nullable=False),
+        sa.Column('current_streak', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('longest_streak', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_completion_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_stats')
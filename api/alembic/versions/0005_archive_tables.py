@@ -0,0 +1,95 @@
+"""Add cold archive tables for tasks and steps
+
+Revision ID: 0005_archive_tables
+Revises: 0004_user_stats
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0005_archive_tables'
+down_revision: Union[str, None] = '0004_user_stats'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    task_state_enum = postgresql.ENUM(
+        'pending',
+        'active',
+        'done',
+        'archived',
+        name='task_state_enum',
+        create_type=False,
+    )
+    step_state_enum = postgresql.ENUM(
+        'pending', 'done', name='step_state_enum', create_type=False
+    )
+
+    op.create_table(
+        'archived_tasks',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('title', sa.Text(), nullable=False),
+        sa.Column('state', task_state_enum, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            'archived_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+    op.create_table(
+        'archived_steps',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('task_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('order', sa.Integer(), nullable=False),
+        sa.Column('state', step_state_enum, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['task_id'], ['archived_tasks.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+    # History pages newest-first per user
+    op.create_index(
+        'ix_archived_tasks_user_id_archived_at',
+        'archived_tasks',
+        ['user_id', sa.text('archived_at DESC'), sa.text('id DESC')],
+    )
+    op.create_index('ix_archived_steps_task_id', 'archived_steps', ['task_id'])
+
+    # Lets the archive job find candidates without scanning live work
+    op.create_index(
+        'ix_tasks_finished_updated_at',
+        'tasks',
+        ['updated_at'],
+        postgresql_where=sa.text("state IN ('done', 'archived')"),
+    )
+
+
+def downgrade() -> None:
+    # Move archived history back into the live tables before dropping
+    op.execute(
+        'INSERT INTO tasks (id, user_id, title, state, created_at, updated_at) '
+        'SELECT id, user_id, title, state, created_at, updated_at FROM archived_tasks'
+    )
+    op.execute(
+        'INSERT INTO steps (id, task_id, content, "order", state, created_at) '
+        'SELECT id, task_id, content, "order", state, created_at FROM archived_steps'
+    )
+    op.drop_index('ix_tasks_finished_updated_at', table_name='tasks')
+    op.drop_table('archived_steps')
+    op.drop_table('archived_tasks')
@@ -0,0 +1,52 @@
+"""Add full-text search vectors on tasks and steps
+
+Revision ID: 0006_search_vectors
+Revises: 0005_archive_tables
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0006_search_vectors'
+down_revision: Union[str, None] = '0005_archive_tables'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 'simple' config: no stemming or stop words, so prefix matching behaves
+    # the same for every language users type in. Adding a stored generated
+    # column rewrites the table, hence the quiet window in the README.
+    op.execute("""
+        ALTER TABLE tasks ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('simple', title)) STORED
+    """)
+    op.execute("""
+        ALTER TABLE steps ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('simple', content)) STORED
+    """)
+
+    # btree_gin lets the task index filter by user and term in one scan.
+    # The indexes are built concurrently, so writes keep flowing meanwhile.
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gin')
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_user_id_search_vector
+            ON tasks USING gin (user_id, search_vector)
+        """)
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_steps_search_vector
+            ON steps USING gin (search_vector)
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_steps_search_vector')
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_tasks_user_id_search_vector')
+    op.execute('ALTER TABLE steps DROP COLUMN search_vector')
+    op.execute('ALTER TABLE tasks DROP COLUMN search_vector')
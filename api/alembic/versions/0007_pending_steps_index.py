@@ -0,0 +1,34 @@
+"""Add partial index on pending steps for next-step lookups
+
+Revision ID: 0007_pending_steps_index
+Revises: 0006_search_vectors
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0007_pending_steps_index'
+down_revision: Union[str, None] = '0006_search_vectors'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Only pending steps, so the index stays small as users finish work.
+    # content is left out of INCLUDE: it is unbounded text and would risk
+    # the btree tuple size limit; the one next step is fetched from the heap.
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_steps_pending_task_order
+            ON steps (task_id, "order") INCLUDE (id)
+            WHERE state = 'pending'
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_steps_pending_task_order')
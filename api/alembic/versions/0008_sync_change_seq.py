@@ -0,0 +1,143 @@
+"""Add per-row change sequence and tombstones for delta sync
+
+Revision ID: 0008_sync_change_seq
+Revises: 0007_pending_steps_index
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0008_sync_change_seq'
+down_revision: Union[str, None] = '0007_pending_steps_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SYNC_TABLES = ('tasks', 'steps', 'moods')
+
+# change_seq is the writing transaction's 64-bit id. Unlike a sequence value
+# it pairs with pg_snapshot_xmin(): every transaction below a snapshot's xmin
+# has finished, so a client that resumes from xmin misses nothing that
+# committed out of order. One statement each: asyncpg prepares what it runs.
+SYNC_FUNCTIONS = (
+    """
+CREATE OR REPLACE FUNCTION sync_set_change_seq() RETURNS trigger AS $$
+BEGIN
+    NEW.change_seq := pg_current_xact_id()::text::bigint;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+""",
+    """
+-- Step changes also stamp the parent task, so a sync finds changed steps
+-- through the user's changed tasks instead of scanning all of them
+CREATE OR REPLACE FUNCTION sync_touch_parent_task() RETURNS trigger AS $$
+DECLARE
+    seq bigint := pg_current_xact_id()::text::bigint;
+BEGIN
+    UPDATE tasks SET change_seq = seq
+    WHERE id = COALESCE(NEW.task_id, OLD.task_id) AND change_seq <> seq;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+""",
+    """
+CREATE OR REPLACE FUNCTION sync_record_tombstone() RETURNS trigger AS $$
+DECLARE
+    owner uuid;
+BEGIN
+    IF TG_TABLE_NAME = 'steps' THEN
+        -- No row when the whole task is being deleted; its tombstone covers the steps
+        SELECT user_id INTO owner FROM tasks WHERE id = OLD.task_id;
+    ELSE
+        owner := OLD.user_id;
+    END IF;
+    IF owner IS NOT NULL THEN
+        INSERT INTO sync_tombstones (user_id, entity, entity_id, change_seq)
+        VALUES (owner, TG_ARGV[0], OLD.id, pg_current_xact_id()::text::bigint);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+""",
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sync_tombstones',
+        sa.Column('id', sa.BigInteger(), sa.Identity(), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('entity', sa.Text(), nullable=False),
+        sa.Column('entity_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('change_seq', sa.BigInteger(), nullable=False),
+        sa.Column(
+            'deleted_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_sync_tombstones_user_id_change_seq',
+        'sync_tombstones',
+        ['user_id', 'change_seq'],
+    )
+    op.create_index('ix_sync_tombstones_deleted_at', 'sync_tombstones', ['deleted_at'])
+
+    # Constant default: no table rewrite; existing rows sort before any cursor
+    for table in SYNC_TABLES:
+        op.add_column(
+            table,
+            sa.Column(
+                'change_seq', sa.BigInteger(), server_default='0', nullable=False
+            ),
+        )
+
+    op.create_index('ix_tasks_user_id_change_seq', 'tasks', ['user_id', 'change_seq'])
+    op.create_index('ix_steps_task_id_change_seq', 'steps', ['task_id', 'change_seq'])
+    op.create_index('ix_moods_user_id_change_seq', 'moods', ['user_id', 'change_seq'])
+
+    for statement in SYNC_FUNCTIONS:
+        op.execute(statement)
+    for table in SYNC_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER {table}_set_change_seq BEFORE INSERT OR UPDATE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION sync_set_change_seq()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_tombstone AFTER DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION sync_record_tombstone('{table[:-1]}')
+        """)
+    op.execute("""
+        CREATE TRIGGER steps_touch_task AFTER INSERT OR UPDATE OR DELETE ON steps
+        FOR EACH ROW EXECUTE FUNCTION sync_touch_parent_task()
+    """)
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER IF EXISTS steps_touch_task ON steps')
+    for table in SYNC_TABLES:
+        op.execute(f'DROP TRIGGER IF EXISTS {table}_tombstone ON {table}')
+        op.execute(f'DROP TRIGGER IF EXISTS {table}_set_change_seq ON {table}')
+    op.execute('DROP FUNCTION IF EXISTS sync_record_tombstone()')
+    op.execute('DROP FUNCTION IF EXISTS sync_touch_parent_task()')
+    op.execute('DROP FUNCTION IF EXISTS sync_set_change_seq()')
+
+    op.drop_index('ix_moods_user_id_change_seq', table_name='moods')
+    op.drop_index('ix_steps_task_id_change_seq', table_name='steps')
+    op.drop_index('ix_tasks_user_id_change_seq', table_name='tasks')
+    for table in SYNC_TABLES:
+        op.drop_column(table, 'change_seq')
+
+    op.drop_index('ix_sync_tombstones_deleted_at', table_name='sync_tombstones')
+    op.drop_index('ix_sync_tombstones_user_id_change_seq', table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
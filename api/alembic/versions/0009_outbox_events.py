@@ -0,0 +1,56 @@
+"""Add transactional outbox for background task events
+
+Revision ID: 0009_outbox_events
+Revises: 0008_sync_change_seq
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0009_outbox_events'
+down_revision: Union[str, None] = '0008_sync_change_seq'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'outbox_events',
+        sa.Column('id', sa.BigInteger(), sa.Identity(), nullable=False),
+        sa.Column('task_name', sa.Text(), nullable=False),
+        sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column(
+            'created_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=False,
+        ),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    # The relay only ever scans unsent rows, oldest first
+    op.create_index(
+        'ix_outbox_events_unsent',
+        'outbox_events',
+        ['id'],
+        postgresql_where=sa.text('sent_at IS NULL'),
+    )
+    op.create_index(
+        'ix_outbox_events_sent_at',
+        'outbox_events',
+        ['sent_at'],
+        postgresql_where=sa.text('sent_at IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_events_sent_at', table_name='outbox_events')
+    op.drop_index('ix_outbox_events_unsent', table_name='outbox_events')
+    op.drop_table('outbox_events')
@@ -0,0 +1,63 @@
+"""Add job watermarks and a created_at index for celebration digests
+
+Revision ID: 0010_job_watermarks
+Revises: 0009_outbox_events
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0010_job_watermarks'
+down_revision: Union[str, None] = '0009_outbox_events'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX = 'ix_celebrations_created_at'
+
+
+def upgrade() -> None:
+    op.create_table(
+        'job_watermarks',
+        sa.Column('name', sa.Text(), nullable=False),
+        sa.Column('watermark', sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            'updated_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+    # The digest scans every user's celebrations in a time window, which
+    # (user_id, created_at) can't serve. Build the index per partition without
+    # blocking writes, then attach: the parent index only becomes valid once
+    # every partition has one, and new partitions inherit it.
+    op.execute(f'CREATE INDEX IF NOT EXISTS {INDEX} ON ONLY celebrations (created_at)')
+    partitions = [row[0] for row in op.get_bind().execute(sa.text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = 'celebrations'
+    """))]
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "ix_{partition}_created_at" '
+                f'ON "{partition}" (created_at)'
+            )
+    for partition in partitions:
+        op.execute(f'ALTER INDEX {INDEX} ATTACH PARTITION "ix_{partition}_created_at"')
+
+
+def downgrade() -> None:
+    # Dropping the parent index drops the attached partition indexes with it
+    op.execute(f'DROP INDEX IF EXISTS {INDEX}')
+    op.drop_table('job_watermarks')
@@ -0,0 +1,51 @@
+"""Index celebrations.step_id for the ON DELETE SET NULL from steps
+
+Revision ID: 0011_celebrations_step_id
+Revises: 0010_job_watermarks
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0011_celebrations_step_id'
+down_revision: Union[str, None] = '0010_job_watermarks'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX = 'ix_celebrations_step_id'
+
+
+def upgrade() -> None:
+    # Deleting steps (archival, task deletes) sets celebrations.step_id to
+    # NULL; without an index each deleted step scans every partition.
+    # Partial: most celebrations outlive their step. Built per partition
+    # and attached, as in 0010.
+    op.execute(
+        f'CREATE INDEX IF NOT EXISTS {INDEX} ON ONLY celebrations (step_id) '
+        'WHERE step_id IS NOT NULL'
+    )
+    partitions = [row[0] for row in op.get_bind().execute(sa.text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = 'celebrations'
+    """))]
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "ix_{partition}_step_id" '
+                f'ON "{partition}" (step_id) WHERE step_id IS NOT NULL'
+            )
+    for partition in partitions:
+        op.execute(f'ALTER INDEX {INDEX} ATTACH PARTITION "ix_{partition}_step_id"')
+
+
+def downgrade() -> None:
+    op.execute(f'DROP INDEX IF EXISTS {INDEX}')
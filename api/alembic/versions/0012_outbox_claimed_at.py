@@ -0,0 +1,31 @@
+"""Add outbox_events.claimed_at so the relay publishes without holding locks
+
+Revision ID: 0012_outbox_claimed_at
+Revises: 0011_celebrations_step_id
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0012_outbox_claimed_at'
+down_revision: Union[str, None] = '0011_celebrations_step_id'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Nullable, no default: a metadata-only change on a busy table
+    op.add_column(
+        'outbox_events',
+        sa.Column('claimed_at', sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('outbox_events', 'claimed_at')
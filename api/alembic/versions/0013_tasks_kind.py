@@ -0,0 +1,62 @@
+"""Add tasks.kind to mark mood micro-tasks for archival
+
+Revision ID: 0013_tasks_kind
+Revises: 0012_outbox_claimed_at
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0013_tasks_kind'
+down_revision: Union[str, None] = '0012_outbox_claimed_at'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MOOD_TASK_TITLE = 'Gentle: mood-driven micro-step'
+
+
+def upgrade() -> None:
+    task_kind_enum = postgresql.ENUM('user', 'mood', name='task_kind_enum')
+    task_kind_enum.create(op.get_bind(), checkfirst=True)
+
+    # Constant default: a metadata-only change, no table rewrite
+    op.add_column(
+        'tasks',
+        sa.Column(
+            'kind',
+            postgresql.ENUM(name='task_kind_enum', create_type=False),
+            server_default='user',
+            nullable=False,
+        ),
+    )
+    # Check-ins so far are only recognisable by title; only the open ones
+    # matter, finished ones are archived with the rest
+    op.execute(
+        sa.text(
+            "UPDATE tasks SET kind = 'mood' "
+            "WHERE state = 'active' AND title = :title"
+        ).bindparams(title=MOOD_TASK_TITLE)
+    )
+
+    # Abandoned check-ins for the archive job, the counterpart of
+    # ix_tasks_finished_updated_at
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_mood_active_updated_at
+            ON tasks (updated_at)
+            WHERE state = 'active' AND kind = 'mood'
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_tasks_mood_active_updated_at')
+    op.drop_column('tasks', 'kind')
+    op.execute('DROP TYPE IF EXISTS task_kind_enum')
@@ -0,0 +1,52 @@
+"""Add full-text search vectors on the archive tables
+
+Revision ID: 0014_archive_search_vectors
+Revises: 0013_tasks_kind
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0014_archive_search_vectors'
+down_revision: Union[str, None] = '0013_tasks_kind'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Same vectors as the live tables (0006), so search keeps finding tasks
+    # once they are archived. Only the archive job writes these tables; the
+    # rewrite blocks it, not requests.
+    op.execute("""
+        ALTER TABLE archived_tasks ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('simple', title)) STORED
+    """)
+    op.execute("""
+        ALTER TABLE archived_steps ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('simple', content)) STORED
+    """)
+
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS
+                ix_archived_tasks_user_id_search_vector
+            ON archived_tasks USING gin (user_id, search_vector)
+        """)
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_archived_steps_search_vector
+            ON archived_steps USING gin (search_vector)
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_archived_steps_search_vector')
+        op.execute(
+            'DROP INDEX CONCURRENTLY IF EXISTS ix_archived_tasks_user_id_search_vector'
+        )
+    op.execute('ALTER TABLE archived_steps DROP COLUMN search_vector')
+    op.execute('ALTER TABLE archived_tasks DROP COLUMN search_vector')
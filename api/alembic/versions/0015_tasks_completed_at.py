@@ -0,0 +1,36 @@
+"""Add tasks.completed_at, stamped when a task's last step is completed
+
+Revision ID: 0015_tasks_completed_at
+Revises: 0014_archive_search_vectors
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0015_tasks_completed_at'
+down_revision: Union[str, None] = '0014_archive_search_vectors'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Nullable, no default: a metadata-only change
+    op.add_column(
+        'tasks', sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True)
+    )
+    # Only recent completions matter to the digest window in flight; this
+    # reads ix_tasks_finished_updated_at rather than every done task
+    op.execute("""
+        UPDATE tasks SET completed_at = updated_at
+        WHERE state = 'done' AND updated_at > now() - interval '1 day'
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('tasks', 'completed_at')
@@ -0,0 +1,122 @@
+import logging
+
+from celery import Celery, signals
+from celery.schedules import crontab
+from kombu import Exchange, Queue
+from prometheus_client import start_http_server
+
+from app.core.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# User-facing work (celebrations and the outbox relay that feeds them) must
+# never wait behind maintenance sweeps, so each gets its own queue and workers
+INTERACTIVE_QUEUE = "interactive"
+BULK_QUEUE = "bulk"
+
+# Redis emulates priorities with one list per step; 0 is served first
+PRIORITY_STEPS = list(range(10))
+HIGH_PRIORITY = 0
+DEFAULT_PRIORITY = 5
+LOW_PRIORITY = 9
+
+celery_app = Celery(
+    "gentle",
+    broker=settings.redis_url,
+    backend=settings.redis_url,
+    include=[
+        "app.tasks.celebrations",
+        "app.tasks.partitions",
+        "app.tasks.rollups",
+        "app.tasks.archive",
+        "app.tasks.sync",
+        "app.tasks.outbox",
+        "app.tasks.digest",
+    ],
+)
+
+celery_app.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    result_serializer="json",
+    timezone="UTC",
+    enable_utc=True,
+    # Every task is fire-and-forget; nothing reads results, so don't write a
+    # celery-task-meta key per run. A task that needs one opts back in.
+    task_ignore_result=True,
+    task_store_errors_even_if_ignored=False,
+    result_expires=3600,
+    task_queues=[
+        Queue(
+            INTERACTIVE_QUEUE,
+            Exchange(INTERACTIVE_QUEUE),
+            routing_key=INTERACTIVE_QUEUE,
+        ),
+        Queue(BULK_QUEUE, Exchange(BULK_QUEUE), routing_key=BULK_QUEUE),
+    ],
+    task_default_queue=BULK_QUEUE,
+    task_default_priority=DEFAULT_PRIORITY,
+    task_routes={
+        "app.tasks.outbox.*": {"queue": INTERACTIVE_QUEUE, "priority": HIGH_PRIORITY},
+        "app.tasks.celebrations.*": {
+            "queue": INTERACTIVE_QUEUE,
+            "priority": DEFAULT_PRIORITY,
+        },
+        "app.tasks.partitions.*": {"queue": BULK_QUEUE, "priority": LOW_PRIORITY},
+        "app.tasks.rollups.*": {"queue": BULK_QUEUE, "priority": LOW_PRIORITY},
+        "app.tasks.archive.*": {"queue": BULK_QUEUE, "priority": LOW_PRIORITY},
+        "app.tasks.sync.*": {"queue": BULK_QUEUE, "priority": LOW_PRIORITY},
+        "app.tasks.digest.*": {"queue": BULK_QUEUE, "priority": DEFAULT_PRIORITY},
+    },
+    broker_transport_options={
+        "priority_steps": PRIORITY_STEPS,
+        "sep": ":",
+        "queue_order_strategy": "priority",
+        # Unacked messages are redelivered after this; must exceed the
+        # longest task now that acks are late
+        "visibility_timeout": 3600,
+    },
+    # Ack after the task finishes so a killed worker's message is redelivered;
+    # every task here is idempotent (outbox rows, SKIP LOCKED batches)
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    # Per worker process; the bulk worker overrides this with 1 on the command
+    # line so a long sweep doesn't hold messages other processes could run
+    worker_prefetch_multiplier=settings.celery_prefetch_multiplier,
+    broker_connection_retry_on_startup=True,
+    beat_schedule={
+        "relay-outbox": {
+            "task": "app.tasks.outbox.relay_outbox",
+            "schedule": settings.outbox_relay_interval_seconds,
+            # A missed tick is covered by the next one; don't pile them up
+            "options": {"expires": settings.outbox_relay_interval_seconds * 5},
+        },
+        "send-celebration-digests": {
+            "task": "app.tasks.digest.send_celebration_digests",
+            "schedule": settings.digest_interval_seconds,
+        },
+        "maintain-partitions": {
+            "task": "app.tasks.partitions.maintain_partitions",
+            "schedule": crontab(hour=3, minute=15),
+        },
+        "archive-stale-tasks": {
+            "task": "app.tasks.archive.archive_stale_tasks",
+            "schedule": crontab(hour=4, minute=0),
+        },
+        "prune-sync-tombstones": {
+            "task": "app.tasks.sync.prune_sync_tombstones",
+            "schedule": crontab(hour=4, minute=30),
+        },
+    },
+)
+
+
+@signals.worker_ready.connect
+def start_metrics_server(**kwargs) -> None:
+    # The API's /metrics can't see worker-side timings (outbox relay, task
+    # enqueues), so a worker serves its own. Prefork children keep separate
+    # registries and aren't included; the interactive worker uses threads.
+    if settings.celery_metrics_port:
+        start_http_server(settings.celery_metrics_port)
+        logger.info("Serving worker metrics on port %d", settings.celery_metrics_port)
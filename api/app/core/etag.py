@@ -0,0 +1,38 @@
+import hashlib
+
+from fastapi import Response
+
+
+def make_etag(*parts: object) -> str:
+    """Build a strong ETag from a change watermark (ids, timestamps, counts)."""
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    return '"' + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check an If-None-Match header value against the current ETag."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        # Weak comparison is allowed for If-None-Match (RFC 9110 13.1.2)
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def set_etag_headers(response: Response, etag: str) -> None:
+    """Attach the ETag and ask clients to always revalidate it."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+
+
+def not_modified(etag: str) -> Response:
+    """Return an empty 304 response carrying the current validators."""
+    response = Response(status_code=304)
+    set_etag_headers(response, etag)
+    return response
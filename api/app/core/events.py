@@ -0,0 +1,233 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import AsyncIterator
+
+import orjson
+import redis
+
+from app.core.redis import get_redis
+from app.core.responses import json_default
+from app.core.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# One pub/sub channel per user; every API process holding a stream for that
+# user subscribes to it on its single shared connection
+CHANNEL_PREFIX = "gentle:events:"
+# Subscribed for the hub's lifetime so the connection exists before any user
+CONTROL_CHANNEL = f"{CHANNEL_PREFIX}_hub"
+
+RETRY_MIN_SECONDS = 0.5
+RETRY_MAX_SECONDS = 30.0
+
+# publish_event runs inline after a write commits; a stalled Redis may cost
+# the response this much, never more
+PUBLISH_TIMEOUT_SECONDS = 0.2
+
+# SSE frames that aren't user events. A comment keeps proxies from closing
+# idle streams; resync tells the client it missed events and should refetch
+# (e.g. GET /v1/sync) because its buffer overflowed or Redis reconnected.
+PING_FRAME = b": ping\n\n"
+RESYNC_FRAME = b'data: {"type":"resync"}\n\n'
+CLOSE = None
+
+# Event types. Payloads carry ids only; clients refetch what they show.
+TASK_UPDATED = "task.updated"
+BREAKDOWN_FINISHED = "breakdown.finished"
+STEPS_COMPLETED = "steps.completed"
+STEPS_UPDATED = "steps.updated"
+CELEBRATION_READY = "celebration.ready"
+SYNC_CHANGED = "sync.changed"
+
+_sync_client: redis.Redis | None = None
+
+
+def event_channel(user_id: str) -> str:
+    return f"{CHANNEL_PREFIX}{user_id}"
+
+
+def encode_event(event_type: str, data: dict) -> bytes:
+    return orjson.dumps(
+        {"type": event_type, "data": data, "at": datetime.now(timezone.utc)},
+        default=json_default,
+    )
+
+
+async def publish_event(user_id: str, event_type: str, **data) -> None:
+    """Best-effort push to the user's open streams; call after committing."""
+    try:
+        await asyncio.wait_for(
+            get_redis().publish(
+                event_channel(str(user_id)), encode_event(event_type, data)
+            ),
+            PUBLISH_TIMEOUT_SECONDS,
+        )
+    except Exception as e:
+        # Events are hints to refetch; losing one must not fail the write
+        logger.warning("Could not publish %s event: %s", event_type, e)
+
+
+def publish_event_sync(user_id: str, event_type: str, **data) -> None:
+    """publish_event for Celery tasks, which have no event loop."""
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = redis.Redis.from_url(
+            settings.redis_url,
+            socket_timeout=PUBLISH_TIMEOUT_SECONDS,
+            socket_connect_timeout=PUBLISH_TIMEOUT_SECONDS,
+        )
+    try:
+        _sync_client.publish(
+            event_channel(str(user_id)), encode_event(event_type, data)
+        )
+    except Exception as e:
+        logger.warning("Could not publish %s event: %s", event_type, e)
+
+
+class EventHub:
+    """Fans Redis pub/sub messages out to this process's event streams.
+
+    One pub/sub connection per process, subscribed only to the channels of
+    users with a stream open here. Each stream gets a small bounded queue of
+    ready-to-send SSE frames, so an idle stream costs a queue and a waiting
+    coroutine: no timers, sockets or Redis state of its own.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = settings.events_queue_size,
+        heartbeat_seconds: float = settings.events_heartbeat_seconds,
+        max_connections: int = settings.events_max_connections,
+    ):
+        self.queue_size = queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self.max_connections = max_connections
+        self._streams: dict[str, set[asyncio.Queue]] = {}
+        self._connections = 0
+        self._pubsub = None
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def connections(self) -> int:
+        return self._connections
+
+    def is_full(self) -> bool:
+        return self._connections >= self.max_connections
+
+    async def start(self) -> None:
+        self._pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+        self._tasks = [
+            asyncio.create_task(self._read_loop(), name="events-reader"),
+            asyncio.create_task(self._heartbeat_loop(), name="events-heartbeat"),
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self._broadcast(CLOSE)
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: str) -> AsyncIterator[asyncio.Queue]:
+        """A queue of SSE frames for user_id, open until the context exits."""
+        if self._pubsub is None:
+            raise RuntimeError("EventHub is not started")
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        streams = self._streams.setdefault(user_id, set())
+        first = not streams
+        streams.add(queue)
+        self._connections += 1
+        try:
+            if first:
+                await self._pubsub.subscribe(event_channel(user_id))
+            yield queue
+        finally:
+            self._connections -= 1
+            streams.discard(queue)
+            if not streams and self._streams.get(user_id) is streams:
+                del self._streams[user_id]
+                try:
+                    await self._pubsub.unsubscribe(event_channel(user_id))
+                except Exception as e:
+                    # A stale subscription only costs ignored messages
+                    logger.warning("Could not unsubscribe from user events: %s", e)
+
+    def _deliver(self, queue: asyncio.Queue, frame: bytes | None) -> None:
+        try:
+            queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            if frame is PING_FRAME:
+                return
+            # The client isn't keeping up: drop its backlog and have it refetch
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC_FRAME if frame is not CLOSE else CLOSE)
+
+    def _broadcast(self, frame: bytes | None) -> None:
+        for streams in self._streams.values():
+            for queue in streams:
+                self._deliver(queue, frame)
+
+    async def _read_loop(self) -> None:
+        failures = 0
+        while True:
+            try:
+                if self._pubsub.connection is None:
+                    await self._pubsub.subscribe(CONTROL_CHANNEL)
+                message = await self._pubsub.get_message(timeout=None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures += 1
+                logger.warning("Event subscriber error (%d in a row): %s", failures, e)
+                await asyncio.sleep(
+                    min(RETRY_MAX_SECONDS, RETRY_MIN_SECONDS * 2 ** (failures - 1))
+                )
+                continue
+
+            if failures:
+                # Reconnected (redis-py resubscribes every channel); anything
+                # published meanwhile is gone
+                failures = 0
+                self._broadcast(RESYNC_FRAME)
+            if message is None or message.get("type") != "message":
+                continue
+
+            user_id = message["channel"][len(CHANNEL_PREFIX) :]
+            streams = self._streams.get(user_id)
+            if streams:
+                # Framed once, shared by every tab the user has open
+                frame = b"data: " + message["data"].encode("utf-8") + b"\n\n"
+                for queue in streams:
+                    self._deliver(queue, frame)
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            self._broadcast(PING_FRAME)
+
+
+event_hub = EventHub()
+
+
+async def sse_stream(user_id: str, hub: EventHub = event_hub) -> AsyncIterator[bytes]:
+    """SSE body for one client: a ready event, then the user's events as they arrive."""
+    async with hub.subscribe(user_id) as queue:
+        # Reconnect after 5s if dropped; the client should refetch on ready
+        yield b'retry: 5000\ndata: {"type":"ready"}\n\n'
+        while True:
+            frame = await queue.get()
+            if frame is CLOSE:
+                return
+            yield frame
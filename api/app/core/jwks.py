@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import random
+import time
+
+import httpx
+from jose import jwk
+from jose.backends.base import Key
+from jose.exceptions import JWKError
+
+from app.core.metrics import JWKS_REFRESHES, JWKSCollector, register_local_collector
+from app.core.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Backoff bounds while the IdP is failing; stale keys are served meanwhile
+RETRY_MIN_SECONDS = 5.0
+RETRY_MAX_SECONDS = 300.0
+
+
+class JWKSUnavailable(Exception):
+    """No signing keys have ever been loaded and the IdP can't be reached."""
+
+
+class JWKSManager:
+    """Signing keys indexed by kid, kept fresh off the request path.
+
+    Keys are parsed into jose Key objects once per fetch, so verification
+    never rebuilds them from the JWK dict.
+
+    - A background task refetches the JWKS every refresh_seconds (with
+      jitter), so steady-state lookups are a dict read.
+    - An unknown kid (key rotation) triggers one shared refetch; concurrent
+      callers await the same fetch, and at most one such refetch happens per
+      unknown_kid_cooldown so random kids can't be used to hammer the IdP.
+    - A failed refresh keeps the previous keys.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        refresh_seconds: float = settings.jwks_refresh_seconds,
+        unknown_kid_cooldown: float = settings.jwks_unknown_kid_cooldown_seconds,
+        timeout: float = settings.jwks_timeout_seconds,
+    ):
+        self.url = url
+        self.refresh_seconds = refresh_seconds
+        self.unknown_kid_cooldown = unknown_kid_cooldown
+        self.timeout = timeout
+        self._keys: dict[str, Key] = {}
+        self._fetched_at: float | None = None
+        self._last_unknown_kid_refresh = float("-inf")
+        self._inflight: asyncio.Future | None = None
+        self._client: httpx.AsyncClient | None = None
+        self._refresher: asyncio.Task | None = None
+
+    @property
+    def keys(self) -> dict[str, Key]:
+        return self._keys
+
+    @property
+    def fetched_at(self) -> float | None:
+        """time.monotonic() of the last successful fetch."""
+        return self._fetched_at
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        return self._client
+
+    async def start(self) -> None:
+        """Load keys once and start the background refresher (app startup)."""
+        try:
+            await self.refresh()
+        except Exception as e:
+            # Don't block startup on the IdP; the refresher keeps trying
+            logger.warning("Initial JWKS fetch failed: %s", e)
+        self._refresher = asyncio.create_task(self._refresh_loop(), name="jwks-refresh")
+
+    async def stop(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get_key(self, kid: str) -> Key | None:
+        """The public key for kid, or None if the IdP doesn't (yet) publish it."""
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+
+        if not self._keys:
+            # Nothing loaded yet (cold start or IdP down since boot)
+            try:
+                await self.refresh()
+            except Exception as e:
+                raise JWKSUnavailable(str(e)) from e
+            return self._keys.get(kid)
+
+        now = time.monotonic()
+        if now - self._last_unknown_kid_refresh < self.unknown_kid_cooldown:
+            return None
+        self._last_unknown_kid_refresh = now
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning("JWKS refresh for unknown kid failed: %s", e)
+        return self._keys.get(kid)
+
+    async def refresh(self) -> None:
+        """Refetch the JWKS; concurrent callers share one request."""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._fetch())
+        # shield: one caller being cancelled must not cancel the others' fetch
+        await asyncio.shield(self._inflight)
+
+    async def _fetch(self) -> None:
+        try:
+            await self._load()
+        except Exception:
+            JWKS_REFRESHES.labels("error").inc()
+            raise
+        JWKS_REFRESHES.labels("ok").inc()
+
+    async def _load(self) -> None:
+        response = await self._http().get(self.url)
+        response.raise_for_status()
+        keys: dict[str, Key] = {}
+        for key in response.json().get("keys", []):
+            kid = key.get("kid")
+            if not kid or key.get("use", "sig") != "sig":
+                continue
+            try:
+                keys[kid] = jwk.construct(key, algorithm=key.get("alg", "RS256"))
+            except JWKError as e:
+                logger.warning("Skipping unusable JWKS key %s: %s", kid, e)
+        if not keys:
+            raise ValueError("JWKS document contains no signing keys")
+        # Swap the whole mapping so readers never see a half-built one
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+        logger.info("Loaded %d JWKS keys", len(keys))
+
+    async def _refresh_loop(self) -> None:
+        delay = self._next_refresh_delay()
+        failures = 0
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self.refresh()
+                failures = 0
+                delay = self._next_refresh_delay()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures += 1
+                delay = min(RETRY_MAX_SECONDS, RETRY_MIN_SECONDS * 2 ** (failures - 1))
+                logger.warning(
+                    "JWKS refresh failed (%d in a row), serving cached keys: %s",
+                    failures,
+                    e,
+                )
+
+    def _next_refresh_delay(self) -> float:
+        if self._fetched_at is None:
+            return RETRY_MIN_SECONDS
+        # Jitter spreads refreshes from many workers
+        return self.refresh_seconds * random.uniform(0.8, 1.0)
+
+
+jwks_manager = JWKSManager(settings.supabase_jwks_url)
+register_local_collector(JWKSCollector(jwks_manager))
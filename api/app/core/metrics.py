@@ -0,0 +1,382 @@
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy.pool import Pool
+
+from app.core.timing import RequestTimings, check_query_budget, request_timings
+
+# Set (before prometheus_client is imported) when the API runs several
+# worker processes; each then writes its samples to files here and /metrics
+# aggregates them. prometheus_client reads it itself.
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+# Collectors that read this process's state at scrape time. Multiprocess
+# mode can't aggregate them, so they report the process answering the scrape.
+LOCAL_COLLECTORS: list = []
+
+
+def register_local_collector(collector):
+    REGISTRY.register(collector)
+    LOCAL_COLLECTORS.append(collector)
+    return collector
+
+
+class CallbackGauge:
+    """A gauge read from a callback at scrape time.
+
+    Gauge.set_function does the same but is silently ignored in
+    multiprocess mode.
+    """
+
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        self._callback = None
+
+    def set_function(self, callback) -> None:
+        self._callback = callback
+
+    def collect(self):
+        if self._callback is not None:
+            gauge = GaugeMetricFamily(self.name, self.documentation)
+            gauge.add_metric([], self._callback())
+            yield gauge
+
+
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.075,
+    0.1,
+    0.25,
+    0.5,
+    0.75,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "gentle_http_request_duration_seconds",
+    "Time from receiving a request to finishing its response, by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "gentle_http_requests_in_flight",
+    "Requests currently being served (the route is only known once routing ran)",
+    ["method"],
+    # Summed over live worker processes in multiprocess mode
+    multiprocess_mode="livesum",
+)
+
+# Counters rather than histograms keep the per-request cost to two
+# increments; divide by gentle_http_request_duration_seconds_count for the
+# per-request average
+DB_REQUEST_QUERIES = Counter(
+    "gentle_db_request_queries_total",
+    "SQL statements executed while serving requests",
+    ["method", "route"],
+)
+
+DB_REQUEST_QUERY_SECONDS = Counter(
+    "gentle_db_request_query_seconds_total",
+    "Time spent executing SQL while serving requests",
+    ["method", "route"],
+)
+
+AI_REQUEST_DURATION = Histogram(
+    "gentle_ai_request_duration_seconds",
+    "OpenAI chat completion latency",
+    ["operation", "outcome"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0),
+)
+
+AI_TOKENS = Counter(
+    "gentle_ai_tokens_total",
+    "Tokens reported by OpenAI usage",
+    ["operation", "kind"],
+)
+
+AI_FALLBACKS = Counter(
+    "gentle_ai_fallbacks_total",
+    "AI calls answered with the deterministic fallback instead of the model",
+    ["operation", "reason"],
+)
+
+AUTH_TOKEN_CACHE = Counter(
+    "gentle_auth_token_cache_total",
+    "Bearer token lookups in the verified-token cache",
+    ["result"],
+)
+
+AUTH_VERIFIED_TOKENS_CACHED = register_local_collector(
+    CallbackGauge(
+        "gentle_auth_verified_tokens_cached",
+        "Entries in the verified-token cache",
+    )
+)
+
+JWKS_REFRESHES = Counter(
+    "gentle_jwks_refreshes_total",
+    "JWKS fetches from the identity provider",
+    ["outcome"],
+)
+
+CELERY_ENQUEUE_DURATION = Histogram(
+    "gentle_celery_enqueue_duration_seconds",
+    "Time for send_task to hand one message to the broker",
+    ["task"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+
+OUTBOX_PUBLISH_DELAY = Histogram(
+    "gentle_outbox_publish_delay_seconds",
+    "Time from an outbox row being written to its task being published",
+    ["task"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "gentle_db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled database connection",
+    ["pool"],
+    buckets=(
+        0.0005,
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+        10.0,
+        30.0,
+    ),
+)
+
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "gentle_db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT",
+    ["pool"],
+)
+
+
+class PoolCollector:
+    """Report pool occupancy at scrape time instead of on every checkout."""
+
+    def __init__(self) -> None:
+        self._pools: dict[str, Pool] = {}
+
+    def register(self, name: str, pool: Pool) -> None:
+        self._pools[name] = pool
+
+    def collect(self):
+        size = GaugeMetricFamily(
+            "gentle_db_pool_size", "Configured pool size", labels=["pool"]
+        )
+        in_use = GaugeMetricFamily(
+            "gentle_db_pool_checked_out",
+            "Connections currently checked out",
+            labels=["pool"],
+        )
+        idle = GaugeMetricFamily(
+            "gentle_db_pool_checked_in",
+            "Idle connections held by the pool",
+            labels=["pool"],
+        )
+        overflow = GaugeMetricFamily(
+            "gentle_db_pool_overflow",
+            "Connections open beyond the pool size",
+            labels=["pool"],
+        )
+
+        for name, pool in self._pools.items():
+            # NullPool (PgBouncer mode) keeps no state worth reporting
+            if not hasattr(pool, "checkedout"):
+                continue
+            size.add_metric([name], pool.size())
+            in_use.add_metric([name], pool.checkedout())
+            idle.add_metric([name], pool.checkedin())
+            overflow.add_metric([name], max(pool.overflow(), 0))
+
+        yield size
+        yield in_use
+        yield idle
+        yield overflow
+
+
+pool_collector = register_local_collector(PoolCollector())
+
+
+def reset_multiproc_dir() -> None:
+    """Delete every worker's sample files; call once before workers start.
+
+    Left in place, files of processes from before a restart keep adding
+    their old counts, and their live gauges, to every scrape.
+    """
+    directory = os.environ.get(MULTIPROC_DIR_ENV)
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    for name in os.listdir(directory):
+        if name.endswith(".db"):
+            os.remove(os.path.join(directory, name))
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drop a worker's live gauges (in-flight requests) once it has exited."""
+    if os.environ.get(MULTIPROC_DIR_ENV):
+        multiprocess.mark_process_dead(pid)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Serialize metrics in the Prometheus text format.
+
+    With PROMETHEUS_MULTIPROC_DIR set, counters and histograms are summed
+    over every worker process; otherwise the default registry is this
+    process's alone.
+    """
+    if os.environ.get(MULTIPROC_DIR_ENV):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        for collector in LOCAL_COLLECTORS:
+            registry.register(collector)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+class JWKSCollector:
+    """Report the JWKS cache at scrape time."""
+
+    def __init__(self, manager) -> None:
+        self._manager = manager
+
+    def collect(self):
+        keys = GaugeMetricFamily("gentle_jwks_keys", "Signing keys currently cached")
+        keys.add_metric([], len(self._manager.keys))
+        yield keys
+
+        # Absent until the first successful fetch
+        fetched_at = self._manager.fetched_at
+        if fetched_at is not None:
+            age = GaugeMetricFamily(
+                "gentle_jwks_age_seconds", "Seconds since the JWKS was last fetched"
+            )
+            age.add_metric([], time.monotonic() - fetched_at)
+            yield age
+
+
+def route_template(scope) -> str:
+    """Full path template of the matched route, e.g. /v1/tasks/{task_id}."""
+    # FastAPI releases that keep included routers nested put the router's
+    # own (unprefixed) route in scope["route"]; the effective route context
+    # carries the full template there
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    path = getattr(context, "path_format", None) or getattr(
+        scope.get("route"), "path", None
+    )
+    return path or "unmatched"
+
+
+class MetricsMiddleware:
+    """Record latency, in-flight requests and SQL per request, by route template.
+
+    Plain ASGI rather than BaseHTTPMiddleware, so there's no extra task or
+    response buffering per request. Labelled children are cached in dicts
+    owned by the event loop, which skips prometheus_client's per-metric
+    lock in labels() on the hot path. With server_timing, responses carry
+    the request's db/ai/auth totals in a Server-Timing header, and requests
+    over their endpoint's query_budget are reported.
+    """
+
+    def __init__(self, app, server_timing: bool = False) -> None:
+        self.app = app
+        self.server_timing = server_timing
+        self._in_flight: dict[str, Gauge] = {}
+        self._route_children: dict[tuple[str, str], tuple[Counter, Counter]] = {}
+        self._duration_children: dict[tuple[str, str, int], Histogram] = {}
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        in_flight = self._in_flight.get(method)
+        if in_flight is None:
+            in_flight = self._in_flight[method] = HTTP_REQUESTS_IN_FLIGHT.labels(method)
+
+        status = 500
+        timings = RequestTimings()
+        token = request_timings.set(timings)
+
+        async def send_wrapper(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    # Streaming responses only report what ran before headers
+                    message["headers"] = [
+                        *message.get("headers", ()),
+                        (b"server-timing", timings.server_timing()),
+                    ]
+            await send(message)
+
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_flight.dec()
+            request_timings.reset(token)
+            # Templates, not raw paths, keep label cardinality bounded
+            route = route_template(scope)
+            self._observe(method, route, status, elapsed, timings)
+            check_query_budget(scope.get("endpoint"), route, timings)
+
+    def _observe(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        elapsed: float,
+        timings: RequestTimings,
+    ) -> None:
+        duration = self._duration_children.get((method, route, status))
+        if duration is None:
+            duration = self._duration_children[(method, route, status)] = (
+                HTTP_REQUEST_DURATION.labels(method, route, str(status))
+            )
+        duration.observe(elapsed)
+
+        children = self._route_children.get((method, route))
+        if children is None:
+            children = self._route_children[(method, route)] = (
+                DB_REQUEST_QUERIES.labels(method, route),
+                DB_REQUEST_QUERY_SECONDS.labels(method, route),
+            )
+        if timings.db_queries:
+            children[0].inc(timings.db_queries)
+            children[1].inc(timings.db_seconds)
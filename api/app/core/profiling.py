@@ -0,0 +1,189 @@
+import asyncio
+import hmac
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+
+from app.core.metrics import route_template
+from app.core.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+
+    PYINSTRUMENT_AVAILABLE = True
+except ImportError:
+    PYINSTRUMENT_AVAILABLE = False
+
+PROFILE_HEADER = b"x-gentle-profile"
+PROFILE_ID_HEADER = b"x-gentle-profile-id"
+PROFILE_SUFFIX = ".speedscope.json"
+# Scrapes and probes are never the slow route being looked for. Streams
+# stay open for minutes to hours: the profile would grow for as long as
+# the connection lives, and hold a PROFILING_MAX_CONCURRENT slot throughout.
+SKIP_PATHS = ("/metrics", "/healthz", "/v1/events", "/v1/export")
+
+
+class ProfilingMiddleware:
+    """Sample-profile individual requests into speedscope files.
+
+    A request is profiled when it carries X-Gentle-Profile: <PROFILING_TOKEN>
+    or wins the PROFILING_SAMPLE_RATE draw. pyinstrument's async mode
+    follows the request's own task across awaits (time spent waiting shows
+    as <await>) and ignores other requests interleaved on the loop.
+
+    Files land in PROFILING_DIR, one per request, named by time and route;
+    speedscope.app and other flamegraph viewers open them as-is. Profiles
+    over PROFILING_MAX_BYTES are dropped, and only the newest
+    PROFILING_MAX_FILES are kept. Add it only when enabled (see
+    profiling_enabled), so disabled means not in the stack at all.
+    """
+
+    def __init__(self, app, settings: Settings) -> None:
+        self.app = app
+        self.sample_rate = settings.profiling_sample_rate
+        self.token = (
+            settings.profiling_token.encode() if settings.profiling_token else None
+        )
+        self.interval = settings.profiling_interval_ms / 1000
+        self.directory = settings.profiling_dir
+        self.max_files = settings.profiling_max_files
+        self.max_bytes = settings.profiling_max_bytes
+        self.max_concurrent = settings.profiling_max_concurrent
+        self._active = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _trigger(self, scope) -> str | None:
+        if self.token is not None:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    return "header" if hmac.compare_digest(value, self.token) else None
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sample"
+        return None
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"] in SKIP_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        trigger = self._trigger(scope)
+        # Bounded so sampling can't pile profilers onto a busy process
+        if trigger is None or self._active >= self.max_concurrent:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = (
+            f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        )
+        status = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if trigger == "header":
+                    message["headers"] = [
+                        *message.get("headers", ()),
+                        (PROFILE_ID_HEADER, profile_id.encode()),
+                    ]
+            await send(message)
+
+        self._active += 1
+        profiler = Profiler(interval=self.interval, async_mode="enabled")
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            elapsed = time.perf_counter() - start
+            self._active -= 1
+            metadata = {
+                "id": profile_id,
+                "method": scope["method"],
+                "route": route_template(scope),
+                "path": scope["path"],
+                "status": status,
+                "duration_ms": round(elapsed * 1000, 1),
+                "trigger": trigger,
+            }
+            # The response has gone out; rendering and disk I/O stay off the loop
+            try:
+                await asyncio.to_thread(self._save, profiler, metadata)
+            except Exception as e:
+                logger.warning("Could not save profile %s: %s", profile_id, e)
+
+    def _save(self, profiler, metadata: dict) -> None:
+        document = json.loads(profiler.output(SpeedscopeRenderer()))
+        document["name"] = (
+            f"{metadata['method']} {metadata['route']} ({metadata['duration_ms']} ms)"
+        )
+        # Viewers ignore unknown keys, so the request details ride along
+        document["gentle"] = metadata
+        payload = json.dumps(document, separators=(",", ":")).encode()
+        if len(payload) > self.max_bytes:
+            logger.warning(
+                "Dropping %d byte profile of %s %s (PROFILING_MAX_BYTES=%d)",
+                len(payload),
+                metadata["method"],
+                metadata["route"],
+                self.max_bytes,
+            )
+            return
+
+        slug = (
+            metadata["route"]
+            .strip("/")
+            .replace("/", "_")
+            .replace("{", "")
+            .replace("}", "")
+            or "root"
+        )
+        path = os.path.join(
+            self.directory,
+            f"{metadata['id']}-{metadata['method']}-{slug}{PROFILE_SUFFIX}",
+        )
+        with open(path, "wb") as f:
+            f.write(payload)
+        logger.info(
+            "Profiled %s %s in %.1f ms -> %s",
+            metadata["method"],
+            metadata["route"],
+            metadata["duration_ms"],
+            path,
+        )
+        self._prune()
+
+    def _prune(self) -> None:
+        profiles = sorted(
+            (
+                entry
+                for entry in os.scandir(self.directory)
+                if entry.name.endswith(PROFILE_SUFFIX)
+            ),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in profiles[: max(len(profiles) - self.max_files, 0)]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass  # another worker process pruned it first
+
+
+def profiling_enabled(settings: Settings) -> bool:
+    """Whether create_app should add ProfilingMiddleware at all."""
+    if not (settings.profiling_sample_rate > 0 or settings.profiling_token):
+        return False
+    if not PYINSTRUMENT_AVAILABLE:
+        logger.warning(
+            "Profiling is configured but pyinstrument is not installed; skipping"
+        )
+        return False
+    return True
@@ -0,0 +1,22 @@
+from redis.asyncio import Redis
+
+from app.core.settings import get_settings
+
+settings = get_settings()
+
+_client: Redis | None = None
+
+
+def get_redis() -> Redis:
+    """Return the process-wide async Redis client (lazily created)."""
+    global _client
+    if _client is None:
+        _client = Redis.from_url(settings.redis_url, decode_responses=True)
+    return _client
+
+
+async def close_redis() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,39 @@
+import uuid
+from typing import Any, Iterable, Mapping
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+
+def json_default(value: Any) -> Any:
+    """orjson fallback for types it doesn't encode natively.
+
+    asyncpg returns its own uuid.UUID subclass, which orjson rejects; every
+    orjson.dumps of database rows needs this.
+    """
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class TrustedJSONResponse(ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content, default=json_default, option=orjson.OPT_NON_STR_KEYS
+        )
+
+
+def rows_to_dicts(rows: Iterable[Mapping[str, Any]]) -> list[dict[str, Any]]:
+    """Turn Core row mappings into plain dicts orjson can encode directly."""
+    return [dict(row) for row in rows]
+
+
+def trusted_json(
+    content: Any, headers: Mapping[str, str] | None = None
+) -> ORJSONResponse:
+    """Serialize trusted DB output without re-validating it through Pydantic.
+
+    Only use with rows selected from our own tables whose columns already
+    match the declared response_model; the model then documents the shape.
+    """
+    return TrustedJSONResponse(content=content, headers=headers)
@@ -7,15 +7,209 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     app_env: str = Field(default="dev", alias="APP_ENV")
     database_url: str = Field(..., alias="DATABASE_URL")
+    database_shards: str | None = Field(
+        default=None,
+        alias="DATABASE_SHARDS",
+        description=(
+            "name=url,name=url; users are spread over them by consistent "
+            "hashing on the names"
+        )
+    )
+    database_replica_url: str | None = Field(default=None, alias="DATABASE_REPLICA_URL")
+    replica_sticky_seconds: int = Field(
+        default=5,
+        alias="REPLICA_STICKY_SECONDS",
+        description="How long a user's reads stay on the primary after they write"
+    )
     redis_url: str = Field(..., alias="REDIS_URL")
     
+    db_echo: bool = Field(default=False, alias="DB_ECHO")
+    db_pool_mode: str = Field(
+        default="queue",
+        alias="DB_POOL_MODE",
+        description=(
+            "queue (in-process pool) or null (one connection per checkout, "
+            "e.g. behind PgBouncer)"
+        )
+    )
+    db_pool_size: int = Field(default=5, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, alias="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(default=30.0, alias="DB_POOL_TIMEOUT")
+    db_pool_recycle: int = Field(default=300, alias="DB_POOL_RECYCLE")
+    db_pool_pre_ping: bool = Field(default=True, alias="DB_POOL_PRE_PING")
+    db_pgbouncer: bool = Field(
+        default=False,
+        alias="DB_PGBOUNCER",
+        description=(
+            "Disable asyncpg prepared statement caching for PgBouncer "
+            "transaction pooling"
+        )
+    )
+    
+    # Query accounting (app.core.timing); unset debug switches follow APP_ENV
+    slow_query_ms: float = Field(
+        default=500,
+        alias="SLOW_QUERY_MS",
+        description="Log statements slower than this; 0 disables"
+    )
+    slow_query_explain: bool | None = Field(
+        default=None,
+        alias="SLOW_QUERY_EXPLAIN",
+        description=(
+            "Log EXPLAIN output with slow statements; on in dev and staging "
+            "by default"
+        )
+    )
+    server_timing: bool | None = Field(
+        default=None,
+        alias="SERVER_TIMING",
+        description=(
+            "Send db/ai/auth totals in a Server-Timing header; on in dev and "
+            "staging by default"
+        )
+    )
+    
+    metrics_token: str | None = Field(
+        default=None,
+        alias="METRICS_TOKEN",
+        description="GET /metrics requires Authorization: Bearer <token> when set"
+    )
+    
+    # Request profiling (app.core.profiling, needs pyinstrument); off unless
+    # a sample rate or token is set
+    profiling_sample_rate: float = Field(
+        default=0.0,
+        alias="PROFILING_SAMPLE_RATE",
+        description="Fraction of requests to profile"
+    )
+    profiling_token: str | None = Field(
+        default=None,
+        alias="PROFILING_TOKEN",
+        description="Requests with X-Gentle-Profile: <token> are always profiled"
+    )
+    profiling_dir: str = Field(default="/tmp/gentle-profiles", alias="PROFILING_DIR")
+    profiling_interval_ms: float = Field(default=1.0, alias="PROFILING_INTERVAL_MS")
+    profiling_max_files: int = Field(
+        default=200,
+        alias="PROFILING_MAX_FILES",
+        description="Only the newest profiles are kept"
+    )
+    profiling_max_bytes: int = Field(
+        default=5_000_000,
+        alias="PROFILING_MAX_BYTES",
+        description="Larger profiles are dropped"
+    )
+    profiling_max_concurrent: int = Field(
+        default=2,
+        alias="PROFILING_MAX_CONCURRENT",
+        description="Requests profiled at once per process"
+    )
+    
     supabase_jwks_url: str = Field(..., alias="SUPABASE_JWKS_URL")
     supabase_audience: str = Field(default="authenticated", alias="SUPABASE_AUDIENCE")
+    jwks_refresh_seconds: float = Field(default=3600, alias="JWKS_REFRESH_SECONDS")
+    jwks_unknown_kid_cooldown_seconds: float = Field(
+        default=30,
+        alias="JWKS_UNKNOWN_KID_COOLDOWN_SECONDS",
+        description=(
+            "Minimum gap between JWKS refetches triggered by tokens with an "
+            "unknown kid"
+        )
+    )
+    jwks_timeout_seconds: float = Field(default=5.0, alias="JWKS_TIMEOUT_SECONDS")
+    verified_token_cache_size: int = Field(
+        default=10000, alias="VERIFIED_TOKEN_CACHE_SIZE"
+    )
     
     openai_api_key: str | None = Field(default=None, alias="OPENAI_API_KEY")
     openai_model: str = Field(default="gpt-4o-mini", alias="OPENAI_MODEL")
     openai_org_id: str | None = Field(default=None, alias="OPENAI_ORG_ID")
     openai_project_id: str | None = Field(default=None, alias="OPENAI_PROJECT_ID")
+    # Point at an OpenAI-compatible server (e.g. the bench stub); unset uses
+    # api.openai.com
+    openai_base_url: str | None = Field(default=None, alias="OPENAI_BASE_URL")
+    
+    partition_premake_months: int = Field(default=3, alias="PARTITION_PREMAKE_MONTHS")
+    partition_retention_months: int = Field(
+        default=24,
+        alias="PARTITION_RETENTION_MONTHS",
+        description=(
+            "Monthly moods/celebrations partitions older than this are "
+            "detached (0 keeps everything)"
+        )
+    )
+    partition_drop_detached: bool = Field(default=True, alias="PARTITION_DROP_DETACHED")
+    
+    archive_after_days: int = Field(
+        default=90,
+        alias="ARCHIVE_AFTER_DAYS",
+        description=(
+            "Done/archived tasks (and unfinished mood micro-tasks) untouched "
+            "this long move to the cold archive tables"
+        )
+    )
+    archive_batch_size: int = Field(default=500, alias="ARCHIVE_BATCH_SIZE")
+    
+    known_user_cache_size: int = Field(default=10000, alias="KNOWN_USER_CACHE_SIZE")
+    
+    outbox_relay_interval_seconds: float = Field(
+        default=2.0, alias="OUTBOX_RELAY_INTERVAL_SECONDS"
+    )
+    outbox_batch_size: int = Field(default=500, alias="OUTBOX_BATCH_SIZE")
+    outbox_retention_hours: int = Field(
+        default=24,
+        alias="OUTBOX_RETENTION_HOURS",
+        description="Sent outbox rows are kept this long for debugging, then deleted"
+    )
+    
+    celery_prefetch_multiplier: int = Field(
+        default=4,
+        alias="CELERY_PREFETCH_MULTIPLIER",
+        description=(
+            "Messages each worker process reserves ahead; keep low with late "
+            "acks"
+        )
+    )
+    celery_metrics_port: int | None = Field(
+        default=None,
+        alias="CELERY_METRICS_PORT",
+        description="Serve the worker's Prometheus metrics on this port"
+    )
+    
+    # Celebration digests (Celery beat); with per-event sending off, worker
+    # load follows active users rather than completions
+    celebration_per_event: bool = Field(
+        default=True,
+        alias="CELEBRATION_PER_EVENT",
+        description="Queue a send_celebration task for every completion"
+    )
+    digest_interval_seconds: float = Field(
+        default=900.0, alias="DIGEST_INTERVAL_SECONDS"
+    )
+    digest_lag_seconds: int = Field(default=30, alias="DIGEST_LAG_SECONDS")
+    digest_batch_size: int = Field(default=500, alias="DIGEST_BATCH_SIZE")
+    digest_backend: str = Field(
+        default="log", alias="DIGEST_BACKEND", description="log or file"
+    )
+    digest_file_path: str = Field(
+        default="celebration_digests.ndjson", alias="DIGEST_FILE_PATH"
+    )
+    
+    # Live event streams (GET /v1/events), per API process
+    events_max_connections: int = Field(default=20000, alias="EVENTS_MAX_CONNECTIONS")
+    events_queue_size: int = Field(
+        default=64,
+        alias="EVENTS_QUEUE_SIZE",
+        description="Undelivered events buffered per stream before it is told to resync"
+    )
+    events_heartbeat_seconds: float = Field(
+        default=15.0, alias="EVENTS_HEARTBEAT_SECONDS"
+    )
+    
+    # Clients offline longer than this get a full resync instead of a delta
+    sync_tombstone_retention_days: int = Field(
+        default=30, alias="SYNC_TOMBSTONE_RETENTION_DAYS"
+    )
     
     sentry_dsn: str | None = Field(default=None, alias="SENTRY_DSN")
     posthog_key: str | None = Field(default=None, alias="POSTHOG_KEY")
@@ -34,6 +228,18 @@ class Settings(BaseSettings):
         """Split CORS_ALLOW_ORIGINS by comma and strip whitespace"""
         return [origin.strip() for origin in self.cors_allow_origins.split(",") if origin.strip()]
     
+    def is_debug_env(self) -> bool:
+        """Dev and staging, where per-request diagnostics are on by default"""
+        return self.app_env in ("dev", "staging")
+    
+    def slow_query_explain_enabled(self) -> bool:
+        if self.slow_query_explain is None:
+            return self.is_debug_env()
+        return self.slow_query_explain
+    
+    def server_timing_enabled(self) -> bool:
+        return self.is_debug_env() if self.server_timing is None else self.server_timing
+    
     def openai_key_type(self) -> str:
         """Return OpenAI key type: classic, project, service_account, or none"""
         if not self.openai_api_key:
@@ -0,0 +1,172 @@
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Statements EXPLAIN accepts; anything else (SET, DDL, ...) is only logged
+EXPLAINABLE = ("select", "insert", "update", "delete", "with")
+
+
+@dataclass(slots=True)
+class RequestTimings:
+    """Where one request spent its time outside Python."""
+
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    ai_seconds: float = 0.0
+    auth_seconds: float = 0.0
+
+    def server_timing(self) -> bytes:
+        """Server-Timing header value (durations in milliseconds)."""
+        return (
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_queries} queries", '
+            f"ai;dur={self.ai_seconds * 1000:.1f}, "
+            f"auth;dur={self.auth_seconds * 1000:.1f}"
+        ).encode("latin-1")
+
+
+# Set by MetricsMiddleware for the request being served; None outside
+# requests (workers, startup)
+request_timings: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def add_ai_seconds(seconds: float) -> None:
+    timings = request_timings.get()
+    if timings is not None:
+        timings.ai_seconds += seconds
+
+
+def add_auth_seconds(seconds: float) -> None:
+    timings = request_timings.get()
+    if timings is not None:
+        timings.auth_seconds += seconds
+
+
+def _explain(conn, statement: str, parameters) -> str:
+    # Runs on the request's own connection and transaction: the plan is for
+    # the same snapshot and settings. Plain EXPLAIN never executes the
+    # statement, and the savepoint keeps a failing EXPLAIN from aborting the
+    # request's transaction.
+    cursor = conn.connection.cursor()
+    savepoint = not getattr(conn.connection.dbapi_connection, "autocommit", False)
+    try:
+        if savepoint:
+            cursor.execute("SAVEPOINT gentle_explain")
+        try:
+            cursor.execute(f"EXPLAIN {statement}", parameters)
+            return "\n".join(row[0] for row in cursor.fetchall())
+        finally:
+            if savepoint:
+                cursor.execute("ROLLBACK TO SAVEPOINT gentle_explain")
+                cursor.execute("RELEASE SAVEPOINT gentle_explain")
+    finally:
+        cursor.close()
+
+
+def _log_slow_statement(
+    conn, statement: str, parameters, executemany: bool, elapsed: float
+) -> None:
+    plan = None
+    if (
+        settings.slow_query_explain_enabled()
+        and not executemany
+        and statement.lstrip().split(None, 1)[0].lower() in EXPLAINABLE
+    ):
+        try:
+            plan = _explain(conn, statement, parameters)
+        except Exception as e:
+            plan = f"(EXPLAIN failed: {e})"
+    logger.warning(
+        "Slow query (%.0f ms):\n%s%s",
+        elapsed * 1000,
+        statement,
+        f"\n{plan}" if plan else "",
+    )
+
+
+def _before_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+) -> None:
+    started = conn.info.get("query_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+
+    timings = request_timings.get()
+    if timings is not None:
+        timings.db_queries += 1
+        timings.db_seconds += elapsed
+
+    if settings.slow_query_ms and elapsed * 1000 >= settings.slow_query_ms:
+        _log_slow_statement(conn, statement, parameters, executemany, elapsed)
+
+
+def _handle_error(exception_context) -> None:
+    # A statement that raised never reaches after_cursor_execute; drop its
+    # start time so the next statement isn't timed against it
+    conn = exception_context.connection
+    if (
+        conn is not None
+        and getattr(exception_context, "execution_context", None) is not None
+    ):
+        started = conn.info.get("query_started")
+        if started:
+            started.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time the engine's statements, per request and against SLOW_QUERY_MS."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+# Called with (route, queries, budget) whenever a request runs over; the
+# pytest fixture in conftest.py turns these into failures
+budget_listeners: list[Callable[[str, int, int], None]] = []
+
+
+def query_budget(max_queries: int):
+    """Declare the most SQL statements one request to this endpoint may run.
+
+    Apply below the route decorator. Dependencies count too, so the budget
+    covers the whole request. Going over logs a warning (and fails tests);
+    it never fails the request.
+    """
+
+    def decorate(endpoint):
+        endpoint.query_budget = max_queries
+        return endpoint
+
+    return decorate
+
+
+def check_query_budget(endpoint, route: str, timings: RequestTimings) -> None:
+    budget = getattr(endpoint, "query_budget", None)
+    if budget is None or timings.db_queries <= budget:
+        return
+    logger.warning(
+        "Query budget exceeded: %s ran %d statements (budget %d)",
+        route,
+        timings.db_queries,
+        budget,
+    )
+    for listener in budget_listeners:
+        listener(route, timings.db_queries, budget)
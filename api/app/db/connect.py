@@ -0,0 +1,16 @@
+import uuid
+
+from app.core.settings import Settings
+
+
+def connect_args(settings: Settings) -> dict:
+    """asyncpg connect_args for every engine, in the API and in workers."""
+    if not settings.db_pgbouncer:
+        return {}
+    # PgBouncer in transaction mode hands each transaction a different server
+    # connection, so named prepared statements must be unique and uncached
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+    }
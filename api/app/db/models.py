@@ -1,9 +1,9 @@
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 
 import sqlalchemy as sa
 from sqlalchemy import ForeignKey
-from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -21,6 +21,11 @@ task_state_enum = sa.Enum(
     name='task_state_enum'
 )
 
+task_kind_enum = sa.Enum(
+    'user', 'mood',
+    name='task_kind_enum'
+)
+
 step_state_enum = sa.Enum(
     'pending', 'done',
     name='step_state_enum'
@@ -45,6 +50,8 @@ class User(Base):
 
 class Mood(Base):
     __tablename__ = 'moods'
+    # Monthly range partitions, see migration 0002 and app.tasks.partitions
+    __table_args__ = {'postgresql_partition_by': 'RANGE (created_at)'}
     
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
@@ -54,12 +61,61 @@ class Mood(Base):
     created_at: Mapped[datetime] = mapped_column(
         sa.DateTime(timezone=True), 
         server_default=sa.func.now(),
+        primary_key=True,
         nullable=False
     )
     
+    # Set by trigger to the writing transaction id (migration 0008, delta sync)
+    change_seq: Mapped[int] = mapped_column(
+        sa.BigInteger, server_default='0', nullable=False
+    )
+    
     user: Mapped["User"] = relationship(back_populates="moods")
 
 
+class MoodDailyRollup(Base):
+    """Per-user, per-local-day mood aggregates maintained on check-in."""
+    __tablename__ = 'mood_daily_rollups'
+    
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(sa.Date, primary_key=True)
+    checkin_count: Mapped[int] = mapped_column(sa.Integer, default=0, nullable=False)
+    energy_sum: Mapped[int] = mapped_column(sa.Integer, default=0, nullable=False)
+    energy_min: Mapped[int] = mapped_column(sa.SmallInteger, nullable=False)
+    energy_max: Mapped[int] = mapped_column(sa.SmallInteger, nullable=False)
+    calm_count: Mapped[int] = mapped_column(sa.Integer, default=0, nullable=False)
+    anxious_count: Mapped[int] = mapped_column(sa.Integer, default=0, nullable=False)
+    tired_count: Mapped[int] = mapped_column(sa.Integer, default=0, nullable=False)
+    energized_count: Mapped[int] = mapped_column(sa.Integer, default=0, nullable=False)
+    low_count: Mapped[int] = mapped_column(sa.Integer, default=0, nullable=False)
+    mixed_count: Mapped[int] = mapped_column(sa.Integer, default=0, nullable=False)
+
+
+class UserStats(Base):
+    """Completion counters and streaks, upserted atomically per completion."""
+    __tablename__ = 'user_stats'
+    
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), primary_key=True
+    )
+    completions_total: Mapped[int] = mapped_column(
+        sa.Integer, default=0, nullable=False
+    )
+    completions_today: Mapped[int] = mapped_column(
+        sa.Integer, default=0, nullable=False
+    )
+    completions_week: Mapped[int] = mapped_column(sa.Integer, default=0, nullable=False)
+    last_completion_day: Mapped[date] = mapped_column(sa.Date, nullable=False)
+    week_start: Mapped[date] = mapped_column(sa.Date, nullable=False)
+    current_streak: Mapped[int] = mapped_column(sa.Integer, default=0, nullable=False)
+    longest_streak: Mapped[int] = mapped_column(sa.Integer, default=0, nullable=False)
+    last_completion_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True), nullable=False
+    )
+
+
 class Task(Base):
     __tablename__ = 'tasks'
     
@@ -67,6 +123,10 @@ class Task(Base):
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     title: Mapped[str] = mapped_column(sa.Text, nullable=False)
     state: Mapped[str] = mapped_column(task_state_enum, default='pending', nullable=False)
+    # 'mood' for the micro-task each check-in creates (migration 0013)
+    kind: Mapped[str] = mapped_column(
+        task_kind_enum, server_default='user', nullable=False
+    )
     created_at: Mapped[datetime] = mapped_column(
         sa.DateTime(timezone=True), 
         server_default=sa.func.now(),
@@ -75,9 +135,25 @@ class Task(Base):
     updated_at: Mapped[datetime] = mapped_column(
         sa.DateTime(timezone=True), 
         server_default=sa.func.now(),
-        server_onupdate=sa.func.now(),
+        onupdate=sa.func.now(),
         nullable=False
     )
+    # When the task last became done; cleared when a step reopens it
+    completed_at: Mapped[datetime | None] = mapped_column(
+        sa.DateTime(timezone=True), nullable=True
+    )
+    
+    # Set by trigger to the writing transaction id (migration 0008, delta sync)
+    change_seq: Mapped[int] = mapped_column(
+        sa.BigInteger, server_default='0', nullable=False
+    )
+    
+    # Generated by Postgres (migration 0006); deferred so it is never loaded
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        sa.Computed("to_tsvector('simple', title)", persisted=True),
+        deferred=True
+    )
     
     user: Mapped["User"] = relationship(back_populates="tasks")
     steps: Mapped[list["Step"]] = relationship(back_populates="task", cascade="all, delete-orphan")
@@ -97,12 +173,25 @@ class Step(Base):
         nullable=False
     )
     
+    # Set by trigger to the writing transaction id (migration 0008, delta sync)
+    change_seq: Mapped[int] = mapped_column(
+        sa.BigInteger, server_default='0', nullable=False
+    )
+    
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        sa.Computed("to_tsvector('simple', content)", persisted=True),
+        deferred=True
+    )
+    
     task: Mapped["Task"] = relationship(back_populates="steps")
     celebrations: Mapped[list["Celebration"]] = relationship(back_populates="step", cascade="all, delete-orphan")
 
 
 class Celebration(Base):
     __tablename__ = 'celebrations'
+    # Monthly range partitions, see migration 0002 and app.tasks.partitions
+    __table_args__ = {'postgresql_partition_by': 'RANGE (created_at)'}
     
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
@@ -111,6 +200,7 @@ class Celebration(Base):
     created_at: Mapped[datetime] = mapped_column(
         sa.DateTime(timezone=True), 
         server_default=sa.func.now(),
+        primary_key=True,
         nullable=False
     )
     
@@ -131,4 +221,115 @@ class AISession(Base):
         nullable=False
     )
     
-    user: Mapped["User"] = relationship(back_populates="ai_sessions")
\ No newline at end of file
+    user: Mapped["User"] = relationship(back_populates="ai_sessions")
+
+
+class ArchivedTask(Base):
+    """Cold copy of a task moved out of the hot tables by app.tasks.archive."""
+    __tablename__ = 'archived_tasks'
+    
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    title: Mapped[str] = mapped_column(sa.Text, nullable=False)
+    state: Mapped[str] = mapped_column(task_state_enum, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True), nullable=False
+    )
+    archived_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True), 
+        server_default=sa.func.now(),
+        nullable=False
+    )
+    
+    # Generated by Postgres (migration 0014), as on tasks
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        sa.Computed("to_tsvector('simple', title)", persisted=True),
+        deferred=True
+    )
+    
+    steps: Mapped[list["ArchivedStep"]] = relationship(
+        back_populates="task", cascade="all, delete-orphan"
+    )
+
+
+class ArchivedStep(Base):
+    __tablename__ = 'archived_steps'
+    
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    task_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey('archived_tasks.id', ondelete='CASCADE'),
+        nullable=False,
+    )
+    content: Mapped[str] = mapped_column(sa.Text, nullable=False)
+    order: Mapped[int] = mapped_column(sa.Integer, nullable=False)
+    state: Mapped[str] = mapped_column(step_state_enum, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True), nullable=False
+    )
+    
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        sa.Computed("to_tsvector('simple', content)", persisted=True),
+        deferred=True
+    )
+    
+    task: Mapped["ArchivedTask"] = relationship(back_populates="steps")
+
+
+class SyncTombstone(Base):
+    """Deleted task/step/mood ids, written by delete triggers for delta sync."""
+    __tablename__ = 'sync_tombstones'
+    
+    id: Mapped[int] = mapped_column(sa.BigInteger, sa.Identity(), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    entity: Mapped[str] = mapped_column(sa.Text, nullable=False)
+    entity_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    change_seq: Mapped[int] = mapped_column(sa.BigInteger, nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True), 
+        server_default=sa.func.now(),
+        nullable=False
+    )
+
+
+class OutboxEvent(Base):
+    """Background task enqueued in the same transaction as the write that caused it."""
+    __tablename__ = 'outbox_events'
+    
+    id: Mapped[int] = mapped_column(sa.BigInteger, sa.Identity(), primary_key=True)
+    task_name: Mapped[str] = mapped_column(sa.Text, nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True), 
+        server_default=sa.func.now(),
+        nullable=False
+    )
+    # Set by the relay run publishing the row; a claim older than the relay's
+    # CLAIM_TIMEOUT is abandoned and the row is picked up again
+    claimed_at: Mapped[datetime | None] = mapped_column(
+        sa.DateTime(timezone=True), nullable=True
+    )
+    sent_at: Mapped[datetime | None] = mapped_column(
+        sa.DateTime(timezone=True), nullable=True
+    )
+
+
+class JobWatermark(Base):
+    """How far a periodic job has processed, so each run picks up where the last
+    stopped."""
+    __tablename__ = 'job_watermarks'
+    
+    name: Mapped[str] = mapped_column(sa.Text, primary_key=True)
+    watermark: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True), 
+        server_default=sa.func.now(),
+        nullable=False
+    )
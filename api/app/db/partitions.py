@@ -0,0 +1,38 @@
+from datetime import date, datetime, timedelta, timezone
+
+from app.core.settings import Settings
+
+# How far ahead of the server a device's clock may run
+MAX_CLOCK_SKEW = timedelta(minutes=10)
+
+
+def add_months(month_start: date, months: int) -> date:
+    index = month_start.year * 12 + (month_start.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def accepted_created_at_range(
+    settings: Settings, now: datetime | None = None
+) -> tuple[datetime | None, datetime]:
+    """Timestamps client-supplied moods and celebrations may carry.
+
+    Rows outside the monthly partitions land in the default partition. One
+    dated in a month that premake hasn't reached yet later blocks creating
+    that month's partition, and one older than retention would outlive it
+    there. The lower bound is None when PARTITION_RETENTION_MONTHS is 0.
+    """
+    now = now or datetime.now(timezone.utc)
+    earliest = None
+    if settings.partition_retention_months > 0:
+        cutoff = add_months(
+            now.date().replace(day=1), -settings.partition_retention_months
+        )
+        earliest = datetime(cutoff.year, cutoff.month, 1, tzinfo=timezone.utc)
+    return earliest, now + MAX_CLOCK_SKEW
+
+
+def in_accepted_range(
+    created_at: datetime, accepted: tuple[datetime | None, datetime]
+) -> bool:
+    earliest, latest = accepted
+    return (earliest is None or created_at >= earliest) and created_at <= latest
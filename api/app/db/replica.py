@@ -0,0 +1,95 @@
+import logging
+
+from cachetools import TTLCache
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.redis import get_redis
+from app.core.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_WROTE_KEY = "wrote"
+_COMMITTED_WRITE_KEY = "committed_write"
+_STICKY_USER_KEY = "sticky_user"
+
+# Local copy of recent writers so this process never has to ask Redis about
+# its own writes; Redis shares the window with the other workers
+_local_sticky: TTLCache = TTLCache(maxsize=10000, ttl=settings.replica_sticky_seconds)
+
+
+def _sticky_key(user_id: str) -> str:
+    return f"gentle:sticky:{user_id}"
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session: Session, flush_context) -> None:
+    session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statement_write(orm_execute_state) -> None:
+    # Covers insert()/update()/delete() statements run through session.execute
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        orm_execute_state.session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _track_commit(session: Session) -> None:
+    if session.info.pop(_WROTE_KEY, False):
+        session.info[_COMMITTED_WRITE_KEY] = True
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _track_rollback(session: Session, previous_transaction) -> None:
+    session.info.pop(_WROTE_KEY, None)
+
+
+async def mark_sticky(user_id: str) -> None:
+    """Pin user_id's reads to the primary for REPLICA_STICKY_SECONDS."""
+    _local_sticky[user_id] = True
+    try:
+        await get_redis().set(
+            _sticky_key(user_id), "1", ex=settings.replica_sticky_seconds
+        )
+    except Exception as e:
+        logger.warning("Replica stickiness not shared via Redis: %s", str(e))
+
+
+def stick_after_commit(session: AsyncSession, user_id: str) -> None:
+    """Have session's commits that wrote pin user_id's reads to the primary."""
+    session.info[_STICKY_USER_KEY] = user_id
+
+
+class ReadYourWritesSession(AsyncSession):
+    """AsyncSession that marks its user sticky inside commit().
+
+    The endpoint awaits its own commit, so the mark is in place before the
+    response goes out. A dependency's teardown may run after the response,
+    when the client can already have issued its next read.
+    """
+
+    async def commit(self) -> None:
+        await super().commit()
+        user_id = self.info.get(_STICKY_USER_KEY)
+        if user_id is not None and self.info.pop(_COMMITTED_WRITE_KEY, False):
+            await mark_sticky(user_id)
+
+
+async def is_sticky(user_id: str) -> bool:
+    """Whether user_id wrote recently enough that the replica may lag them."""
+    if user_id in _local_sticky:
+        return True
+
+    try:
+        return bool(await get_redis().exists(_sticky_key(user_id)))
+    except Exception as e:
+        # Can't prove the replica is safe, so read from the primary
+        logger.warning("Replica stickiness check failed, using primary: %s", str(e))
+        return True
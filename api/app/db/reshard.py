@@ -0,0 +1,303 @@
+"""Move users' rows between shards.
+
+Placement comes from the consistent hash ring over DATABASE_SHARDS. After
+adding (or removing) a shard, pass the previous list with --previous:
+
+    python -m app.db.reshard plan --previous "a=postgresql+asyncpg://...,b=..."
+    python -m app.db.reshard lock --previous "..."   # movers get 503 from now on
+    # deploy the new DATABASE_SHARDS everywhere, then:
+    python -m app.db.reshard move --previous "..."   # re-plan, copy, delete, unlock
+
+Or move one user explicitly, e.g. to finish an interrupted move:
+
+    python -m app.db.reshard move-user <user_id> --source a --target b
+
+move plans again against the deployed ring, so users created since lock
+are found, and locks them too before moving anyone. A move locks the
+user's rows on the source, copies them into the target and commits there,
+then deletes them from the source and commits that. If the delete fails,
+the rows the copy inserted are deleted from the target again and the user
+stays locked (503) until a rerun moves them; rerunning after a crash in
+between is also safe because the copy skips rows that already exist.
+"""
+
+import argparse
+import asyncio
+import uuid
+
+import sqlalchemy as sa
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.redis import close_redis
+from app.db.models import (
+    AISession,
+    ArchivedStep,
+    ArchivedTask,
+    Celebration,
+    Mood,
+    MoodDailyRollup,
+    Step,
+    SyncTombstone,
+    Task,
+    User,
+    UserStats,
+)
+from app.db.shards import SHARDS, HashRing, clear_moving, mark_moving, parse_shards
+from app.db.worker import worker_engine
+
+COPY_BATCH_SIZE = 1000
+
+
+def user_rows(user_id: uuid.UUID) -> list[tuple[type, sa.Select]]:
+    """Every row a user owns, parents before children.
+
+    sync_tombstones are not copied: sync cursors are tied to a shard, so
+    clients do a full resync after a move anyway.
+    """
+    return [
+        (User, select(User).where(User.id == user_id)),
+        (Task, select(Task).where(Task.user_id == user_id)),
+        (
+            Step,
+            select(Step)
+            .join(Task, Task.id == Step.task_id)
+            .where(Task.user_id == user_id),
+        ),
+        (Mood, select(Mood).where(Mood.user_id == user_id)),
+        (Celebration, select(Celebration).where(Celebration.user_id == user_id)),
+        (AISession, select(AISession).where(AISession.user_id == user_id)),
+        (
+            MoodDailyRollup,
+            select(MoodDailyRollup).where(MoodDailyRollup.user_id == user_id),
+        ),
+        (UserStats, select(UserStats).where(UserStats.user_id == user_id)),
+        (ArchivedTask, select(ArchivedTask).where(ArchivedTask.user_id == user_id)),
+        (
+            ArchivedStep,
+            select(ArchivedStep)
+            .join(ArchivedTask, ArchivedTask.id == ArchivedStep.task_id)
+            .where(ArchivedTask.user_id == user_id),
+        ),
+    ]
+
+
+def lock_statements(user_id: uuid.UUID) -> list[sa.Select]:
+    """SELECT ... FOR UPDATE over every row of the user's that is written in place.
+
+    The users row lock also blocks inserts of anything referencing the user
+    (their foreign key check takes FOR KEY SHARE on it); steps reference
+    tasks, which are locked too.
+    """
+    mutable = (User, Task, Step, UserStats, MoodDailyRollup)
+    return [
+        query.with_only_columns(*model.__table__.primary_key.columns).with_for_update(
+            of=model
+        )
+        for model, query in user_rows(user_id)
+        if model in mutable
+    ]
+
+
+def _copy_columns(model: type) -> list[sa.Column]:
+    # Generated columns (search_vector) are recomputed by the target
+    return [column for column in model.__table__.columns if column.computed is None]
+
+
+# Primary keys the copy inserted on the target, per model in copy order
+Inserted = list[tuple[type, list[tuple]]]
+
+
+async def copy_user(
+    source: AsyncConnection, target: AsyncConnection, user_id: uuid.UUID
+) -> tuple[dict[str, int], Inserted]:
+    copied: dict[str, int] = {}
+    inserted: Inserted = []
+    for model, query in user_rows(user_id):
+        columns = _copy_columns(model)
+        primary_key = list(model.__table__.primary_key.columns)
+        stmt = query.with_only_columns(*columns).execution_options(
+            yield_per=COPY_BATCH_SIZE
+        )
+        result = await source.stream(stmt)
+        copied[model.__tablename__] = 0
+        keys: list[tuple] = []
+        async for rows in result.mappings().partitions():
+            written = await target.execute(
+                insert(model.__table__)
+                .values([dict(row) for row in rows])
+                .on_conflict_do_nothing()
+                .returning(*primary_key)
+            )
+            keys += [tuple(key) for key in written]
+            copied[model.__tablename__] += len(rows)
+        inserted.append((model, keys))
+    return copied, inserted
+
+
+async def uncopy_user(
+    target: AsyncConnection, user_id: uuid.UUID, inserted: Inserted
+) -> None:
+    """Delete exactly the rows copy_user inserted, children first.
+
+    Rows the target already had (say a users row a request created after
+    the deploy) are left alone.
+    """
+    for model, keys in reversed(inserted):
+        primary_key = sa.tuple_(*model.__table__.primary_key.columns)
+        for start in range(0, len(keys), COPY_BATCH_SIZE):
+            batch = keys[start : start + COPY_BATCH_SIZE]
+            await target.execute(delete(model).where(primary_key.in_(batch)))
+    if any(model is User and keys for model, keys in inserted):
+        # The user is ours alone there, so are the deletes' tombstones
+        await target.execute(
+            delete(SyncTombstone).where(SyncTombstone.user_id == user_id)
+        )
+
+
+async def move_user(
+    user_id: uuid.UUID, source_url: str, target_url: str
+) -> dict[str, int]:
+    """Copy a user's rows to the target shard, then delete them from the source.
+
+    One source transaction holds the row locks from before the copy until
+    the delete, so a request still in flight from before the user was
+    marked moving either lands before the copy or fails once the rows are
+    gone; it can't write in between and be deleted uncopied. If the
+    delete fails, the copy is undone so the rows live on one shard only.
+    """
+    async with (
+        worker_engine(source_url) as source_engine,
+        worker_engine(target_url) as target_engine,
+        source_engine.connect() as source,
+    ):
+        await source.begin()
+        # Waits for in-flight writers; nothing changes the user's rows
+        # after this, so each copy statement sees the same data
+        for stmt in lock_statements(user_id):
+            await source.execute(stmt)
+
+        async with target_engine.begin() as target:
+            copied, inserted = await copy_user(source, target, user_id)
+
+        try:
+            # Everything else goes with the users row via ON DELETE CASCADE;
+            # the tombstones those deletes write are the user's too
+            await source.execute(delete(User).where(User.id == user_id))
+            await source.execute(
+                delete(SyncTombstone).where(SyncTombstone.user_id == user_id)
+            )
+            await source.commit()
+        except BaseException:
+            await source.rollback()
+            async with target_engine.begin() as target:
+                await uncopy_user(target, user_id, inserted)
+            raise
+    return copied
+
+
+async def plan_moves(previous: dict[str, str]) -> list[tuple[uuid.UUID, str, str]]:
+    """(user_id, old shard, new shard) for every user the new ring places elsewhere."""
+    ring = HashRing(list(SHARDS))
+    moves = []
+    for name, url in previous.items():
+        async with worker_engine(url) as engine:
+            async with engine.connect() as conn:
+                result = await conn.stream(
+                    select(User.id).execution_options(yield_per=COPY_BATCH_SIZE)
+                )
+                async for user_id in result.scalars():
+                    new_shard = ring.shard_for(str(user_id))
+                    if new_shard != name:
+                        moves.append((user_id, name, new_shard))
+    return moves
+
+
+def _url_for(name: str, previous: dict[str, str]) -> str:
+    url = SHARDS.get(name) or previous.get(name)
+    if url is None:
+        raise SystemExit(f"Unknown shard {name!r}")
+    return url
+
+
+async def _move_and_unlock(
+    user_id: uuid.UUID, source: str, target: str, previous: dict[str, str]
+) -> bool:
+    """Move one (already locked) user; it stays locked if the move fails."""
+    try:
+        copied = await move_user(
+            user_id, _url_for(source, previous), _url_for(target, previous)
+        )
+    except Exception as e:
+        print(f"{user_id}: {source} -> {target} FAILED, still locked: {e!r}")
+        return False
+    await clear_moving(str(user_id))
+    print(f"{user_id}: {source} -> {target} {copied}")
+    return True
+
+
+async def main(args: argparse.Namespace) -> None:
+    previous = parse_shards(args.previous) if getattr(args, "previous", None) else {}
+    try:
+        if args.command == "move-user":
+            user_id = uuid.UUID(args.user_id)
+            await mark_moving([str(user_id)])
+            if not await _move_and_unlock(user_id, args.source, args.target, previous):
+                raise SystemExit(1)
+            return
+
+        moves = await plan_moves(previous)
+        if args.command == "plan":
+            summary: dict[tuple[str, str], int] = {}
+            for _, source, target in moves:
+                summary[(source, target)] = summary.get((source, target), 0) + 1
+            for (source, target), count in sorted(summary.items()):
+                print(f"{source} -> {target}: {count} users")
+            print(f"{len(moves)} users to move")
+        elif args.command == "lock":
+            await mark_moving([str(user_id) for user_id, _, _ in moves])
+            print(
+                f"Locked {len(moves)} users; "
+                "deploy the new DATABASE_SHARDS, then run move"
+            )
+        elif args.command == "move":
+            # Planned again against the deployed ring: users created after
+            # lock (still on their old shard) are locked and moved as well
+            await mark_moving([str(user_id) for user_id, _, _ in moves])
+            failed = 0
+            for user_id, source, target in moves:
+                if not await _move_and_unlock(user_id, source, target, previous):
+                    failed += 1
+            if failed:
+                raise SystemExit(
+                    f"{failed} moves failed; those users stay locked, run move again"
+                )
+    finally:
+        await close_redis()
+
+
+def cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    for command in ("plan", "lock", "move"):
+        sub = commands.add_parser(command)
+        sub.add_argument(
+            "--previous",
+            required=True,
+            help="Shard list before the change, name=url,...",
+        )
+    move_one = commands.add_parser("move-user")
+    move_one.add_argument("user_id")
+    move_one.add_argument(
+        "--source", required=True, help="Shard name the user's rows are on"
+    )
+    move_one.add_argument("--target", required=True, help="Shard name to move them to")
+    move_one.add_argument(
+        "--previous", help="Old shard list, if --source is no longer configured"
+    )
+    asyncio.run(main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    cli()
@@ -1,29 +1,152 @@
-from typing import AsyncGenerator
+import logging
+import time
+import uuid
+from typing import Annotated, AsyncGenerator
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from fastapi import Depends
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
-from app.core.settings import get_settings
+from app.core.metrics import (
+    DB_POOL_CHECKOUT_TIMEOUTS,
+    DB_POOL_CHECKOUT_WAIT,
+    pool_collector,
+)
+from app.core.settings import Settings, get_settings
+from app.core.timing import instrument_engine
+from app.db.connect import connect_args
+from app.db.replica import ReadYourWritesSession, is_sticky, stick_after_commit
+from app.db.shards import SHARDS, ensure_not_moving, is_sharded, shard_for_user
+from app.deps.auth import UserCtx, get_current_user
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.app_env == "dev",
-    pool_pre_ping=True,
-    pool_recycle=300,
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait for a connection."""
+
+    def _do_get(self):
+        name = self.logging_name or "default"
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_CHECKOUT_TIMEOUTS.labels(name).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(name).observe(time.perf_counter() - start)
+
+
+def build_engine(url: str, name: str, settings: Settings = settings) -> AsyncEngine:
+    """Create an async engine configured from the DB_* pool settings."""
+    engine_kwargs: dict = {
+        "echo": settings.db_echo,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_logging_name": name,
+    }
+
+    if settings.db_pool_mode == "null":
+        engine_kwargs["poolclass"] = NullPool
+    else:
+        engine_kwargs.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+        )
+
+    engine = create_async_engine(
+        url, connect_args=connect_args(settings), **engine_kwargs
+    )
+    pool_collector.register(name, engine.sync_engine.pool)
+    instrument_engine(engine.sync_engine)
+    return engine
+
+
+# One engine/pool per shard, named after the shard ("primary" when unsharded)
+shard_engines: dict[str, AsyncEngine] = {
+    name: build_engine(url, name) for name, url in SHARDS.items()
+}
+shard_sessions: dict[str, async_sessionmaker[AsyncSession]] = {
+    # info["shard"] lets per-shard caches (known_users) key on it
+    name: async_sessionmaker(
+        shard_engine,
+        class_=ReadYourWritesSession,
+        expire_on_commit=False,
+        info={"shard": name},
+    )
+    for name, shard_engine in shard_engines.items()
+}
+
+# The first shard; unsharded deployments only ever use this one
+engine = next(iter(shard_engines.values()))
+AsyncSessionLocal = next(iter(shard_sessions.values()))
+
+
+def session_factory_for(user_id: str | uuid.UUID) -> async_sessionmaker[AsyncSession]:
+    """Session factory for the shard that owns user_id."""
+    return shard_sessions[shard_for_user(user_id)]
+
+
+if settings.database_replica_url and is_sharded():
+    logger.warning(
+        "DATABASE_REPLICA_URL is ignored when DATABASE_SHARDS lists several shards"
+    )
+
+replica_engine = (
+    build_engine(settings.database_replica_url, "replica")
+    if settings.database_replica_url and not is_sharded()
+    else None
 )
 
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
+ReplicaSessionLocal = (
+    async_sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False)
+    if replica_engine is not None
+    else None
 )
 
 
-async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    async with AsyncSessionLocal() as session:
+async def get_session(
+    current_user: Annotated[UserCtx, Depends(get_current_user)],
+) -> AsyncGenerator[AsyncSession, None]:
+    """Read-write session on the current user's shard."""
+    await ensure_not_moving(current_user.user_id)
+
+    async with session_factory_for(current_user.user_id)() as session:
+        # Read-your-writes: committing a write keeps this user's reads on
+        # the primary for a while
+        if ReplicaSessionLocal is not None:
+            stick_after_commit(session, current_user.user_id)
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def read_session_factory(user_id: str) -> async_sessionmaker[AsyncSession]:
+    """The replica's session factory unless the user just wrote (or there is none)."""
+    await ensure_not_moving(user_id)
+    if ReplicaSessionLocal is None or await is_sticky(user_id):
+        return session_factory_for(user_id)
+    return ReplicaSessionLocal
+
+
+async def get_read_session(
+    current_user: Annotated[UserCtx, Depends(get_current_user)],
+) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only endpoints; uses the replica unless the user just wrote."""
+    session_factory = await read_session_factory(current_user.user_id)
+
+    async with session_factory() as session:
         try:
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
@@ -0,0 +1,116 @@
+import bisect
+import hashlib
+import logging
+import uuid
+
+from fastapi import HTTPException
+
+from app.core.redis import get_redis
+from app.core.settings import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Points per shard on the ring; more points, more even spread
+VIRTUAL_NODES = 256
+
+# Users whose rows are being copied between shards (see app.db.reshard)
+MOVING_USERS_KEY = "gentle:shard-moving"
+DEFAULT_SHARD = "primary"
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big"
+    )
+
+
+class HashRing:
+    """Consistent hash ring over shard names.
+
+    Placement depends only on the names, so a shard's URL can change
+    (failover, new host) without moving anyone, and adding a shard moves
+    roughly 1/N of users.
+    """
+
+    def __init__(self, names: list[str], vnodes: int = VIRTUAL_NODES):
+        if not names:
+            raise ValueError("At least one shard is required")
+        points = sorted(
+            (_hash(f"{name}#{index}"), name)
+            for name in names
+            for index in range(vnodes)
+        )
+        self._keys = [point for point, _ in points]
+        self._names = [name for _, name in points]
+
+    def shard_for(self, key: str) -> str:
+        index = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._names[index]
+
+
+def parse_shards(value: str) -> dict[str, str]:
+    """'name=url,name=url' -> {name: url}, keeping the configured order."""
+    shards: dict[str, str] = {}
+    for entry in value.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, sep, url = entry.partition("=")
+        if not sep or not name.strip() or not url.strip():
+            raise ValueError(f"Invalid shard entry {entry!r}, expected name=url")
+        if name.strip() in shards:
+            raise ValueError(f"Duplicate shard name {name.strip()!r}")
+        shards[name.strip()] = url.strip()
+    if not shards:
+        raise ValueError("No shards configured")
+    return shards
+
+
+def configured_shards(settings: Settings = settings) -> dict[str, str]:
+    """DATABASE_SHARDS, or DATABASE_URL as the single 'primary' shard."""
+    if settings.database_shards:
+        return parse_shards(settings.database_shards)
+    return {DEFAULT_SHARD: settings.database_url}
+
+
+SHARDS = configured_shards()
+SHARD_RING = HashRing(list(SHARDS))
+
+
+def shard_for_user(user_id: str | uuid.UUID, ring: HashRing = SHARD_RING) -> str:
+    return ring.shard_for(str(user_id))
+
+
+def is_sharded() -> bool:
+    return len(SHARDS) > 1
+
+
+async def ensure_not_moving(user_id: str) -> None:
+    """503 while a reshard is copying this user's rows to another shard."""
+    if not is_sharded():
+        return
+    try:
+        moving = await get_redis().sismember(MOVING_USERS_KEY, str(user_id))
+    except Exception as e:
+        # Fail closed: writing to a shard the user is being moved off loses
+        # the write, which is worse than a retry
+        logger.warning("Could not check shard move state: %s", e)
+        moving = True
+    if moving:
+        raise HTTPException(
+            status_code=503,
+            detail="Your data is being moved, please retry shortly",
+            headers={"Retry-After": "5"},
+        )
+
+
+async def mark_moving(user_ids: list[str]) -> None:
+    if user_ids:
+        await get_redis().sadd(
+            MOVING_USERS_KEY, *[str(user_id) for user_id in user_ids]
+        )
+
+
+async def clear_moving(user_id: str) -> None:
+    await get_redis().srem(MOVING_USERS_KEY, str(user_id))
@@ -0,0 +1,45 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.settings import get_settings
+from app.db.connect import connect_args
+from app.db.shards import SHARDS
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+
+@asynccontextmanager
+async def worker_engine(url: str | None = None) -> AsyncIterator[AsyncEngine]:
+    """Short-lived engine for Celery tasks.
+
+    Each task runs its own event loop, so connections can't be pooled across
+    tasks; NullPool opens and closes them within the task. DB_PGBOUNCER
+    applies here too, since workers go through the same bouncer.
+    """
+    engine = create_async_engine(
+        url or settings.database_url,
+        poolclass=NullPool,
+        connect_args=connect_args(settings),
+    )
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
+async def shard_worker_engines() -> AsyncIterator[tuple[str, AsyncEngine]]:
+    """(shard name, worker_engine) for every shard in turn; maintenance runs on each."""
+    for name, url in SHARDS.items():
+        async with worker_engine(url) as engine:
+            yield name, engine
+
+
+def run_async(coro: Awaitable[T]) -> T:
+    """Run a coroutine to completion from a synchronous Celery task."""
+    return asyncio.run(coro)
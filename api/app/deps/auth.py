@@ -1,16 +1,40 @@
-import json
+import hashlib
+import time
 from dataclasses import dataclass
 from typing import Annotated
 
-import httpx
-from cachetools import TTLCache
+from cachetools import TLRUCache
 from fastapi import Depends, HTTPException, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
+from jose.backends.base import Key
 
+from app.core.jwks import JWKSUnavailable, jwks_manager
+from app.core.metrics import AUTH_TOKEN_CACHE, AUTH_VERIFIED_TOKENS_CACHED
 from app.core.settings import Settings, get_settings
+from app.core.timing import add_auth_seconds
 
-jwks_cache = TTLCache(maxsize=1, ttl=86400)  # 24 hour cache
+
+def _token_expiry(_token_hash: bytes, entry: tuple[str, dict], now: float) -> float:
+    # Cached exactly until the token's own exp; tokens without exp aren't kept
+    _, claims = entry
+    try:
+        return float(claims["exp"])
+    except (KeyError, TypeError, ValueError):
+        return now
+
+
+# sha256(token) -> (kid, claims) for tokens whose signature already checked out
+verified_tokens: TLRUCache = TLRUCache(
+    maxsize=get_settings().verified_token_cache_size,
+    ttu=_token_expiry,
+    timer=time.time,
+)
+
+# Bound once: these run on every authenticated request
+_token_cache_hits = AUTH_TOKEN_CACHE.labels("hit")
+_token_cache_misses = AUTH_TOKEN_CACHE.labels("miss")
+AUTH_VERIFIED_TOKENS_CACHED.set_function(lambda: len(verified_tokens))
 
 
 @dataclass
@@ -21,54 +45,43 @@ class UserCtx:
 security = HTTPBearer()
 
 
-async def fetch_jwks(jwks_url: str) -> dict:
-    if "jwks" in jwks_cache:
-        return jwks_cache["jwks"]
+async def signing_key_for(token: str) -> tuple[str, Key]:
+    """Look up the token's signing key by kid (no network in steady state)."""
+    try:
+        kid = jwt.get_unverified_header(token).get("kid")
+    except JWTError as e:
+        raise HTTPException(
+            status_code=401,
+            detail=f"Invalid token: {str(e)}"
+        )
     
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(jwks_url, timeout=10.0)
-            response.raise_for_status()
-            jwks = response.json()
-            jwks_cache["jwks"] = jwks
-            return jwks
-        except httpx.RequestError as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to fetch JWKS: {str(e)}"
-            )
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"JWKS endpoint returned {e.response.status_code}"
-            )
+    if not kid:
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid token: missing kid"
+        )
+    
+    try:
+        key = await jwks_manager.get_key(kid)
+    except JWKSUnavailable:
+        raise HTTPException(
+            status_code=503,
+            detail="Signing keys unavailable, please retry shortly"
+        )
+    
+    if key is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid token: key not found"
+        )
+    return kid, key
 
 
-def verify_jwt_token(token: str, jwks: dict, audience: str) -> dict:
+def verify_jwt_token(token: str, key: Key, audience: str) -> dict:
     try:
-        unverified_header = jwt.get_unverified_header(token)
-        
-        rsa_key = None
-        for key in jwks["keys"]:
-            if key["kid"] == unverified_header["kid"]:
-                rsa_key = {
-                    "kty": key["kty"],
-                    "kid": key["kid"],
-                    "use": key["use"],
-                    "n": key["n"],
-                    "e": key["e"]
-                }
-                break
-        
-        if not rsa_key:
-            raise HTTPException(
-                status_code=401,
-                detail="Invalid token: key not found"
-            )
-        
         payload = jwt.decode(
             token,
-            rsa_key,
+            key,
             algorithms=["RS256"],
             audience=audience
         )
@@ -94,10 +107,22 @@ async def get_current_user(
         return user_ctx
     
     token = credentials.credentials
+    start = time.perf_counter()
     
     try:
-        jwks = await fetch_jwks(settings.supabase_jwks_url)
-        payload = verify_jwt_token(token, jwks, settings.supabase_audience)
+        token_hash = hashlib.sha256(token.encode("utf-8")).digest()
+        cached = verified_tokens.get(token_hash)
+        
+        # A hit skips signature verification entirely, unless the key that
+        # signed the token has since been dropped from the JWKS
+        if cached is not None and cached[0] in jwks_manager.keys:
+            payload = cached[1]
+            _token_cache_hits.inc()
+        else:
+            _token_cache_misses.inc()
+            kid, key = await signing_key_for(token)
+            payload = verify_jwt_token(token, key, settings.supabase_audience)
+            verified_tokens[token_hash] = (kid, payload)
         
         user_id = payload.get("sub")
         if not user_id:
@@ -116,4 +141,6 @@ async def get_current_user(
         raise HTTPException(
             status_code=401,
             detail=f"Authentication failed: {str(e)}"
-        )
\ No newline at end of file
+        )
+    finally:
+        add_auth_seconds(time.perf_counter() - start)
\ No newline at end of file
@@ -0,0 +1,20 @@
+from typing import Annotated
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from fastapi import Header, HTTPException
+
+UTC = ZoneInfo("UTC")
+
+
+def get_client_timezone(
+    x_timezone: Annotated[
+        str | None, Header(description="IANA timezone, e.g. Europe/Berlin")
+    ] = None,
+) -> ZoneInfo:
+    """Resolve the client's timezone for day boundaries, defaulting to UTC."""
+    if not x_timezone:
+        return UTC
+    try:
+        return ZoneInfo(x_timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {x_timezone}")
@@ -1,11 +1,18 @@
 # /api/app/main.py
+import hmac
 import logging
+import os
 from contextlib import asynccontextmanager
 
 import sentry_sdk
-from fastapi import FastAPI, Response
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
+from app.core.events import event_hub
+from app.core.jwks import jwks_manager
+from app.core.metrics import MetricsMiddleware, mark_process_dead, render_metrics
+from app.core.profiling import ProfilingMiddleware, profiling_enabled
 from app.core.settings import get_settings
 from app.routers import public, secure
 
@@ -22,7 +29,15 @@ except ImportError:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting Gentle API...")
+    # Dev auth is mocked, so there are no keys to keep warm
+    if get_settings().app_env != "dev":
+        await jwks_manager.start()
+    await event_hub.start()
     yield
+    await event_hub.stop()
+    await jwks_manager.stop()
+    # A worker that exits cleanly stops counting towards live gauges
+    mark_process_dead(os.getpid())
     logger.info("Shutting down Gentle API...")
 
 
@@ -46,6 +61,7 @@ def create_app() -> FastAPI:
         description="Empathetic productivity companion backend",
         version="0.1.0",
         lifespan=lifespan,
+        default_response_class=ORJSONResponse,
     )
 
     # ---- CORS: must be before any other middleware/routers ----
@@ -57,11 +73,31 @@ def create_app() -> FastAPI:
         allow_origins=resolved_origins,  # e.g. ["http://localhost:3000", "https://your-preview.vercel.app"]
         allow_credentials=False,  # using Bearer tokens, not cookies
         allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
-        allow_headers=["Authorization", "Content-Type", "X-Requested-With"],
-        expose_headers=["X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset"],
+        allow_headers=[
+            "Authorization",
+            "Content-Type",
+            "X-Requested-With",
+            "If-None-Match",
+            "X-Timezone",
+        ],
+        expose_headers=[
+            "ETag",
+            "X-RateLimit-Limit",
+            "X-RateLimit-Remaining",
+            "X-RateLimit-Reset",
+        ],
         max_age=86400,
     )
 
+    # Not in the stack at all unless PROFILING_SAMPLE_RATE or PROFILING_TOKEN is set
+    if profiling_enabled(settings):
+        app.add_middleware(ProfilingMiddleware, settings=settings)
+    
+    # Outermost, so latency covers every other middleware
+    app.add_middleware(
+        MetricsMiddleware, server_timing=settings.server_timing_enabled()
+    )
+
     # Catch-all OPTIONS to satisfy preflight for any path
     @app.options("/{full_path:path}")
     async def options_catch_all(full_path: str) -> Response:  # noqa: F401
@@ -75,6 +111,21 @@ def create_app() -> FastAPI:
     async def health_check():
         return {"ok": True}
 
+    # Internal only: route, pool and auth details. Keep it off the public
+    # ingress, or set METRICS_TOKEN and scrape with it.
+    metrics_authorization = (
+        f"Bearer {settings.metrics_token}".encode() if settings.metrics_token else None
+    )
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics(request: Request) -> Response:
+        if metrics_authorization is not None:
+            presented = request.headers.get("authorization", "").encode()
+            if not hmac.compare_digest(presented, metrics_authorization):
+                return Response(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+        payload, content_type = render_metrics()
+        return Response(content=payload, media_type=content_type)
+
     return app
 
 
@@ -0,0 +1,37 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.core.events import event_hub, sse_stream
+from app.deps.auth import UserCtx, get_current_user
+
+router = APIRouter()
+
+
+@router.get("", response_class=StreamingResponse)
+async def stream_events(current_user: Annotated[UserCtx, Depends(get_current_user)]):
+    """Server-sent events for the user's tasks, steps and celebrations.
+
+    Each event is a JSON `data:` line with `type` and `data`. Events are hints:
+    refetch (or GET /v1/sync) on `ready` and `resync`. Holds no DB session.
+    """
+
+    if event_hub.is_full():
+        raise HTTPException(
+            status_code=503,
+            detail="Too many open event streams, please retry shortly",
+            headers={"Retry-After": "30"},
+        )
+
+    return StreamingResponse(
+        sse_stream(current_user.user_id),
+        media_type="text/event-stream",
+        # No proxy buffering, or events sit in nginx until the buffer fills
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Example curl (-N disables curl's own buffering):
+# curl -N "http://localhost:8000/v1/events" \
+#   -H "Authorization: Bearer <your-jwt-token>"
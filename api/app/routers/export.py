@@ -0,0 +1,65 @@
+import uuid
+from datetime import date
+from typing import Annotated
+from zoneinfo import ZoneInfo
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_session, read_session_factory
+from app.deps.auth import UserCtx, get_current_user
+from app.deps.timezone import get_client_timezone
+from app.schemas.export import ImportResponse
+from app.services.export import export_ndjson, import_ndjson
+from app.services.users import ensure_user
+
+router = APIRouter()
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_data(current_user: Annotated[UserCtx, Depends(get_current_user)]):
+    """Stream all of the user's tasks, steps, moods and celebrations as NDJSON."""
+
+    session_factory = await read_session_factory(current_user.user_id)
+    filename = f"gentle-export-{date.today().isoformat()}.ndjson"
+
+    return StreamingResponse(
+        export_ndjson(session_factory, uuid.UUID(current_user.user_id)),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/import", response_model=ImportResponse)
+async def import_data(
+    request: Request,
+    current_user: Annotated[UserCtx, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    tz: Annotated[ZoneInfo, Depends(get_client_timezone)],
+):
+    """Load an NDJSON export into this account in one transaction."""
+
+    await ensure_user(session, current_user.user_id)
+
+    # The body is parsed as it arrives; only one write batch is held in memory
+    counts = await import_ndjson(
+        session, uuid.UUID(current_user.user_id), request.stream(), tz
+    )
+    await session.commit()
+
+    return ImportResponse(**counts)
+
+
+# Example curls:
+#
+# Export:
+# curl -X GET "http://localhost:8000/v1/export" \
+#   -H "Authorization: Bearer <your-jwt-token>" -o gentle-export.ndjson
+#
+# Import (e.g. into another environment):
+# curl -X POST "http://localhost:8000/v1/import" \
+#   -H "Authorization: Bearer <your-jwt-token>" \
+#   -H "Content-Type: application/x-ndjson" \
+#   -H "X-Timezone: Europe/Berlin" \
+#   --data-binary @gentle-export.ndjson
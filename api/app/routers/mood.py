@@ -1,16 +1,30 @@
 import uuid
+from datetime import datetime
 from typing import Annotated
+from zoneinfo import ZoneInfo
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import Mood, Task, Step, User
-from app.db.session import get_session
+from app.db.models import Mood, Step, Task
+from app.db.session import get_read_session, get_session
 from app.deps.auth import UserCtx, get_current_user
-from app.schemas.mood import MoodCheckinRequest, MoodResponse
+from app.deps.timezone import get_client_timezone
+from app.schemas.mood import (
+    MoodCheckinRequest,
+    MoodTrendDay,
+    MoodTrendsResponse,
+)
 from app.schemas.steps import TinyStepResponse
 from app.services.ai import generate_tiny_step_from_mood
+from app.services.moods import (
+    EMOTIONS,
+    MOOD_TASK_TITLE,
+    get_mood_rollups,
+    record_mood_rollup,
+    trend_window,
+)
+from app.services.users import ensure_user
 
 router = APIRouter()
 
@@ -19,20 +33,25 @@ router = APIRouter()
 async def mood_checkin(
     request: MoodCheckinRequest,
     current_user: Annotated[UserCtx, Depends(get_current_user)],
-    session: Annotated[AsyncSession, Depends(get_session)]
+    session: Annotated[AsyncSession, Depends(get_session)],
+    tz: Annotated[ZoneInfo, Depends(get_client_timezone)]
 ):
     """Check in mood and get a gentle, personalized tiny step."""
     
-    # Ensure user exists
-    user_result = await session.execute(
-        select(User).where(User.id == uuid.UUID(current_user.user_id))
+    # Local day of the check-in itself, not of whenever the AI call returns
+    checkin_day = datetime.now(tz).date()
+    
+    # Generate AI-powered tiny step before touching the database, so no
+    # transaction or row lock is held while it runs
+    ai_response = await generate_tiny_step_from_mood(
+        user_id=current_user.user_id,
+        energy=request.energy,
+        emotion=request.emotion,
+        note=request.note
     )
-    user = user_result.scalar_one_or_none()
     
-    if not user:
-        # Create user if doesn't exist
-        user = User(id=uuid.UUID(current_user.user_id))
-        session.add(user)
+    # Ensure user exists (cached, race-free upsert)
+    await ensure_user(session, current_user.user_id)
     
     # Create mood record
     mood = Mood(
@@ -43,19 +62,12 @@ async def mood_checkin(
     )
     session.add(mood)
     
-    # Generate AI-powered tiny step
-    ai_response = await generate_tiny_step_from_mood(
-        user_id=current_user.user_id,
-        energy=request.energy,
-        emotion=request.emotion,
-        note=request.note
-    )
-    
     # Create transient task for mood-driven step
     task = Task(
         user_id=uuid.UUID(current_user.user_id),
-        title=f"Gentle: mood-driven micro-step",
-        state="active"
+        title=MOOD_TASK_TITLE,
+        state="active",
+        kind="mood"
     )
     session.add(task)
     await session.flush()  # Get task ID
@@ -70,6 +82,16 @@ async def mood_checkin(
     session.add(step)
     await session.flush()  # Get step ID
     
+    # Keep the daily trends rollup in step with the raw check-in. Last
+    # before commit: the upsert locks the user's row for today.
+    await record_mood_rollup(
+        session,
+        user_id=uuid.UUID(current_user.user_id),
+        day=checkin_day,
+        energy=request.energy,
+        emotion=request.emotion
+    )
+    
     await session.commit()
     
     return TinyStepResponse(
@@ -79,8 +101,57 @@ async def mood_checkin(
     )
 
 
+@router.get("/trends", response_model=MoodTrendsResponse)
+async def mood_trends(
+    current_user: Annotated[UserCtx, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_read_session)],
+    tz: Annotated[ZoneInfo, Depends(get_client_timezone)],
+    days: Annotated[int, Query(ge=1, le=365)] = 30
+):
+    """Daily energy and emotion trends, read from the per-day rollup."""
+    
+    start_day, end_day = trend_window(datetime.now(tz).date(), days)
+    rollups = await get_mood_rollups(
+        session, uuid.UUID(current_user.user_id), start_day, end_day
+    )
+    
+    emotion_totals = {emotion: 0 for emotion in EMOTIONS}
+    trend_days = []
+    for rollup in rollups:
+        emotions = {
+            emotion: getattr(rollup, f"{emotion}_count") for emotion in EMOTIONS
+        }
+        for emotion, count in emotions.items():
+            emotion_totals[emotion] += count
+        trend_days.append(
+            MoodTrendDay(
+                day=rollup.day,
+                checkins=rollup.checkin_count,
+                avg_energy=rollup.energy_sum / rollup.checkin_count,
+                min_energy=rollup.energy_min,
+                max_energy=rollup.energy_max,
+                emotions=emotions
+            )
+        )
+    
+    total_checkins = sum(rollup.checkin_count for rollup in rollups)
+    total_energy = sum(rollup.energy_sum for rollup in rollups)
+    
+    return MoodTrendsResponse(
+        days=trend_days,
+        checkins=total_checkins,
+        avg_energy=total_energy / total_checkins if total_checkins else None,
+        emotions=emotion_totals
+    )
+
+
 # Example curl:
 # curl -X POST "http://localhost:8000/v1/mood/checkin" \
 #   -H "Authorization: Bearer <your-jwt-token>" \
 #   -H "Content-Type: application/json" \
-#   -d '{"energy": 2, "emotion": "anxious", "note": "Feeling overwhelmed with work"}'
\ No newline at end of file
+#   -d '{"energy": 2, "emotion": "anxious", "note": "Feeling overwhelmed with work"}'
+#
+# Mood trends for the last 90 days:
+# curl -X GET "http://localhost:8000/v1/mood/trends?days=90" \
+#   -H "Authorization: Bearer <your-jwt-token>" \
+#   -H "X-Timezone: Europe/Berlin"
\ No newline at end of file
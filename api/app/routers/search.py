@@ -0,0 +1,57 @@
+import uuid
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.responses import trusted_json
+from app.db.session import get_read_session
+from app.deps.auth import UserCtx, get_current_user
+from app.schemas.search import SearchPage
+from app.services.search import prefix_tsquery, search
+
+router = APIRouter()
+
+
+@router.get("", response_model=SearchPage)
+async def search_tasks_and_steps(
+    current_user: Annotated[UserCtx, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_read_session)],
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=50)] = 20,
+):
+    """Prefix search over task titles and step text, best matches first."""
+
+    tsquery = prefix_tsquery(q)
+    if tsquery is None:
+        return trusted_json({"items": [], "next_cursor": None})
+
+    after = None
+    if cursor:
+        rank, hit_id = decode_cursor(cursor, 2)
+        try:
+            after = (float(rank), uuid.UUID(hit_id))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    rows = await search(
+        session, uuid.UUID(current_user.user_id), tsquery, limit + 1, after
+    )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        # repr() round-trips the float exactly, so the next page starts cleanly
+        next_cursor = encode_cursor(repr(rows[-1]["rank"]), rows[-1]["hit_id"])
+
+    for row in rows:
+        del row["hit_id"]
+
+    return trusted_json({"items": rows, "next_cursor": next_cursor})
+
+
+# Example curl:
+# curl -X GET "http://localhost:8000/v1/search?q=groc&limit=20" \
+#   -H "Authorization: Bearer <your-jwt-token>"
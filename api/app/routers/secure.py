@@ -3,9 +3,14 @@ from typing import Annotated
 from fastapi import APIRouter, Depends
 
 from app.deps.auth import UserCtx, get_current_user
-from app.routers.tasks import router as tasks_router
+from app.routers.events import router as events_router
+from app.routers.export import router as export_router
 from app.routers.mood import router as mood_router
+from app.routers.search import router as search_router
+from app.routers.stats import router as stats_router
 from app.routers.steps import router as steps_router
+from app.routers.sync import router as sync_router
+from app.routers.tasks import router as tasks_router
 
 router = APIRouter()
 
@@ -13,6 +18,11 @@ router = APIRouter()
 router.include_router(tasks_router, prefix="/tasks")
 router.include_router(mood_router, prefix="/mood") 
 router.include_router(steps_router, prefix="/steps")
+router.include_router(stats_router, prefix="/stats")
+router.include_router(search_router, prefix="/search")
+router.include_router(sync_router, prefix="/sync")
+router.include_router(export_router)
+router.include_router(events_router, prefix="/events")
 
 
 @router.get("/ping")
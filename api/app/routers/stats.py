@@ -0,0 +1,34 @@
+import uuid
+from typing import Annotated
+from zoneinfo import ZoneInfo
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.timing import query_budget
+from app.db.session import get_read_session
+from app.deps.auth import UserCtx, get_current_user
+from app.deps.timezone import get_client_timezone
+from app.schemas.stats import UserStatsResponse
+from app.services.stats import get_user_stats, stats_response
+
+router = APIRouter()
+
+
+@router.get("", response_model=UserStatsResponse)
+@query_budget(1)
+async def get_stats(
+    current_user: Annotated[UserCtx, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_read_session)],
+    tz: Annotated[ZoneInfo, Depends(get_client_timezone)],
+):
+    """Step completion counts and streaks for the current user."""
+
+    stats = await get_user_stats(session, uuid.UUID(current_user.user_id))
+    return stats_response(stats, tz)
+
+
+# Example curl:
+# curl -X GET "http://localhost:8000/v1/stats" \
+#   -H "Authorization: Bearer <your-jwt-token>" \
+#   -H "X-Timezone: America/New_York"
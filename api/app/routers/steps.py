@@ -1,25 +1,132 @@
 import uuid
 from typing import Annotated, List
+from zoneinfo import ZoneInfo
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select, func
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import Step, Task, Celebration
-from app.db.session import get_session
+from app.core.etag import etag_matches, make_etag, not_modified, set_etag_headers
+from app.core.events import STEPS_COMPLETED, STEPS_UPDATED, TASK_UPDATED, publish_event
+from app.core.responses import trusted_json
+from app.core.timing import query_budget
+from app.db.models import Celebration, Step, Task
+from app.db.session import get_read_session, get_session
 from app.deps.auth import UserCtx, get_current_user
-from app.schemas.steps import StepResponse
+from app.deps.timezone import get_client_timezone
+from app.schemas.steps import (
+    NextStepResponse,
+    StepBatchRequest,
+    StepBatchResponse,
+    StepResponse,
+)
 from app.services.ai import rebalance_too_big
-from app.tasks.celebrations import send_celebration
+from app.services.outbox import enqueue_celebration
+from app.services.stats import (
+    celebration_message,
+    get_user_stats,
+    record_completions,
+    stats_response,
+)
+from app.services.steps import (
+    apply_step_operations,
+    next_step_payload,
+    next_step_statement,
+)
 
 router = APIRouter()
 
 
+@router.get("/next", response_model=NextStepResponse)
+@query_budget(1)
+async def get_next_step(
+    request: Request,
+    current_user: Annotated[UserCtx, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_read_session)]
+):
+    """The user's next pending step across open tasks; cheap enough to poll."""
+    
+    result = await session.execute(next_step_statement(uuid.UUID(current_user.user_id)))
+    row = result.mappings().first()
+    
+    if row is None:
+        etag = make_etag("next-step", current_user.user_id, None)
+    else:
+        etag = make_etag(
+            "next-step",
+            row["task_id"],
+            row["task_updated_at"],
+            row["step_id"],
+            row["remaining"],
+        )
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    
+    response = trusted_json(next_step_payload(row))
+    set_etag_headers(response, etag)
+    return response
+
+
+@router.post("/batch", response_model=StepBatchResponse)
+@query_budget(10)
+async def batch_step_operations(
+    request: StepBatchRequest,
+    current_user: Annotated[UserCtx, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    tz: Annotated[ZoneInfo, Depends(get_client_timezone)]
+):
+    """Complete, reopen or reorder many steps in a single transaction."""
+    
+    result = await apply_step_operations(
+        session, current_user.user_id, request.operations
+    )
+    
+    if result.missing_step_ids:
+        raise HTTPException(status_code=404, detail="Step not found")
+    
+    stats = None
+    if result.completed_step_ids:
+        user_stats = await record_completions(
+            session, uuid.UUID(current_user.user_id), len(result.completed_step_ids), tz
+        )
+        stats = stats_response(user_stats, tz)
+        
+        # One aggregated celebration instead of one per completed step,
+        # committed together with the steps
+        enqueue_celebration(session, current_user.user_id, result.completed_step_ids)
+    
+    await session.commit()
+    
+    if result.completed_step_ids:
+        await publish_event(
+            current_user.user_id,
+            STEPS_COMPLETED,
+            step_ids=result.completed_step_ids,
+            completed_task_ids=result.completed_task_ids
+        )
+    if result.reopened_step_ids or result.reordered_step_ids:
+        await publish_event(
+            current_user.user_id,
+            STEPS_UPDATED,
+            step_ids=result.reopened_step_ids + result.reordered_step_ids
+        )
+    
+    return StepBatchResponse(
+        completed=len(result.completed_step_ids),
+        reopened=len(result.reopened_step_ids),
+        reordered=len(result.reordered_step_ids),
+        completed_task_ids=result.completed_task_ids,
+        stats=stats
+    )
+
+
 @router.post("/{step_id}/complete")
+@query_budget(7)
 async def complete_step(
     step_id: uuid.UUID,
     current_user: Annotated[UserCtx, Depends(get_current_user)],
-    session: Annotated[AsyncSession, Depends(get_session)]
+    session: Annotated[AsyncSession, Depends(get_session)],
+    tz: Annotated[ZoneInfo, Depends(get_client_timezone)]
 ):
     """Mark a step as complete and trigger celebration."""
     
@@ -37,6 +144,9 @@ async def complete_step(
     
     step, task = result
     
+    # Completing an already-done step must not count twice
+    newly_completed = step.state != "done"
+    
     # Mark step as done
     step.state = "done"
     
@@ -59,26 +169,43 @@ async def complete_step(
     
     task_completed = False
     if remaining_count == 0:
+        if task.state != "done":
+            task.completed_at = func.now()
         task.state = "done"
         task_completed = True
     
+    # Bump the task watermark so cached task details revalidate
+    task.updated_at = func.now()
+    
+    # Stats come back from the same upsert, so personalizing is free
+    if newly_completed:
+        user_stats = await record_completions(session, task.user_id, 1, tz)
+    else:
+        user_stats = await get_user_stats(session, task.user_id)
+    stats = stats_response(user_stats, tz)
+    
+    # Celebration task goes out via the outbox once this commits
+    enqueue_celebration(session, current_user.user_id, [step.id])
+    
     await session.commit()
     
-    # Enqueue celebration task
-    send_celebration.delay(
-        user_id=current_user.user_id,
-        step_id=str(step.id),
-        kind="confetti"
+    await publish_event(
+        current_user.user_id,
+        STEPS_COMPLETED,
+        step_ids=[step.id],
+        completed_task_ids=[task.id] if task_completed else []
     )
     
     return {
         "kind": "confetti",
-        "message": "You did it! 🎉",
-        "taskCompleted": task_completed
+        "message": celebration_message(stats),
+        "taskCompleted": task_completed,
+        "stats": stats.model_dump(mode="json")
     }
 
 
 @router.post("/{step_id}/too-big", response_model=List[StepResponse])
+@query_budget(4)
 async def rebalance_step(
     step_id: uuid.UUID,
     current_user: Annotated[UserCtx, Depends(get_current_user)],
@@ -121,11 +248,12 @@ async def rebalance_step(
         session.add(new_step)
         created_steps.append(new_step)
     
-    await session.commit()
+    # Bump the task watermark so cached task details revalidate
+    task.updated_at = func.now()
     
-    # Refresh to get all fields
-    for new_step in created_steps:
-        await session.refresh(new_step)
+    # created_at comes back from the batched INSERT ... RETURNING
+    await session.commit()
+    await publish_event(current_user.user_id, TASK_UPDATED, task_id=task.id)
     
     return [
         StepResponse(
@@ -142,6 +270,20 @@ async def rebalance_step(
 
 # Example curls:
 #
+# Next step across open tasks (poll with If-None-Match):
+# curl -X GET "http://localhost:8000/v1/steps/next" \
+#   -H "Authorization: Bearer <your-jwt-token>"
+#
+# Batch operations:
+# curl -X POST "http://localhost:8000/v1/steps/batch" \
+#   -H "Authorization: Bearer <your-jwt-token>" \
+#   -H "Content-Type: application/json" \
+#   -d '{"operations": [
+#         {"op": "complete", "step_id": "123e4567-e89b-12d3-a456-426614174000"},
+#         {"op": "reorder", "step_id": "123e4567-e89b-12d3-a456-426614174001",
+#          "order": 1}
+#       ]}'
+#
 # Complete step:
 # curl -X POST "http://localhost:8000/v1/steps/123e4567-e89b-12d3-a456-426614174000/complete" \
 #   -H "Authorization: Bearer <your-jwt-token>"
@@ -0,0 +1,94 @@
+import uuid
+from typing import Annotated
+from zoneinfo import ZoneInfo
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.events import SYNC_CHANGED, publish_event
+from app.core.responses import trusted_json
+from app.db.session import get_read_session, get_session
+from app.deps.auth import UserCtx, get_current_user
+from app.deps.timezone import get_client_timezone
+from app.schemas.sync import SyncPushRequest, SyncPushResponse, SyncResponse
+from app.services.outbox import enqueue_celebration
+from app.services.stats import record_completions, stats_response
+from app.services.sync import apply_push, sync_changes
+from app.services.users import ensure_user
+
+router = APIRouter()
+
+
+@router.get("", response_model=SyncResponse)
+async def sync(
+    current_user: Annotated[UserCtx, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_read_session)],
+    since: str | None = None,
+):
+    """Tasks, steps and moods changed since the cursor, plus deletions."""
+
+    changes = await sync_changes(session, uuid.UUID(current_user.user_id), since)
+    return trusted_json(changes)
+
+
+@router.post("/push", response_model=SyncPushResponse)
+async def sync_push(
+    request: SyncPushRequest,
+    current_user: Annotated[UserCtx, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    tz: Annotated[ZoneInfo, Depends(get_client_timezone)],
+):
+    """Apply mutations queued while offline in one transaction."""
+
+    user_id = uuid.UUID(current_user.user_id)
+    await ensure_user(session, current_user.user_id)
+
+    result = await apply_push(session, user_id, request, tz)
+
+    stats = None
+    if result.steps.completed_step_ids:
+        user_stats = await record_completions(
+            session, user_id, len(result.steps.completed_step_ids), tz
+        )
+        stats = stats_response(user_stats, tz)
+        enqueue_celebration(
+            session, current_user.user_id, result.steps.completed_step_ids
+        )
+
+    await session.commit()
+    # Other devices pull the delta instead of waiting for their next poll
+    await publish_event(current_user.user_id, SYNC_CHANGED)
+
+    return SyncPushResponse(
+        tasks_created=result.tasks_created,
+        moods_recorded=result.moods_recorded,
+        completed=len(result.steps.completed_step_ids),
+        reopened=len(result.steps.reopened_step_ids),
+        reordered=len(result.steps.reordered_step_ids),
+        completed_task_ids=result.steps.completed_task_ids,
+        missing_step_ids=result.missing_step_ids,
+        rejected_mood_ids=result.rejected_mood_ids,
+        stats=stats,
+    )
+
+
+# Example curls:
+#
+# Initial sync (full snapshot), then deltas with the returned cursor:
+# curl -X GET "http://localhost:8000/v1/sync" \
+#   -H "Authorization: Bearer <your-jwt-token>"
+# curl -X GET "http://localhost:8000/v1/sync?since=<cursor>" \
+#   -H "Authorization: Bearer <your-jwt-token>"
+#
+# Push queued offline mutations:
+# curl -X POST "http://localhost:8000/v1/sync/push" \
+#   -H "Authorization: Bearer <your-jwt-token>" \
+#   -H "Content-Type: application/json" \
+#   -H "X-Timezone: Europe/Berlin" \
+#   -d '{"tasks": [{"id": "9f0c3d1e-2a4b-4c5d-8e6f-7a8b9c0d1e2f",
+#                   "title": "Call the bank"}],
+#        "steps": [{"op": "complete",
+#                   "step_id": "123e4567-e89b-12d3-a456-426614174000"}],
+#        "moods": [{"id": "4b1a2c3d-5e6f-4a7b-8c9d-0e1f2a3b4c5d",
+#                   "energy": 2, "emotion": "tired",
+#                   "created_at": "2026-10-18T21:04:00+02:00"}]}'
@@ -1,94 +1,222 @@
 import uuid
+from datetime import datetime
 from typing import Annotated, List
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import func, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from app.db.models import Task, Step, User
-from app.db.session import get_session
+from app.core.etag import etag_matches, make_etag, not_modified, set_etag_headers
+from app.core.events import BREAKDOWN_FINISHED, TASK_UPDATED, publish_event
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.responses import rows_to_dicts, trusted_json
+from app.core.timing import query_budget
+from app.db.models import ArchivedStep, ArchivedTask, Step, Task
+from app.db.session import get_read_session, get_session
 from app.deps.auth import UserCtx, get_current_user
-from app.schemas.tasks import TaskCreateRequest, TaskResponse, TaskListItem, TaskDetailResponse
-from app.schemas.steps import StepResponse
+from app.schemas.steps import NextStepResponse, StepResponse
+from app.schemas.tasks import (
+    ArchivedTaskDetailResponse,
+    TaskCreateRequest,
+    TaskDetailResponse,
+    TaskHistoryPage,
+    TaskListItem,
+    TaskResponse,
+)
 from app.services.ai import breakdown_task
+from app.services.steps import next_step_payload, next_step_statement
+from app.services.users import ensure_user
 
 router = APIRouter()
 
 
+# Columns served by the list/detail endpoints; selected directly so no ORM
+# instances are built on the hot read path
+TASK_COLUMNS = (Task.id, Task.title, Task.state, Task.created_at, Task.updated_at)
+STEP_COLUMNS = (
+    Step.id, Step.task_id, Step.content, Step.order, Step.state, Step.created_at
+)
+ARCHIVED_TASK_COLUMNS = (
+    ArchivedTask.id, ArchivedTask.title, ArchivedTask.state,
+    ArchivedTask.created_at, ArchivedTask.updated_at, ArchivedTask.archived_at,
+)
+ARCHIVED_STEP_COLUMNS = (
+    ArchivedStep.id, ArchivedStep.task_id, ArchivedStep.content,
+    ArchivedStep.order, ArchivedStep.state, ArchivedStep.created_at,
+)
+
+
 @router.get("", response_model=List[TaskListItem])
+@query_budget(2)
 async def get_tasks(
+    request: Request,
     current_user: Annotated[UserCtx, Depends(get_current_user)],
-    session: Annotated[AsyncSession, Depends(get_session)]
+    session: Annotated[AsyncSession, Depends(get_read_session)]
 ):
     """Get all tasks for the current user, ordered by created_at desc."""
     
+    # Cheap change watermark: any insert, update or delete moves max/count
+    watermark_result = await session.execute(
+        select(func.max(Task.updated_at), func.count(Task.id))
+        .where(Task.user_id == uuid.UUID(current_user.user_id))
+    )
+    last_updated_at, task_count = watermark_result.one()
+    etag = make_etag("tasks", current_user.user_id, last_updated_at, task_count)
+    
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    
     # Get tasks for current user
     tasks_result = await session.execute(
-        select(Task)
+        select(*TASK_COLUMNS)
         .where(Task.user_id == uuid.UUID(current_user.user_id))
         .order_by(Task.created_at.desc())
     )
-    tasks = tasks_result.scalars().all()
     
-    return [
-        TaskListItem(
-            id=task.id,
-            title=task.title,
-            state=task.state,
-            created_at=task.created_at,
-            updated_at=task.updated_at
+    response = trusted_json(rows_to_dicts(tasks_result.mappings()))
+    set_etag_headers(response, etag)
+    return response
+
+
+# Declared before /{task_id} so "history" is not parsed as a task id
+@router.get("/history", response_model=TaskHistoryPage)
+@query_budget(1)
+async def get_task_history(
+    current_user: Annotated[UserCtx, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_read_session)],
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20
+):
+    """Archived tasks, newest archived first, with keyset pagination."""
+    
+    query = (
+        select(*ARCHIVED_TASK_COLUMNS)
+        .where(ArchivedTask.user_id == uuid.UUID(current_user.user_id))
+        .order_by(ArchivedTask.archived_at.desc(), ArchivedTask.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        archived_at, task_id = decode_cursor(cursor, 2)
+        try:
+            after = (datetime.fromisoformat(archived_at), uuid.UUID(task_id))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(tuple_(ArchivedTask.archived_at, ArchivedTask.id) < after)
+    
+    rows = rows_to_dicts((await session.execute(query)).mappings())
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["archived_at"].isoformat(), rows[-1]["id"])
+    
+    return trusted_json({"items": rows, "next_cursor": next_cursor})
+
+
+@router.get("/history/{task_id}", response_model=ArchivedTaskDetailResponse)
+@query_budget(2)
+async def get_archived_task_detail(
+    task_id: uuid.UUID,
+    current_user: Annotated[UserCtx, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_read_session)]
+):
+    """An archived task with its steps."""
+    
+    task_result = await session.execute(
+        select(*ARCHIVED_TASK_COLUMNS).where(
+            ArchivedTask.id == task_id,
+            ArchivedTask.user_id == uuid.UUID(current_user.user_id)
         )
-        for task in tasks
-    ]
+    )
+    task = task_result.mappings().first()
+    
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    steps_result = await session.execute(
+        select(*ARCHIVED_STEP_COLUMNS)
+        .where(ArchivedStep.task_id == task_id)
+        .order_by(ArchivedStep.order)
+    )
+    
+    return trusted_json({**task, "steps": rows_to_dicts(steps_result.mappings())})
 
 
 @router.get("/{task_id}", response_model=TaskDetailResponse)
+@query_budget(2)
 async def get_task_detail(
     task_id: uuid.UUID,
+    request: Request,
     current_user: Annotated[UserCtx, Depends(get_current_user)],
-    session: Annotated[AsyncSession, Depends(get_session)]
+    session: Annotated[AsyncSession, Depends(get_read_session)]
 ):
     """Get task details with steps, ordered by step order."""
     
-    # Get task with steps and verify ownership
+    # Step mutations touch tasks.updated_at, so it plus the step count
+    # identifies this representation; the task columns ride along for free
     task_result = await session.execute(
-        select(Task)
-        .options(selectinload(Task.steps))
+        select(*TASK_COLUMNS, func.count(Step.id).label("step_count"))
+        .outerjoin(Step, Step.task_id == Task.id)
         .where(
             Task.id == task_id,
             Task.user_id == uuid.UUID(current_user.user_id)
         )
+        .group_by(Task.id)
     )
-    task = task_result.scalar_one_or_none()
+    task = task_result.mappings().first()
     
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    # Sort steps by order
-    steps = sorted(task.steps, key=lambda s: s.order)
+    task = dict(task)
+    step_count = task.pop("step_count")
+    etag = make_etag("task", task_id, task["updated_at"], step_count)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
     
-    return TaskDetailResponse(
-        id=task.id,
-        title=task.title,
-        state=task.state,
-        created_at=task.created_at,
-        updated_at=task.updated_at,
-        steps=[
-            StepResponse(
-                id=step.id,
-                task_id=step.task_id,
-                content=step.content,
-                order=step.order,
-                state=step.state,
-                created_at=step.created_at
-            )
-            for step in steps
-        ]
+    # Steps already sorted by the database
+    steps_result = await session.execute(
+        select(*STEP_COLUMNS)
+        .where(Step.task_id == task_id)
+        .order_by(Step.order)
     )
+    
+    response = trusted_json({**task, "steps": rows_to_dicts(steps_result.mappings())})
+    set_etag_headers(response, etag)
+    return response
+
+
+@router.get("/{task_id}/next-step", response_model=NextStepResponse)
+@query_budget(1)
+async def get_task_next_step(
+    task_id: uuid.UUID,
+    request: Request,
+    current_user: Annotated[UserCtx, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_read_session)]
+):
+    """The task's next pending step and how many are left, for the focus view."""
+    
+    result = await session.execute(
+        next_step_statement(uuid.UUID(current_user.user_id), task_id)
+    )
+    row = result.mappings().first()
+    
+    if not row:
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    etag = make_etag(
+        "next-step", task_id, row["task_updated_at"], row["step_id"], row["remaining"]
+    )
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    
+    response = trusted_json(next_step_payload(row))
+    set_etag_headers(response, etag)
+    return response
 
 
 @router.post("", response_model=TaskResponse)
+@query_budget(3)
 async def create_task(
     request: TaskCreateRequest,
     current_user: Annotated[UserCtx, Depends(get_current_user)],
@@ -96,16 +224,8 @@ async def create_task(
 ):
     """Create a new task."""
     
-    # Ensure user exists
-    user_result = await session.execute(
-        select(User).where(User.id == uuid.UUID(current_user.user_id))
-    )
-    user = user_result.scalar_one_or_none()
-    
-    if not user:
-        # Create user if doesn't exist
-        user = User(id=uuid.UUID(current_user.user_id))
-        session.add(user)
+    # Ensure user exists (cached, race-free upsert)
+    await ensure_user(session, current_user.user_id)
     
     # Create task
     task = Task(
@@ -116,6 +236,7 @@ async def create_task(
     session.add(task)
     await session.commit()
     await session.refresh(task)
+    await publish_event(current_user.user_id, TASK_UPDATED, task_id=task.id)
     
     return TaskResponse(
         id=task.id,
@@ -127,6 +248,7 @@ async def create_task(
 
 
 @router.post("/{task_id}/breakdown", response_model=List[StepResponse])
+@query_budget(3)
 async def breakdown_task_endpoint(
     task_id: uuid.UUID,
     current_user: Annotated[UserCtx, Depends(get_current_user)],
@@ -163,11 +285,18 @@ async def breakdown_task_endpoint(
         session.add(step)
         created_steps.append(step)
     
-    await session.commit()
+    # Bump the task watermark so cached task details revalidate
+    task.updated_at = func.now()
     
-    # Refresh to get all fields
-    for step in created_steps:
-        await session.refresh(step)
+    # One INSERT ... RETURNING for all steps also fills created_at, and
+    # sessions don't expire on commit, so no per-step refresh is needed
+    await session.commit()
+    await publish_event(
+        current_user.user_id,
+        BREAKDOWN_FINISHED,
+        task_id=task.id,
+        step_count=len(created_steps),
+    )
     
     return [
         StepResponse(
@@ -192,12 +321,25 @@ async def breakdown_task_endpoint(
 # curl -X GET "http://localhost:8000/v1/tasks/123e4567-e89b-12d3-a456-426614174000" \
 #   -H "Authorization: Bearer <your-jwt-token>"
 #
+# Revalidate task detail (returns 304 when unchanged):
+# curl -i -X GET "http://localhost:8000/v1/tasks/123e4567-e89b-12d3-a456-426614174000" \
+#   -H "Authorization: Bearer <your-jwt-token>" \
+#   -H 'If-None-Match: "<etag-from-previous-response>"'
+#
+# Archived task history (pass next_cursor back as ?cursor=):
+# curl -X GET "http://localhost:8000/v1/tasks/history?limit=20" \
+#   -H "Authorization: Bearer <your-jwt-token>"
+#
 # Create task:
 # curl -X POST "http://localhost:8000/v1/tasks" \
 #   -H "Authorization: Bearer <your-jwt-token>" \
 #   -H "Content-Type: application/json" \
 #   -d '{"title": "Organize my workspace"}'
 #
+# Next step of a task:
+# curl "http://localhost:8000/v1/tasks/123e4567-e89b-12d3-a456-426614174000/next-step" \
+#   -H "Authorization: Bearer <your-jwt-token>"
+#
 # Breakdown task:
 # curl -X POST "http://localhost:8000/v1/tasks/123e4567-e89b-12d3-a456-426614174000/breakdown" \
 #   -H "Authorization: Bearer <your-jwt-token>"
\ No newline at end of file
@@ -0,0 +1,68 @@
+import uuid
+from datetime import datetime
+from typing import Literal
+
+from pydantic import AwareDatetime, BaseModel, ConfigDict, Field
+
+# One JSON object per line; "type" says which table the row belongs to.
+# The first line is {"type": "export", "version": EXPORT_VERSION, ...}.
+EXPORT_VERSION = 1
+
+
+class ExportTask(BaseModel):
+    model_config = ConfigDict(extra='ignore')
+
+    id: uuid.UUID
+    title: str = Field(..., min_length=1)
+    state: Literal['pending', 'active', 'done', 'archived']
+    # Absent from files exported before tasks had a kind
+    kind: Literal['user', 'mood'] = 'user'
+    created_at: datetime
+    updated_at: datetime
+
+
+class ExportStep(BaseModel):
+    model_config = ConfigDict(extra='ignore')
+
+    id: uuid.UUID
+    task_id: uuid.UUID
+    content: str
+    order: int
+    state: Literal['pending', 'done']
+    created_at: datetime
+
+
+class ExportMood(BaseModel):
+    model_config = ConfigDict(extra='ignore')
+
+    id: uuid.UUID
+    energy: int = Field(..., ge=0, le=4)
+    emotion: Literal['calm', 'anxious', 'tired', 'energized', 'low', 'mixed']
+    note: str | None = None
+    # Aware, so it can be checked against the partitioned range
+    created_at: AwareDatetime
+
+
+class ExportCelebration(BaseModel):
+    model_config = ConfigDict(extra='ignore')
+
+    id: uuid.UUID
+    step_id: uuid.UUID | None = None
+    kind: Literal['confetti', 'breath', 'sound']
+    created_at: AwareDatetime
+
+
+class ImportResponse(BaseModel):
+    tasks: int = Field(
+        ..., description="Rows inserted; ids that already existed are skipped"
+    )
+    steps: int
+    moods: int
+    celebrations: int
+    skipped: int = Field(
+        0,
+        description=(
+            "Moods and celebrations dated before partition retention or in the "
+            "future; not imported"
+        ),
+    )
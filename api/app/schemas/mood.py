@@ -1,6 +1,6 @@
 import uuid
-from datetime import datetime
-from typing import Literal
+from datetime import date, datetime
+from typing import Dict, List, Literal
 
 from pydantic import BaseModel, Field
 
@@ -19,4 +19,21 @@ class MoodResponse(BaseModel):
 class TinyStepResponse(BaseModel):
     step_id: uuid.UUID
     content: str
-    rationale: str = Field(..., description="Why this step is tiny and achievable")
\ No newline at end of file
+    rationale: str = Field(..., description="Why this step is tiny and achievable")
+
+class MoodTrendDay(BaseModel):
+    day: date
+    checkins: int
+    avg_energy: float
+    min_energy: int
+    max_energy: int
+    emotions: Dict[str, int]
+
+
+class MoodTrendsResponse(BaseModel):
+    days: List[MoodTrendDay]
+    checkins: int
+    avg_energy: float | None = Field(None, description="Average energy over the window")
+    emotions: Dict[str, int] = Field(
+        ..., description="Emotion histogram over the window"
+    )
@@ -0,0 +1,22 @@
+import uuid
+from typing import List, Literal
+
+from pydantic import BaseModel, Field
+
+
+class SearchHit(BaseModel):
+    kind: Literal['task', 'step']
+    task_id: uuid.UUID
+    step_id: uuid.UUID | None
+    title: str
+    content: str | None = Field(None, description="Matching step text for step hits")
+    task_state: Literal['pending', 'active', 'done', 'archived']
+    archived: bool = Field(False, description="Open via /v1/tasks/history/{task_id}")
+    rank: float
+
+
+class SearchPage(BaseModel):
+    items: List[SearchHit]
+    next_cursor: str | None = Field(
+        None, description="Pass as ?cursor= to fetch the next page"
+    )
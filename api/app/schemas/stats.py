@@ -0,0 +1,12 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class UserStatsResponse(BaseModel):
+    completions_today: int
+    completions_this_week: int
+    completions_total: int
+    current_streak: int
+    longest_streak: int
+    last_completion_at: datetime | None
@@ -1,8 +1,10 @@
 import uuid
 from datetime import datetime
-from typing import Literal
+from typing import List, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+from .stats import UserStatsResponse
 
 
 class TinyStepResponse(BaseModel):
@@ -17,4 +19,45 @@ class StepResponse(BaseModel):
     content: str
     order: int
     state: Literal['pending', 'done']
-    created_at: datetime
\ No newline at end of file
+    created_at: datetime
+
+class StepOperation(BaseModel):
+    op: Literal['complete', 'reopen', 'reorder']
+    step_id: uuid.UUID
+    order: int | None = Field(
+        None,
+        ge=1,
+        description=(
+            "New 1-based position, required for reorder; the other steps shift "
+            "to make room"
+        ),
+    )
+
+    @model_validator(mode="after")
+    def check_order(self) -> "StepOperation":
+        if self.op == "reorder" and self.order is None:
+            raise ValueError("order is required for reorder operations")
+        return self
+
+
+class StepBatchRequest(BaseModel):
+    operations: List[StepOperation] = Field(..., min_length=1, max_length=500)
+
+
+class StepBatchResponse(BaseModel):
+    completed: int
+    reopened: int
+    reordered: int
+    completed_task_ids: List[uuid.UUID]
+    stats: UserStatsResponse | None = None
+
+
+class NextStepResponse(BaseModel):
+    task_id: uuid.UUID | None
+    task_title: str | None
+    step: StepResponse | None = Field(
+        None, description="Lowest-order pending step, if any"
+    )
+    remaining: int = Field(
+        ..., description="Pending steps left in the task, including this one"
+    )
@@ -0,0 +1,78 @@
+import uuid
+from datetime import datetime
+from typing import List, Literal
+
+from pydantic import AwareDatetime, BaseModel, Field
+
+from .stats import UserStatsResponse
+from .steps import StepOperation, StepResponse
+from .tasks import TaskListItem
+
+
+class SyncMood(BaseModel):
+    id: uuid.UUID
+    energy: int
+    emotion: Literal['calm', 'anxious', 'tired', 'energized', 'low', 'mixed']
+    note: str | None
+    created_at: datetime
+
+
+class SyncDeleted(BaseModel):
+    entity: Literal['task', 'step', 'mood']
+    id: uuid.UUID
+
+
+class SyncResponse(BaseModel):
+    cursor: str = Field(..., description="Pass as ?since= on the next sync")
+    reset: bool = Field(
+        ..., description="True when this is a full snapshot; drop local state first"
+    )
+    tasks: List[TaskListItem]
+    steps: List[StepResponse]
+    moods: List[SyncMood]
+    deleted: List[SyncDeleted]
+
+
+class SyncTaskCreate(BaseModel):
+    id: uuid.UUID = Field(
+        ..., description="Client-generated id, makes retries idempotent"
+    )
+    title: str = Field(..., min_length=1)
+
+
+class SyncMoodCreate(BaseModel):
+    id: uuid.UUID = Field(
+        ..., description="Client-generated id, makes retries idempotent"
+    )
+    energy: int = Field(..., ge=0, le=4)
+    emotion: Literal['calm', 'anxious', 'tired', 'energized', 'low', 'mixed']
+    note: str | None = None
+    created_at: AwareDatetime = Field(
+        ..., description="When the check-in happened on the device"
+    )
+
+
+class SyncPushRequest(BaseModel):
+    tasks: List[SyncTaskCreate] = Field(default_factory=list, max_length=500)
+    steps: List[StepOperation] = Field(default_factory=list, max_length=500)
+    moods: List[SyncMoodCreate] = Field(default_factory=list, max_length=500)
+
+
+class SyncPushResponse(BaseModel):
+    tasks_created: int
+    moods_recorded: int
+    completed: int
+    reopened: int
+    reordered: int
+    completed_task_ids: List[uuid.UUID]
+    missing_step_ids: List[uuid.UUID] = Field(
+        ..., description="Steps deleted on the server; their operations were skipped"
+    )
+    rejected_mood_ids: List[uuid.UUID] = Field(
+        ...,
+        description=(
+            "Moods dated in the future or before the retention window; "
+            "not recorded"
+        ),
+    )
+    stats: UserStatsResponse | None = None
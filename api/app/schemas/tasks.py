@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from typing import Literal, List
+from typing import List, Literal
 
 from pydantic import BaseModel, Field
 
@@ -33,4 +33,23 @@ class TaskDetailResponse(BaseModel):
     state: Literal['pending', 'active', 'done', 'archived']
     created_at: datetime
     updated_at: datetime
-    steps: List[StepResponse]
\ No newline at end of file
+    steps: List[StepResponse]
+
+class ArchivedTaskItem(BaseModel):
+    id: uuid.UUID
+    title: str
+    state: Literal['pending', 'active', 'done', 'archived']
+    created_at: datetime
+    updated_at: datetime
+    archived_at: datetime
+
+
+class ArchivedTaskDetailResponse(ArchivedTaskItem):
+    steps: List[StepResponse]
+
+
+class TaskHistoryPage(BaseModel):
+    items: List[ArchivedTaskItem]
+    next_cursor: str | None = Field(
+        None, description="Pass as ?cursor= to fetch the next page"
+    )
@@ -1,11 +1,14 @@
 import json
 import logging
 import re
+import time
 from typing import Any, Dict, List
 
 from openai import OpenAI
 
+from app.core.metrics import AI_FALLBACKS, AI_REQUEST_DURATION, AI_TOKENS
 from app.core.settings import get_settings
+from app.core.timing import add_ai_seconds
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +33,7 @@ def _get_openai_client() -> OpenAI | None:
                 api_key=settings.openai_api_key,
                 organization=settings.openai_org_id,
                 project=settings.openai_project_id,
+                base_url=settings.openai_base_url,
                 timeout=15.0
             )
         except Exception as e:
@@ -40,6 +44,7 @@ def _get_openai_client() -> OpenAI | None:
         try:
             return OpenAI(
                 api_key=settings.openai_api_key,
+                base_url=settings.openai_base_url,
                 timeout=15.0
             )
         except Exception as e:
@@ -66,6 +71,30 @@ def _safe_json_parse(text: str, retry_prompt: str = None) -> Dict[str, Any] | Li
         return None
 
 
+def _complete(client: OpenAI, operation: str, **kwargs: Any) -> Any:
+    """Chat completion, recording its latency and token usage."""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        response = client.chat.completions.create(**kwargs)
+        outcome = "ok"
+    finally:
+        elapsed = time.perf_counter() - start
+        AI_REQUEST_DURATION.labels(operation, outcome).observe(elapsed)
+        add_ai_seconds(elapsed)
+
+    if response.usage is not None:
+        AI_TOKENS.labels(operation, "prompt").inc(response.usage.prompt_tokens or 0)
+        AI_TOKENS.labels(operation, "completion").inc(
+            response.usage.completion_tokens or 0
+        )
+    return response
+
+
+def _record_fallback(operation: str, reason: str) -> None:
+    AI_FALLBACKS.labels(operation, reason).inc()
+
+
 async def generate_tiny_step_from_mood(
     user_id: str, energy: int, emotion: str, note: str | None
 ) -> Dict[str, str]:
@@ -73,6 +102,7 @@ async def generate_tiny_step_from_mood(
     client = _get_openai_client()
     
     if not client:
+        _record_fallback("tiny_step", "no_client")
         # Deterministic fallback when no client
         content = "Take three deep breaths and notice how you're feeling right now"
         rationale = "Starting with breathing helps ground you in the present moment"
@@ -108,7 +138,9 @@ Keep suggestions:
 
         user_prompt = f"Based on this mood check-in, suggest one tiny step: {mood_context}"
         
-        response = client.chat.completions.create(
+        response = _complete(
+            client,
+            "tiny_step",
             model=settings.openai_model,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -128,7 +160,9 @@ Keep suggestions:
             }
         
         # Retry with stricter prompt
-        retry_response = client.chat.completions.create(
+        retry_response = _complete(
+            client,
+            "tiny_step",
             model=settings.openai_model,
             messages=[
                 {"role": "system", "content": system_prompt + "\n\nReturn ONLY valid JSON, no other text."},
@@ -144,8 +178,11 @@ Keep suggestions:
                 "rationale": retry_result["rationale"][:120]
             }
         
+        _record_fallback("tiny_step", "invalid_response")
+
     except Exception as e:
         logger.warning("AI:mock fallback reason=api_error error=%s", str(e))
+        _record_fallback("tiny_step", "api_error")
     
     # Fallback on any error
     content = "Take a moment to notice one thing you appreciate about yourself"
@@ -158,6 +195,7 @@ async def breakdown_task(title: str, energy: int = None, emotion: str = None, gr
     client = _get_openai_client()
     
     if not client:
+        _record_fallback("breakdown", "no_client")
         # Deterministic fallback
         return [
             {"content": f"Start by gathering what you need for: {title[:40]}"},
@@ -204,7 +242,9 @@ Make steps:
 
         user_prompt = f"Break down this task into steps: {title}"
         
-        response = client.chat.completions.create(
+        response = _complete(
+            client,
+            "breakdown",
             model=settings.openai_model,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -226,7 +266,9 @@ Make steps:
                 return steps
         
         # Retry with stricter prompt
-        retry_response = client.chat.completions.create(
+        retry_response = _complete(
+            client,
+            "breakdown",
             model=settings.openai_model,
             messages=[
                 {"role": "system", "content": system_prompt + "\n\nReturn ONLY valid JSON array, no other text."},
@@ -244,8 +286,11 @@ Make steps:
             if steps:
                 return steps
         
+        _record_fallback("breakdown", "invalid_response")
+
     except Exception as e:
         logger.warning("AI:mock fallback reason=api_error error=%s", str(e))
+        _record_fallback("breakdown", "api_error")
     
     # Fallback on any error
     return [
@@ -265,6 +310,7 @@ async def rebalance_too_big(step_content: str) -> List[Dict[str, str]]:
     client = _get_openai_client()
     
     if not client:
+        _record_fallback("rebalance", "no_client")
         # Deterministic fallback
         return [
             {"content": f"Begin with the easiest part of: {step_content[:30]}"},
@@ -285,7 +331,9 @@ Make the new steps:
 
         user_prompt = f"This step feels too big, help me break it down: {step_content}"
         
-        response = client.chat.completions.create(
+        response = _complete(
+            client,
+            "rebalance",
             model=settings.openai_model,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -307,7 +355,9 @@ Make the new steps:
                 return steps
         
         # Retry with stricter prompt
-        retry_response = client.chat.completions.create(
+        retry_response = _complete(
+            client,
+            "rebalance",
             model=settings.openai_model,
             messages=[
                 {"role": "system", "content": system_prompt + "\n\nReturn ONLY valid JSON array, no other text."},
@@ -325,8 +375,11 @@ Make the new steps:
             if steps:
                 return steps
         
+        _record_fallback("rebalance", "invalid_response")
+
     except Exception as e:
         logger.warning("AI:mock fallback reason=api_error error=%s", str(e))
+        _record_fallback("rebalance", "api_error")
     
     # Fallback on any error
     return [
@@ -341,6 +394,7 @@ async def generate_celebration_message(task_title: str, completion_count: int =
     client = _get_openai_client()
     
     if not client:
+        _record_fallback("celebration", "no_client")
         # Deterministic fallback celebrations
         fallback_messages = [
             {"message": f"You did it! Completing '{task_title[:30]}' is a real accomplishment.", "emoji": "🎉"},
@@ -365,7 +419,9 @@ Make messages:
 
         user_prompt = f"Create a celebration message for someone who just completed: {task_title}"
         
-        response = client.chat.completions.create(
+        response = _complete(
+            client,
+            "celebration",
             model=settings.openai_model,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -384,8 +440,11 @@ Make messages:
                 "emoji": result["emoji"]
             }
         
+        _record_fallback("celebration", "invalid_response")
+
     except Exception as e:
         logger.warning("AI:mock fallback reason=api_error error=%s", str(e))
+        _record_fallback("celebration", "api_error")
     
     # Final fallback
     return {
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable
+
+import orjson
+import sqlalchemy as sa
+from sqlalchemy import select
+
+from app.core.responses import json_default
+from app.core.settings import Settings, get_settings
+from app.db.models import Celebration, Step, Task, UserStats
+from app.services.stats import streak_is_current
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass
+class CelebrationDigest:
+    """Everything one user celebrated in a digest window."""
+
+    user_id: uuid.UUID
+    celebrations: int
+    tasks_finished: int
+    streak: int
+    last_celebrated_at: datetime
+    since: datetime
+    until: datetime
+
+
+def digest_statement(since: datetime, until: datetime) -> sa.Select:
+    """One row per user with celebrations in (since, until].
+
+    A single range scan over celebrations (ix_celebrations_created_at, pruned
+    to the window's partitions); steps, tasks and stats are PK lookups.
+    tasks_finished counts tasks whose completed_at falls in the window, so
+    later edits to a done task never count it again. The streak decays as
+    in GET /v1/stats, with the window's end as today (UTC: digests have no
+    client timezone).
+    """
+    finished_in_window = sa.and_(Task.completed_at > since, Task.completed_at <= until)
+    today = until.astimezone(timezone.utc).date()
+    streak = sa.case(
+        (
+            streak_is_current(UserStats.last_completion_day, today),
+            UserStats.current_streak,
+        ),
+        else_=0,
+    )
+    tasks_finished = sa.func.count(sa.distinct(Task.id)).filter(finished_in_window)
+    return (
+        select(
+            Celebration.user_id,
+            sa.func.count().label("celebrations"),
+            tasks_finished.label("tasks_finished"),
+            streak.label("streak"),
+            sa.func.max(Celebration.created_at).label("last_celebrated_at"),
+        )
+        .select_from(Celebration)
+        .outerjoin(Step, Step.id == Celebration.step_id)
+        .outerjoin(Task, Task.id == Step.task_id)
+        .outerjoin(UserStats, UserStats.user_id == Celebration.user_id)
+        .where(Celebration.created_at > since, Celebration.created_at <= until)
+        .group_by(
+            Celebration.user_id,
+            UserStats.current_streak,
+            UserStats.last_completion_day,
+        )
+    )
+
+
+class DigestBackend(ABC):
+    """Where digests go. Subclass and register in DIGEST_BACKENDS to add one.
+
+    deliver runs on the worker's event loop; blocking I/O goes through
+    asyncio.to_thread.
+    """
+
+    @abstractmethod
+    async def deliver(self, digests: list[CelebrationDigest]) -> None: ...
+
+
+class LogDigestBackend(DigestBackend):
+    async def deliver(self, digests: list[CelebrationDigest]) -> None:
+        for digest in digests:
+            logger.info(
+                "🎉 Digest for user %s: %d celebrations, %d tasks finished, "
+                "%d day streak",
+                digest.user_id,
+                digest.celebrations,
+                digest.tasks_finished,
+                digest.streak,
+            )
+
+
+class FileDigestBackend(DigestBackend):
+    """Appends one NDJSON line per digest; handy for local runs and tests."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    async def deliver(self, digests: list[CelebrationDigest]) -> None:
+        payload = b"".join(
+            orjson.dumps(digest, default=json_default) + b"\n" for digest in digests
+        )
+        await asyncio.to_thread(self._append, payload)
+
+    def _append(self, payload: bytes) -> None:
+        with open(self.path, "ab") as f:
+            f.write(payload)
+
+
+DIGEST_BACKENDS: dict[str, Callable[[Settings], DigestBackend]] = {
+    "log": lambda settings: LogDigestBackend(),
+    "file": lambda settings: FileDigestBackend(settings.digest_file_path),
+}
+
+
+def get_digest_backend(settings: Settings = settings) -> DigestBackend:
+    try:
+        factory = DIGEST_BACKENDS[settings.digest_backend]
+    except KeyError:
+        raise ValueError(
+            f"Unknown DIGEST_BACKEND {settings.digest_backend!r}, "
+            f"expected one of {sorted(DIGEST_BACKENDS)}"
+        )
+    return factory(settings)
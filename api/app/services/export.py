@@ -0,0 +1,346 @@
+import uuid
+from datetime import datetime, timezone
+from typing import AsyncIterator, Callable
+from zoneinfo import ZoneInfo
+
+import orjson
+import sqlalchemy as sa
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import UUID, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.responses import json_default
+from app.core.settings import get_settings
+from app.db.models import (
+    Celebration,
+    Mood,
+    Step,
+    Task,
+    celebration_kind_enum,
+    step_state_enum,
+)
+from app.db.partitions import accepted_created_at_range, in_accepted_range
+from app.schemas.export import (
+    EXPORT_VERSION,
+    ExportCelebration,
+    ExportMood,
+    ExportStep,
+    ExportTask,
+)
+from app.services.moods import rollup_backfill_statement
+
+settings = get_settings()
+
+# Rows fetched per server-side cursor round trip, and written per INSERT
+# (well under asyncpg's 32767 bind parameter limit at 7 columns per row)
+EXPORT_FETCH_SIZE = 1000
+IMPORT_BATCH_SIZE = 1000
+MAX_LINE_BYTES = 1024 * 1024
+
+# Parents before children: imports flush in this order so steps can see
+# their tasks and celebrations their steps
+RECORD_TYPES: dict[str, type[BaseModel]] = {
+    "task": ExportTask,
+    "step": ExportStep,
+    "mood": ExportMood,
+    "celebration": ExportCelebration,
+}
+
+
+def export_statements(user_id: uuid.UUID) -> list[tuple[str, sa.Select]]:
+    # No ORDER BY: rows stream straight off the scan without a sort
+    return [
+        (
+            "task",
+            select(
+                Task.id,
+                Task.title,
+                Task.state,
+                Task.kind,
+                Task.created_at,
+                Task.updated_at,
+            ).where(Task.user_id == user_id),
+        ),
+        (
+            "step",
+            select(
+                Step.id,
+                Step.task_id,
+                Step.content,
+                Step.order,
+                Step.state,
+                Step.created_at,
+            )
+            .join(Task, Task.id == Step.task_id)
+            .where(Task.user_id == user_id),
+        ),
+        (
+            "mood",
+            select(
+                Mood.id, Mood.energy, Mood.emotion, Mood.note, Mood.created_at
+            ).where(Mood.user_id == user_id),
+        ),
+        (
+            "celebration",
+            select(
+                Celebration.id,
+                Celebration.step_id,
+                Celebration.kind,
+                Celebration.created_at,
+            ).where(Celebration.user_id == user_id),
+        ),
+    ]
+
+
+async def export_ndjson(
+    session_factory: async_sessionmaker[AsyncSession],
+    user_id: uuid.UUID,
+) -> AsyncIterator[bytes]:
+    """Stream a user's data as NDJSON chunks with constant memory.
+
+    Opens its own session: the response body is produced after the request
+    dependencies have finished. REPEATABLE READ keeps every table on one
+    snapshot, so steps never reference a task missing from the export.
+    """
+    async with session_factory() as session:
+        await session.connection(
+            execution_options={"isolation_level": "REPEATABLE READ"}
+        )
+
+        header = {
+            "type": "export",
+            "version": EXPORT_VERSION,
+            "exported_at": datetime.now(timezone.utc),
+        }
+        yield orjson.dumps(header, default=json_default) + b"\n"
+
+        for record_type, stmt in export_statements(user_id):
+            # Server-side cursor; one chunk per fetched batch
+            result = await session.stream(
+                stmt.execution_options(yield_per=EXPORT_FETCH_SIZE)
+            )
+            async for rows in result.mappings().partitions():
+                yield b"".join(
+                    orjson.dumps({"type": record_type, **row}, default=json_default)
+                    + b"\n"
+                    for row in rows
+                )
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, dict]]:
+    """(line number, object) pairs from a byte stream, one line buffered at a time."""
+    buffer = b""
+    line_no = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        if len(buffer) > MAX_LINE_BYTES:
+            raise HTTPException(
+                status_code=400, detail=f"Line {line_no + len(lines) + 1} is too long"
+            )
+        for line in lines:
+            line_no += 1
+            if line.strip():
+                yield line_no, _parse_line(line_no, line)
+    if buffer.strip():
+        yield line_no + 1, _parse_line(line_no + 1, buffer)
+
+
+def _parse_line(line_no: int, line: bytes) -> dict:
+    try:
+        value = orjson.loads(line)
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail=f"Line {line_no}: invalid JSON")
+    if not isinstance(value, dict):
+        raise HTTPException(
+            status_code=400, detail=f"Line {line_no}: expected an object"
+        )
+    return value
+
+
+class NdjsonImporter:
+    """Buffers validated rows per type and writes them in multi-row INSERTs.
+
+    Ids are kept so an export re-imports idempotently; rows whose id already
+    exists are skipped. Everything is re-owned by the importing user, and
+    steps/celebrations only attach to tasks/steps that user owns. Moods and
+    celebrations dated outside the partitioned range are dropped and counted,
+    as sync push does.
+    """
+
+    def __init__(self, session: AsyncSession, user_id: uuid.UUID, tz: ZoneInfo):
+        self.session = session
+        self.user_id = user_id
+        self.tz = tz
+        self.pending: dict[str, list[BaseModel]] = {
+            record_type: [] for record_type in RECORD_TYPES
+        }
+        self.inserted: dict[str, int] = {record_type: 0 for record_type in RECORD_TYPES}
+        self.skipped = 0
+        self.accepted = accepted_created_at_range(settings)
+        self.writers: dict[str, Callable] = {
+            "task": self._insert_tasks,
+            "step": self._insert_steps,
+            "mood": self._insert_moods,
+            "celebration": self._insert_celebrations,
+        }
+
+    async def add(self, line_no: int, record: dict) -> None:
+        record_type = record.get("type")
+        if record_type == "export":
+            if record.get("version") != EXPORT_VERSION:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Unsupported export version {record.get('version')!r}",
+                )
+            return
+        model = RECORD_TYPES.get(record_type)
+        if model is None:
+            raise HTTPException(
+                status_code=400, detail=f"Line {line_no}: unknown type {record_type!r}"
+            )
+        try:
+            row = model.model_validate(record)
+        except ValidationError as e:
+            raise HTTPException(
+                status_code=400, detail=f"Line {line_no}: {e.errors()[0]['msg']}"
+            )
+
+        if isinstance(row, (ExportMood, ExportCelebration)) and not in_accepted_range(
+            row.created_at, self.accepted
+        ):
+            self.skipped += 1
+            return
+
+        self.pending[record_type].append(row)
+        if len(self.pending[record_type]) >= IMPORT_BATCH_SIZE:
+            await self.flush(record_type)
+
+    async def flush(self, record_type: str) -> None:
+        # Parents first, so a child batch never outruns its parents
+        for parent_type in RECORD_TYPES:
+            rows = self.pending[parent_type]
+            if rows:
+                self.pending[parent_type] = []
+                self.inserted[parent_type] += await self.writers[parent_type](rows)
+            if parent_type == record_type:
+                break
+
+    async def finish(self) -> dict[str, int]:
+        await self.flush("celebration")
+        if self.inserted["mood"]:
+            # Recompute trends days, on the client's local days, so imported
+            # moods also count on days that already had a rollup row
+            await self.session.execute(
+                rollup_backfill_statement([self.user_id], self.tz.key)
+            )
+        counts = {
+            f"{record_type}s": count for record_type, count in self.inserted.items()
+        }
+        return {**counts, "skipped": self.skipped}
+
+    async def _insert_tasks(self, rows: list[ExportTask]) -> int:
+        result = await self.session.execute(
+            insert(Task)
+            .values([{**row.model_dump(), "user_id": self.user_id} for row in rows])
+            .on_conflict_do_nothing(index_elements=[Task.id])
+        )
+        return result.rowcount
+
+    async def _insert_steps(self, rows: list[ExportStep]) -> int:
+        values = sa.values(
+            sa.column("id", UUID(as_uuid=True)),
+            sa.column("task_id", UUID(as_uuid=True)),
+            sa.column("content", sa.Text),
+            sa.column("order", sa.Integer),
+            sa.column("state", sa.Text),
+            sa.column("created_at", sa.DateTime(timezone=True)),
+            name="import_steps",
+        ).data(
+            [
+                (row.id, row.task_id, row.content, row.order, row.state, row.created_at)
+                for row in rows
+            ]
+        )
+        # Joining the user's tasks drops steps aimed at anyone else's task
+        owned = (
+            select(
+                values.c.id,
+                values.c.task_id,
+                values.c.content,
+                values.c.order,
+                sa.cast(values.c.state, step_state_enum),
+                values.c.created_at,
+            )
+            .select_from(values)
+            .join(Task, Task.id == values.c.task_id)
+            .where(Task.user_id == self.user_id)
+        )
+        result = await self.session.execute(
+            insert(Step)
+            .from_select(
+                ["id", "task_id", "content", "order", "state", "created_at"], owned
+            )
+            .on_conflict_do_nothing(index_elements=[Step.id])
+        )
+        return result.rowcount
+
+    async def _insert_moods(self, rows: list[ExportMood]) -> int:
+        result = await self.session.execute(
+            insert(Mood)
+            .values([{**row.model_dump(), "user_id": self.user_id} for row in rows])
+            .on_conflict_do_nothing(index_elements=[Mood.id, Mood.created_at])
+        )
+        return result.rowcount
+
+    async def _insert_celebrations(self, rows: list[ExportCelebration]) -> int:
+        values = sa.values(
+            sa.column("id", UUID(as_uuid=True)),
+            sa.column("step_id", UUID(as_uuid=True)),
+            sa.column("kind", sa.Text),
+            sa.column("created_at", sa.DateTime(timezone=True)),
+            name="import_celebrations",
+        ).data([(row.id, row.step_id, row.kind, row.created_at) for row in rows])
+        # Keep the celebration but unlink it from steps the user doesn't own
+        owned_steps = (
+            select(Step.id)
+            .join(Task, Task.id == Step.task_id)
+            .where(Task.user_id == self.user_id)
+            .subquery("owned_steps")
+        )
+        rows_to_insert = (
+            select(
+                values.c.id,
+                sa.literal(self.user_id, UUID(as_uuid=True)),
+                owned_steps.c.id,
+                sa.cast(values.c.kind, celebration_kind_enum),
+                values.c.created_at,
+            )
+            .select_from(values)
+            .outerjoin(owned_steps, owned_steps.c.id == values.c.step_id)
+        )
+        result = await self.session.execute(
+            insert(Celebration)
+            .from_select(
+                ["id", "user_id", "step_id", "kind", "created_at"], rows_to_insert
+            )
+            .on_conflict_do_nothing(
+                index_elements=[Celebration.id, Celebration.created_at]
+            )
+        )
+        return result.rowcount
+
+
+async def import_ndjson(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    chunks: AsyncIterator[bytes],
+    tz: ZoneInfo,
+) -> dict[str, int]:
+    """Parse and write an export stream in the caller's transaction (no commit)."""
+    importer = NdjsonImporter(session, user_id, tz)
+    async for line_no, record in iter_ndjson(chunks):
+        await importer.add(line_no, record)
+    return await importer.finish()
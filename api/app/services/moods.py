@@ -0,0 +1,119 @@
+import uuid
+from datetime import date, timedelta
+
+import sqlalchemy as sa
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Mood, MoodDailyRollup, emotion_enum
+
+EMOTIONS: tuple[str, ...] = tuple(emotion_enum.enums)
+
+# Title of the one-step task each check-in creates (kind 'mood')
+MOOD_TASK_TITLE = "Gentle: mood-driven micro-step"
+
+
+def _emotion_column(emotion: str) -> str:
+    return f"{emotion}_count"
+
+
+async def record_mood_rollup(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    day: date,
+    energy: int,
+    emotion: str,
+) -> None:
+    """Fold one check-in into the user's daily rollup row (same transaction)."""
+    emotion_column = _emotion_column(emotion)
+    table = MoodDailyRollup.__table__
+
+    stmt = insert(MoodDailyRollup).values(
+        user_id=user_id,
+        day=day,
+        checkin_count=1,
+        energy_sum=energy,
+        energy_min=energy,
+        energy_max=energy,
+        **{emotion_column: 1},
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MoodDailyRollup.user_id, MoodDailyRollup.day],
+        set_={
+            "checkin_count": table.c.checkin_count + 1,
+            "energy_sum": table.c.energy_sum + energy,
+            "energy_min": sa.func.least(table.c.energy_min, energy),
+            "energy_max": sa.func.greatest(table.c.energy_max, energy),
+            emotion_column: table.c[emotion_column] + 1,
+        },
+    )
+    await session.execute(stmt)
+
+
+async def get_mood_rollups(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    start_day: date,
+    end_day: date,
+) -> list[MoodDailyRollup]:
+    """Rollup rows for [start_day, end_day], oldest first (primary key range scan)."""
+    result = await session.execute(
+        select(MoodDailyRollup)
+        .where(
+            MoodDailyRollup.user_id == user_id,
+            MoodDailyRollup.day >= start_day,
+            MoodDailyRollup.day <= end_day,
+        )
+        .order_by(MoodDailyRollup.day)
+    )
+    return list(result.scalars().all())
+
+
+def rollup_backfill_statement(user_ids: list[uuid.UUID], tz: str = "UTC") -> sa.Insert:
+    """Recompute the rollup days of user_ids from raw moods.
+
+    Raw moods carry no timezone, so days are bucketed in tz (UTC unless the
+    caller knows the client's). Every day that has moods is rewritten with
+    totals recomputed from all of them, so rows that live check-ins created
+    before the backfill (or an import) ran pick up the earlier moods too,
+    and running it again converges instead of double-counting.
+    """
+    local_moods = (
+        select(
+            Mood.user_id,
+            sa.cast(sa.func.timezone(tz, Mood.created_at), sa.Date).label("day"),
+            Mood.energy,
+            Mood.emotion,
+        )
+        .where(Mood.user_id.in_(user_ids))
+        .subquery("local_moods")
+    )
+    emotion_counts = [
+        sa.func.count()
+        .filter(local_moods.c.emotion == emotion)
+        .label(_emotion_column(emotion))
+        for emotion in EMOTIONS
+    ]
+    aggregates = select(
+        local_moods.c.user_id,
+        local_moods.c.day,
+        sa.func.count().label("checkin_count"),
+        sa.func.sum(local_moods.c.energy).label("energy_sum"),
+        sa.func.min(local_moods.c.energy).label("energy_min"),
+        sa.func.max(local_moods.c.energy).label("energy_max"),
+        *emotion_counts,
+    ).group_by(local_moods.c.user_id, local_moods.c.day)
+
+    totals = ["checkin_count", "energy_sum", "energy_min", "energy_max"]
+    totals += [_emotion_column(emotion) for emotion in EMOTIONS]
+
+    stmt = insert(MoodDailyRollup).from_select(["user_id", "day", *totals], aggregates)
+    return stmt.on_conflict_do_update(
+        index_elements=[MoodDailyRollup.user_id, MoodDailyRollup.day],
+        set_={column: stmt.excluded[column] for column in totals},
+    )
+
+
+def trend_window(today: date, days: int) -> tuple[date, date]:
+    return today - timedelta(days=days - 1), today
@@ -0,0 +1,53 @@
+import uuid
+from typing import Any, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.settings import get_settings
+from app.db.models import OutboxEvent
+
+settings = get_settings()
+
+SEND_CELEBRATION = "app.tasks.celebrations.send_celebration"
+SEND_CELEBRATION_BATCH = "app.tasks.celebrations.send_celebration_batch"
+
+
+def enqueue_task(session: AsyncSession, task_name: str, **kwargs: Any) -> None:
+    """Queue a Celery task to run once the caller's transaction commits.
+
+    The row rides along with the caller's commit (no broker I/O here); the
+    outbox relay publishes it. Rolled-back work never publishes, committed
+    work always does, at least once.
+    """
+    session.add(OutboxEvent(task_name=task_name, payload=kwargs))
+
+
+def enqueue_celebration(
+    session: AsyncSession,
+    user_id: str,
+    step_ids: Sequence[uuid.UUID],
+    kind: str = "confetti",
+) -> None:
+    """Queue one celebration for steps completed together.
+
+    A no-op with CELEBRATION_PER_EVENT off, when app.tasks.digest is the only
+    delivery path.
+    """
+    if not settings.celebration_per_event or not step_ids:
+        return
+    if len(step_ids) == 1:
+        enqueue_task(
+            session,
+            SEND_CELEBRATION,
+            user_id=user_id,
+            step_id=str(step_ids[0]),
+            kind=kind,
+        )
+    else:
+        enqueue_task(
+            session,
+            SEND_CELEBRATION_BATCH,
+            user_id=user_id,
+            step_ids=[str(step_id) for step_id in step_ids],
+            kind=kind,
+        )
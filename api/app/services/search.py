@@ -0,0 +1,109 @@
+import re
+import uuid
+
+import sqlalchemy as sa
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import ArchivedStep, ArchivedTask, Step, Task
+
+# Lexemes in the 'simple' config are lowercased runs of word characters
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+MAX_TERMS = 8
+
+
+def prefix_tsquery(text: str) -> str | None:
+    """'buy gro' -> 'buy:* & gro:*' so every word matches as a prefix.
+
+    Only word characters survive, so user input can never inject tsquery
+    operators. Returns None when nothing searchable is left.
+    """
+    terms = _TERM_RE.findall(text.lower())[:MAX_TERMS]
+    if not terms:
+        return None
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def _hits(
+    task_table, step_table, query, user_id: uuid.UUID, archived: bool
+) -> list[sa.Select]:
+    is_archived = sa.literal(archived).label("archived")
+
+    # Task hits come straight off the (user_id, search_vector) GIN index
+    task_hits = select(
+        sa.literal("task").label("kind"),
+        task_table.id.label("hit_id"),
+        task_table.id.label("task_id"),
+        sa.null().cast(step_table.id.type).label("step_id"),
+        task_table.title,
+        sa.null().cast(sa.Text).label("content"),
+        task_table.state.label("task_state"),
+        is_archived,
+        sa.cast(sa.func.ts_rank(task_table.search_vector, query), sa.Float).label(
+            "rank"
+        ),
+    ).where(task_table.user_id == user_id, task_table.search_vector.op("@@")(query))
+
+    # Step hits: the planner picks between the steps GIN index (rare terms)
+    # and the user's tasks -> the task_id index (short prefixes)
+    step_hits = (
+        select(
+            sa.literal("step").label("kind"),
+            step_table.id.label("hit_id"),
+            step_table.task_id,
+            step_table.id.label("step_id"),
+            task_table.title,
+            step_table.content,
+            task_table.state.label("task_state"),
+            is_archived,
+            sa.cast(sa.func.ts_rank(step_table.search_vector, query), sa.Float).label(
+                "rank"
+            ),
+        )
+        .join(task_table, task_table.id == step_table.task_id)
+        .where(task_table.user_id == user_id, step_table.search_vector.op("@@")(query))
+    )
+    return [task_hits, step_hits]
+
+
+def search_statement(
+    user_id: uuid.UUID,
+    tsquery: str,
+    limit: int,
+    after: tuple[float, uuid.UUID] | None = None,
+) -> sa.Select:
+    """Ranked task and step hits for one user, keyset-paged on (rank desc, hit_id).
+
+    Archived history (app.tasks.archive) is searched too and flagged
+    archived; a task is in exactly one of the two places, so ids never repeat.
+    """
+    query = sa.func.to_tsquery(
+        sa.literal_column("'simple'"), sa.bindparam("tsquery", tsquery)
+    )
+
+    hits = sa.union_all(
+        *_hits(Task, Step, query, user_id, archived=False),
+        *_hits(ArchivedTask, ArchivedStep, query, user_id, archived=True),
+    ).subquery("hits")
+    stmt = select(hits).order_by(hits.c.rank.desc(), hits.c.hit_id).limit(limit)
+
+    if after is not None:
+        rank, hit_id = after
+        stmt = stmt.where(
+            sa.or_(
+                hits.c.rank < rank,
+                sa.and_(hits.c.rank == rank, hits.c.hit_id > hit_id),
+            )
+        )
+    return stmt
+
+
+async def search(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    tsquery: str,
+    limit: int,
+    after: tuple[float, uuid.UUID] | None = None,
+) -> list[dict]:
+    result = await session.execute(search_statement(user_id, tsquery, limit, after))
+    return [dict(row) for row in result.mappings()]
@@ -0,0 +1,129 @@
+import uuid
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import sqlalchemy as sa
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import UserStats
+from app.schemas.stats import UserStatsResponse
+
+
+def _week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def streak_is_current(last_completion_day, today: date):
+    """A streak lasts through the day after its last completion.
+
+    Works on a date or a column (for SQL callers such as the digest).
+    """
+    return last_completion_day >= today - timedelta(days=1)
+
+
+async def record_completions(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    count: int,
+    tz: ZoneInfo,
+) -> UserStats:
+    """Count `count` step completions towards the user's stats in one upsert.
+
+    Every SET expression reads the pre-update row, so concurrent completions
+    serialize on the row lock instead of racing in Python.
+    """
+    today = datetime.now(tz).date()
+    week_start = _week_start(today)
+    table = UserStats.__table__
+
+    # A client moving west can report a "today" before the stored day;
+    # treat that as the same day rather than breaking the streak
+    same_day = table.c.last_completion_day >= today
+    next_day = table.c.last_completion_day == today - timedelta(days=1)
+    streak = sa.case(
+        (same_day, table.c.current_streak),
+        (next_day, table.c.current_streak + 1),
+        else_=1,
+    )
+
+    stmt = insert(UserStats).values(
+        user_id=user_id,
+        completions_total=count,
+        completions_today=count,
+        completions_week=count,
+        last_completion_day=today,
+        week_start=week_start,
+        current_streak=1,
+        longest_streak=1,
+        last_completion_at=sa.func.now(),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserStats.user_id],
+        set_={
+            "completions_total": table.c.completions_total + count,
+            "completions_today": sa.case(
+                (same_day, table.c.completions_today + count), else_=count
+            ),
+            "completions_week": sa.case(
+                (table.c.week_start >= week_start, table.c.completions_week + count),
+                else_=count,
+            ),
+            "week_start": sa.func.greatest(table.c.week_start, week_start),
+            "current_streak": streak,
+            "longest_streak": sa.func.greatest(table.c.longest_streak, streak),
+            "last_completion_day": sa.func.greatest(table.c.last_completion_day, today),
+            "last_completion_at": sa.func.now(),
+        },
+    ).returning(UserStats)
+
+    result = await session.execute(stmt, execution_options={"populate_existing": True})
+    return result.scalar_one()
+
+
+async def get_user_stats(session: AsyncSession, user_id: uuid.UUID) -> UserStats | None:
+    result = await session.execute(
+        select(UserStats).where(UserStats.user_id == user_id)
+    )
+    return result.scalar_one_or_none()
+
+
+def stats_response(stats: UserStats | None, tz: ZoneInfo) -> UserStatsResponse:
+    """Decay stored counters to what is true right now in the client's timezone."""
+    if stats is None:
+        return UserStatsResponse(
+            completions_today=0,
+            completions_this_week=0,
+            completions_total=0,
+            current_streak=0,
+            longest_streak=0,
+            last_completion_at=None,
+        )
+
+    today = datetime.now(tz).date()
+    return UserStatsResponse(
+        completions_today=(
+            stats.completions_today if stats.last_completion_day >= today else 0
+        ),
+        completions_this_week=(
+            stats.completions_week if stats.week_start >= _week_start(today) else 0
+        ),
+        completions_total=stats.completions_total,
+        current_streak=(
+            stats.current_streak
+            if streak_is_current(stats.last_completion_day, today)
+            else 0
+        ),
+        longest_streak=stats.longest_streak,
+        last_completion_at=stats.last_completion_at,
+    )
+
+
+def celebration_message(stats: UserStatsResponse) -> str:
+    """Celebration copy personalized from stats already in hand."""
+    if stats.current_streak >= 2 and stats.completions_today == 1:
+        return f"You did it! 🎉 That's a {stats.current_streak}-day streak."
+    if stats.completions_today > 1:
+        return f"You did it! 🎉 That's {stats.completions_today} steps today."
+    return "You did it! 🎉"
@@ -0,0 +1,264 @@
+import uuid
+from dataclasses import dataclass, field
+from typing import Iterable
+
+import sqlalchemy as sa
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Celebration, Step, Task, step_state_enum, task_state_enum
+from app.schemas.steps import StepOperation
+
+
+@dataclass
+class StepBatchResult:
+    missing_step_ids: list[uuid.UUID] = field(default_factory=list)
+    completed_step_ids: list[uuid.UUID] = field(default_factory=list)
+    reopened_step_ids: list[uuid.UUID] = field(default_factory=list)
+    reordered_step_ids: list[uuid.UUID] = field(default_factory=list)
+    completed_task_ids: list[uuid.UUID] = field(default_factory=list)
+
+
+async def apply_step_operations(
+    session: AsyncSession,
+    user_id: str | uuid.UUID,
+    operations: Iterable[StepOperation],
+    celebration_kind: str = "confetti",
+) -> StepBatchResult:
+    """Apply complete/reopen/reorder operations with set-based statements.
+
+    Does not commit. Operations on the same step are applied in order, so the
+    last state change and the last reorder win.
+    """
+    user_uuid = user_id if isinstance(user_id, uuid.UUID) else uuid.UUID(str(user_id))
+    result = StepBatchResult()
+
+    target_state: dict[uuid.UUID, str] = {}
+    target_order: dict[uuid.UUID, int] = {}
+    for operation in operations:
+        if operation.op == "reorder":
+            target_order[operation.step_id] = operation.order
+        else:
+            target_state[operation.step_id] = (
+                "done" if operation.op == "complete" else "pending"
+            )
+
+    step_ids = set(target_state) | set(target_order)
+
+    # Ownership and current state for every referenced step in one query
+    owned_result = await session.execute(
+        select(Step.id, Step.task_id, Step.state, Task.state.label("task_state"))
+        .join(Task, Task.id == Step.task_id)
+        .where(Step.id.in_(step_ids), Task.user_id == user_uuid)
+    )
+    owned = {row.id: row for row in owned_result}
+
+    result.missing_step_ids = [step_id for step_id in step_ids if step_id not in owned]
+    if result.missing_step_ids:
+        return result
+
+    # Only real transitions are written, so replays are idempotent
+    state_changes = [
+        (step_id, state)
+        for step_id, state in target_state.items()
+        if owned[step_id].state != state
+    ]
+    result.completed_step_ids = [
+        step_id for step_id, state in state_changes if state == "done"
+    ]
+    result.reopened_step_ids = [
+        step_id for step_id, state in state_changes if state == "pending"
+    ]
+    result.reordered_step_ids = list(target_order)
+
+    if state_changes:
+        state_values = sa.values(
+            sa.column("id", UUID(as_uuid=True)),
+            sa.column("state", sa.Text),
+            name="step_states",
+        ).data(state_changes)
+        await session.execute(
+            update(Step)
+            .where(Step.id == state_values.c.id)
+            .values(state=sa.cast(state_values.c.state, step_state_enum)),
+            execution_options={"synchronize_session": False},
+        )
+
+    if target_order:
+        await session.execute(
+            renumber_steps_statement(
+                {owned[step_id].task_id for step_id in target_order}, target_order
+            ),
+            execution_options={"synchronize_session": False},
+        )
+
+    if result.completed_step_ids:
+        await session.execute(
+            insert(Celebration),
+            [
+                {"user_id": user_uuid, "step_id": step_id, "kind": celebration_kind}
+                for step_id in result.completed_step_ids
+            ],
+        )
+
+    # Work out task completion once per affected task
+    affected_task_ids = {owned[step_id].task_id for step_id in step_ids}
+    pending_result = await session.execute(
+        select(
+            Step.task_id,
+            func.count(Step.id).filter(Step.state == "pending"),
+        )
+        .where(Step.task_id.in_(affected_task_ids))
+        .group_by(Step.task_id)
+    )
+    pending_by_task = dict(pending_result.all())
+
+    done_task_ids = [
+        task_id for task_id in affected_task_ids if pending_by_task.get(task_id, 0) == 0
+    ]
+    reopened_task_ids = [
+        task_id for task_id in affected_task_ids if pending_by_task.get(task_id, 0) > 0
+    ]
+
+    # Bumps updated_at on every affected task so cached details revalidate
+    finishing = sa.and_(Task.id.in_(done_task_ids), Task.state != "done")
+    reopening = sa.and_(Task.id.in_(reopened_task_ids), Task.state == "done")
+    await session.execute(
+        update(Task)
+        .where(Task.id.in_(affected_task_ids))
+        .values(
+            state=sa.case(
+                (Task.id.in_(done_task_ids), sa.literal("done", task_state_enum)),
+                (reopening, sa.literal("active", task_state_enum)),
+                else_=Task.state,
+            ),
+            completed_at=sa.case(
+                (finishing, func.now()),
+                (reopening, sa.null()),
+                else_=Task.completed_at,
+            ),
+            updated_at=func.now(),
+        ),
+        execution_options={"synchronize_session": False},
+    )
+
+    task_states = {row.task_id: row.task_state for row in owned.values()}
+    result.completed_task_ids = [
+        task_id for task_id in done_task_ids if task_states[task_id] != "done"
+    ]
+
+    return result
+
+
+def renumber_steps_statement(
+    task_ids: Iterable[uuid.UUID], target_order: dict[uuid.UUID, int]
+) -> sa.Update:
+    """Move steps to their target positions and renumber their tasks 1..n.
+
+    A moved step lands exactly at its target (or last, if past the end) and
+    the others close up around it, so no two steps share an order. Only
+    rows whose position changes are written.
+    """
+    moves = sa.values(
+        sa.column("id", UUID(as_uuid=True)),
+        sa.column("order", sa.Integer),
+        name="step_moves",
+    ).data(list(target_order.items()))
+    # On a tie with the step already there, a step moving up goes before it
+    # and a step moving down goes after it
+    direction = sa.case(
+        (moves.c.order < Step.order, 0),
+        (moves.c.order > Step.order, 2),
+        else_=1,
+    )
+    renumbered = (
+        select(
+            Step.id,
+            func.row_number()
+            .over(
+                partition_by=Step.task_id,
+                order_by=(
+                    func.coalesce(moves.c.order, Step.order),
+                    direction,
+                    Step.created_at,
+                    Step.id,
+                ),
+            )
+            .label("position"),
+        )
+        .outerjoin(moves, moves.c.id == Step.id)
+        .where(Step.task_id.in_(list(task_ids)))
+        .subquery("renumbered")
+    )
+    return (
+        update(Step)
+        .where(Step.id == renumbered.c.id, Step.order != renumbered.c.position)
+        .values(order=renumbered.c.position)
+    )
+
+
+def next_step_statement(
+    user_id: uuid.UUID, task_id: uuid.UUID | None = None
+) -> sa.Select:
+    """Next pending step (lowest order) plus the task's remaining count.
+
+    Both subqueries are served by the partial index ix_steps_pending_task_order
+    (migration 0007): the count is index-only, the next step is its first
+    entry. With no task_id the user's most recently touched open task that
+    still has a pending step wins, active tasks first.
+    """
+    # Inline literal, not a bind param: a generic prepared plan can only use
+    # the partial index when the predicate is visibly state = 'pending'
+    pending = sa.and_(
+        Step.task_id == Task.id, Step.state == sa.literal_column("'pending'")
+    )
+    next_step = (
+        select(
+            Step.id, Step.task_id, Step.content, Step.order, Step.state, Step.created_at
+        )
+        .where(pending)
+        .order_by(Step.order)
+        .limit(1)
+        .lateral("next_step")
+    )
+    remaining = select(func.count()).select_from(Step).where(pending).scalar_subquery()
+
+    stmt = select(
+        Task.id.label("task_id"),
+        Task.title.label("task_title"),
+        Task.updated_at.label("task_updated_at"),
+        remaining.label("remaining"),
+        *[column.label(f"step_{column.name}") for column in next_step.c],
+    ).where(Task.user_id == user_id)
+
+    if task_id is not None:
+        # A task with nothing left still answers, with no step
+        return stmt.outerjoin(next_step, sa.true()).where(Task.id == task_id)
+
+    # Nested loop over the user's open tasks in preference order; LIMIT 1
+    # stops at the first task whose index probe finds a pending step
+    return (
+        stmt.join(next_step, sa.true())
+        .where(Task.state.in_(("pending", "active")))
+        .order_by((Task.state == "active").desc(), Task.updated_at.desc())
+        .limit(1)
+    )
+
+
+def next_step_payload(row: sa.RowMapping | None) -> dict:
+    """Shape a next_step_statement row as a NextStepResponse dict."""
+    if row is None:
+        return {"task_id": None, "task_title": None, "step": None, "remaining": 0}
+    step = None
+    if row["step_id"] is not None:
+        step = {
+            column: row[f"step_{column}"]
+            for column in ("id", "task_id", "content", "order", "state", "created_at")
+        }
+    return {
+        "task_id": row["task_id"],
+        "task_title": row["task_title"],
+        "step": step,
+        "remaining": row["remaining"],
+    }
@@ -0,0 +1,237 @@
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import sqlalchemy as sa
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.settings import get_settings
+from app.db.models import Mood, Step, SyncTombstone, Task
+from app.db.partitions import accepted_created_at_range, in_accepted_range
+from app.db.shards import shard_for_user
+from app.schemas.sync import SyncPushRequest
+from app.services.moods import record_mood_rollup
+from app.services.steps import StepBatchResult, apply_step_operations
+
+settings = get_settings()
+
+SYNC_TASK_COLUMNS = (Task.id, Task.title, Task.state, Task.created_at, Task.updated_at)
+SYNC_STEP_COLUMNS = (
+    Step.id,
+    Step.task_id,
+    Step.content,
+    Step.order,
+    Step.state,
+    Step.created_at,
+)
+SYNC_MOOD_COLUMNS = (Mood.id, Mood.energy, Mood.emotion, Mood.note, Mood.created_at)
+
+
+def encode_sync_cursor(watermark: int, issued_at: datetime, shard: str) -> str:
+    return encode_cursor(watermark, int(issued_at.timestamp()), shard)
+
+
+def decode_sync_cursor(cursor: str) -> tuple[int, datetime, str]:
+    watermark, issued_at, shard = decode_cursor(cursor, 3)
+    try:
+        return (
+            int(watermark),
+            datetime.fromtimestamp(int(issued_at), timezone.utc),
+            shard,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def current_watermark(session: AsyncSession) -> int:
+    """Oldest transaction still running: everything below it has finished."""
+    result = await session.execute(
+        select(
+            sa.cast(
+                sa.cast(
+                    sa.func.pg_snapshot_xmin(sa.func.pg_current_snapshot()), sa.Text
+                ),
+                sa.BigInteger,
+            )
+        )
+    )
+    return result.scalar_one()
+
+
+async def collect_changes(
+    session: AsyncSession, user_id: uuid.UUID, since: int | None
+) -> dict:
+    """Rows changed at or after `since` plus tombstones; everything when since is None.
+
+    Rows from transactions still in flight at the watermark are returned
+    again next time, so clients must apply changes as idempotent upserts.
+    """
+    task_query = select(*SYNC_TASK_COLUMNS).where(Task.user_id == user_id)
+    step_query = (
+        select(*SYNC_STEP_COLUMNS)
+        .join(Task, Task.id == Step.task_id)
+        .where(Task.user_id == user_id)
+    )
+    mood_query = select(*SYNC_MOOD_COLUMNS).where(Mood.user_id == user_id)
+
+    if since is not None:
+        task_query = task_query.where(Task.change_seq >= since)
+        # Step writes stamp their task too, so only changed tasks are probed
+        step_query = step_query.where(
+            Task.change_seq >= since, Step.change_seq >= since
+        )
+        mood_query = mood_query.where(Mood.change_seq >= since)
+
+    changes = {
+        "tasks": [dict(row) for row in (await session.execute(task_query)).mappings()],
+        "steps": [dict(row) for row in (await session.execute(step_query)).mappings()],
+        "moods": [dict(row) for row in (await session.execute(mood_query)).mappings()],
+        "deleted": [],
+    }
+
+    if since is not None:
+        tombstones = await session.execute(
+            select(SyncTombstone.entity, SyncTombstone.entity_id.label("id")).where(
+                SyncTombstone.user_id == user_id, SyncTombstone.change_seq >= since
+            )
+        )
+        changes["deleted"] = [dict(row) for row in tombstones.mappings()]
+
+    return changes
+
+
+async def sync_changes(
+    session: AsyncSession, user_id: uuid.UUID, cursor: str | None
+) -> dict:
+    """Delta since the client's cursor, or a full snapshot when it has none or
+    it expired."""
+    now = datetime.now(timezone.utc)
+    shard = shard_for_user(user_id)
+    since = None
+    if cursor:
+        since, issued_at, cursor_shard = decode_sync_cursor(cursor)
+        # Tombstones older than the retention window are gone, so the delta
+        # could miss deletes; and transaction ids only mean something on the
+        # shard that issued them. Either way fall back to a full snapshot.
+        expired = issued_at < now - timedelta(
+            days=settings.sync_tombstone_retention_days
+        )
+        if expired or cursor_shard != shard:
+            since = None
+
+    # Taken before reading so nothing committing meanwhile can slip past it
+    watermark = await current_watermark(session)
+    changes = await collect_changes(session, user_id, since)
+
+    return {
+        "cursor": encode_sync_cursor(watermark, now, shard),
+        "reset": since is None,
+        **changes,
+    }
+
+
+@dataclass
+class SyncPushResult:
+    tasks_created: int = 0
+    moods_recorded: int = 0
+    steps: StepBatchResult = field(default_factory=StepBatchResult)
+    missing_step_ids: list[uuid.UUID] = field(default_factory=list)
+    rejected_mood_ids: list[uuid.UUID] = field(default_factory=list)
+
+
+async def apply_push(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    request: SyncPushRequest,
+    tz: ZoneInfo,
+) -> SyncPushResult:
+    """Apply a queued offline batch in the caller's transaction (no commit).
+
+    Client-generated ids make creates idempotent, and step operations only
+    write real transitions, so a retried push is harmless.
+    """
+    result = SyncPushResult()
+
+    if request.tasks:
+        created = await session.execute(
+            insert(Task)
+            .values(
+                [
+                    {
+                        "id": task.id,
+                        "user_id": user_id,
+                        "title": task.title,
+                        "state": "pending",
+                    }
+                    for task in request.tasks
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=[Task.id])
+            .returning(Task.id)
+        )
+        result.tasks_created = len(created.all())
+
+    # Device clocks can be wildly off; moods outside the partitioned range
+    # are skipped and reported rather than parked in moods_default
+    accepted = accepted_created_at_range(settings)
+    moods = []
+    for mood in request.moods:
+        if in_accepted_range(mood.created_at, accepted):
+            moods.append(mood)
+        else:
+            result.rejected_mood_ids.append(mood.id)
+
+    if moods:
+        inserted = await session.execute(
+            insert(Mood)
+            .values(
+                [
+                    {
+                        "id": mood.id,
+                        "user_id": user_id,
+                        "energy": mood.energy,
+                        "emotion": mood.emotion,
+                        "note": mood.note,
+                        "created_at": mood.created_at,
+                    }
+                    for mood in moods
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=[Mood.id, Mood.created_at])
+            .returning(Mood.id)
+        )
+        inserted_ids = set(inserted.scalars())
+        result.moods_recorded = len(inserted_ids)
+        # Only fresh check-ins feed the rollup, on the device's local day
+        for mood in moods:
+            if mood.id in inserted_ids:
+                await record_mood_rollup(
+                    session,
+                    user_id=user_id,
+                    day=mood.created_at.astimezone(tz).date(),
+                    energy=mood.energy,
+                    emotion=mood.emotion,
+                )
+
+    if request.steps:
+        steps_result = await apply_step_operations(session, user_id, request.steps)
+        if steps_result.missing_step_ids:
+            # Steps deleted server-side while offline: skip just those
+            missing = set(steps_result.missing_step_ids)
+            result.missing_step_ids = list(missing)
+            remaining = [
+                operation
+                for operation in request.steps
+                if operation.step_id not in missing
+            ]
+            steps_result = StepBatchResult()
+            if remaining:
+                steps_result = await apply_step_operations(session, user_id, remaining)
+        result.steps = steps_result
+
+    return result
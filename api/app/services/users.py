@@ -0,0 +1,64 @@
+import uuid
+
+from cachetools import LRUCache
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.settings import get_settings
+from app.db.models import User
+
+settings = get_settings()
+
+# (shard, user id) pairs known to exist in that shard's database (committed).
+# Keyed by shard so a user moved by app.db.reshard is ensured again on the
+# new one. Bounded so a long-lived worker does not grow without limit;
+# eviction only costs one extra upsert.
+# Filled here on commit rather than in get_current_user: a verified token only
+# proves who the caller is, not that their users row has been written yet.
+known_users: LRUCache = LRUCache(maxsize=settings.known_user_cache_size)
+
+_PENDING_KEY = "pending_known_users"
+
+
+def known_user_key(session: AsyncSession, user_uuid: uuid.UUID) -> tuple:
+    # Sessions from app.db.session carry their shard's name
+    return session.info.get("shard"), user_uuid
+
+
+async def ensure_user(session: AsyncSession, user_id: str | uuid.UUID) -> None:
+    """Make sure a users row exists for user_id, racing safely with other requests.
+
+    Steady state is a dict lookup. On a miss a single
+    INSERT ... ON CONFLICT DO NOTHING runs in the caller's transaction.
+    """
+    user_uuid = user_id if isinstance(user_id, uuid.UUID) else uuid.UUID(user_id)
+    key = known_user_key(session, user_uuid)
+    if key in known_users:
+        return
+
+    result = await session.execute(
+        insert(User)
+        .values(id=user_uuid)
+        .on_conflict_do_nothing(index_elements=[User.id])
+        .returning(User.id)
+    )
+
+    if result.scalar_one_or_none() is None:
+        # Row already existed and is committed by someone else
+        known_users[key] = True
+    else:
+        # Only trust our own insert once the transaction commits
+        session.info.setdefault(_PENDING_KEY, set()).add(key)
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_committed_users(session: Session) -> None:
+    for key in session.info.pop(_PENDING_KEY, ()):
+        known_users[key] = True
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back_users(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,98 @@
+import logging
+from datetime import datetime, timedelta, timezone
+
+from celery import shared_task
+from sqlalchemy import Select, and_, delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.settings import get_settings
+from app.db.models import ArchivedStep, ArchivedTask, Step, Task
+from app.db.worker import run_async, shard_worker_engines
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Upper bound per run so one beat tick can't hold the worker for long
+MAX_BATCHES_PER_RUN = 200
+
+# Finished tasks, plus mood micro-tasks nobody came back to: those are
+# created active and are never finished or archived by hand. Selected in
+# separate passes so each batch reads its own partial index
+# (ix_tasks_finished_updated_at, ix_tasks_mood_active_updated_at).
+STALE_TASKS = (
+    Task.state.in_(("done", "archived")),
+    and_(Task.state == "active", Task.kind == "mood"),
+)
+
+
+def stale_batch_statement(stale, cutoff: datetime) -> Select:
+    return (
+        select(Task.id)
+        .where(stale, Task.updated_at < cutoff)
+        .order_by(Task.updated_at)
+        .limit(settings.archive_batch_size)
+        .with_for_update(skip_locked=True)
+    )
+
+
+async def _archive_batch(conn: AsyncConnection, stale, cutoff: datetime) -> int:
+    # One transaction per batch: copy task + steps, then delete the live
+    # rows (steps go with the task via ON DELETE CASCADE)
+    result = await conn.execute(stale_batch_statement(stale, cutoff))
+    task_ids = list(result.scalars())
+    if not task_ids:
+        return 0
+
+    await conn.execute(
+        insert(ArchivedTask).from_select(
+            ["id", "user_id", "title", "state", "created_at", "updated_at"],
+            select(
+                Task.id,
+                Task.user_id,
+                Task.title,
+                Task.state,
+                Task.created_at,
+                Task.updated_at,
+            ).where(Task.id.in_(task_ids)),
+        )
+    )
+    await conn.execute(
+        insert(ArchivedStep).from_select(
+            ["id", "task_id", "content", "order", "state", "created_at"],
+            select(
+                Step.id,
+                Step.task_id,
+                Step.content,
+                Step.order,
+                Step.state,
+                Step.created_at,
+            ).where(Step.task_id.in_(task_ids)),
+        )
+    )
+    await conn.execute(delete(Task).where(Task.id.in_(task_ids)))
+    return len(task_ids)
+
+
+async def _archive_stale_tasks() -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.archive_after_days)
+    moved = 0
+
+    async for _, engine in shard_worker_engines():
+        for stale in STALE_TASKS:
+            for _ in range(MAX_BATCHES_PER_RUN):
+                async with engine.begin() as conn:
+                    batch = await _archive_batch(conn, stale, cutoff)
+                if not batch:
+                    break
+                moved += batch
+
+    if moved:
+        logger.info("Archived %d tasks finished before %s", moved, cutoff.isoformat())
+    return moved
+
+
+@shared_task(name="app.tasks.archive.archive_stale_tasks")
+def archive_stale_tasks() -> int:
+    """Move long-finished (or abandoned mood) tasks and their steps into the
+    cold archive tables."""
+    return run_async(_archive_stale_tasks())
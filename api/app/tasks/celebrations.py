@@ -1,31 +1,36 @@
 import logging
 
-from celery import Celery
+from celery import shared_task
 
+from app.core.events import CELEBRATION_READY, publish_event_sync
 from app.core.settings import get_settings
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
-celery_app = Celery(
-    "gentle",
-    broker=settings.redis_url,
-    backend=settings.redis_url,
-)
 
-
-@celery_app.task
+@shared_task(name="app.tasks.celebrations.send_celebration", ignore_result=True)
 def send_celebration(user_id: str, step_id: str, kind: str) -> None:
     """Send a celebration for completed step.
     
-    Currently a placeholder that logs the celebration.
-    Future implementations could send emails, push notifications, etc.
+    Logs it and pushes a celebration.ready event to the user's open streams.
     """
     logger.info(
         f"🎉 Celebration triggered for user {user_id}, step {step_id}, kind: {kind}"
     )
     
-    # Placeholder implementation - just log for now
     # Future: send email via Resend, push notification, etc.
+    publish_event_sync(user_id, CELEBRATION_READY, step_ids=[step_id], kind=kind)
+    
+    return None
+
+@shared_task(name="app.tasks.celebrations.send_celebration_batch", ignore_result=True)
+def send_celebration_batch(user_id: str, step_ids: list[str], kind: str) -> None:
+    """Send one aggregated celebration for several steps completed together."""
+    logger.info(
+        f"🎉 Celebration triggered for user {user_id}, "
+        f"{len(step_ids)} steps, kind: {kind}"
+    )
+    publish_event_sync(user_id, CELEBRATION_READY, step_ids=step_ids, kind=kind)
     
-    return None
\ No newline at end of file
+    return None
@@ -0,0 +1,78 @@
+import logging
+from datetime import timedelta
+
+import sqlalchemy as sa
+from celery import shared_task
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.settings import get_settings
+from app.db.models import JobWatermark
+from app.db.worker import run_async, shard_worker_engines
+from app.services.digest import CelebrationDigest, digest_statement, get_digest_backend
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+DIGEST_JOB = "celebration_digest"
+
+
+async def _send_celebration_digests() -> int:
+    backend = get_digest_backend()
+    delivered = 0
+
+    async for shard, engine in shard_worker_engines():
+        async with engine.begin() as conn:
+            # created_at is the inserting transaction's start time, so rows
+            # can still commit with a slightly older timestamp; stay behind
+            until = await conn.scalar(
+                select(sa.func.now() - timedelta(seconds=settings.digest_lag_seconds))
+            )
+
+            # First run starts one interval back instead of replaying history
+            await conn.execute(
+                insert(JobWatermark)
+                .values(
+                    name=DIGEST_JOB,
+                    watermark=until
+                    - timedelta(seconds=settings.digest_interval_seconds),
+                )
+                .on_conflict_do_nothing(index_elements=[JobWatermark.name])
+            )
+            # The row lock is held until the watermark moves, so an
+            # overlapping run skips this shard instead of sending twice
+            since = await conn.scalar(
+                select(JobWatermark.watermark)
+                .where(JobWatermark.name == DIGEST_JOB)
+                .with_for_update(skip_locked=True)
+            )
+            if since is None:
+                logger.info("Celebration digest already running on %s, skipping", shard)
+                continue
+            if since >= until:
+                continue
+
+            result = await conn.stream(digest_statement(since, until))
+            async for rows in result.mappings().partitions(settings.digest_batch_size):
+                await backend.deliver(
+                    [CelebrationDigest(**row, since=since, until=until) for row in rows]
+                )
+                delivered += len(rows)
+
+            # Advanced only after delivery: a crash re-sends the window
+            # (at-least-once) rather than skipping it
+            await conn.execute(
+                update(JobWatermark)
+                .where(JobWatermark.name == DIGEST_JOB)
+                .values(watermark=until, updated_at=sa.func.now())
+            )
+
+    if delivered:
+        logger.info("Sent %d celebration digests", delivered)
+    return delivered
+
+
+@shared_task(name="app.tasks.digest.send_celebration_digests")
+def send_celebration_digests() -> int:
+    """Deliver one digest per user who celebrated anything since the last run."""
+    return run_async(_send_celebration_digests())
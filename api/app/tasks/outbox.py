@@ -0,0 +1,128 @@
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from celery import current_app, shared_task
+from sqlalchemy import Row, delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.metrics import CELERY_ENQUEUE_DURATION, OUTBOX_PUBLISH_DELAY
+from app.core.settings import get_settings
+from app.db.models import OutboxEvent
+from app.db.worker import run_async, shard_worker_engines
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Bounds one relay run so a backlog can't pin the worker; the next beat
+# tick carries on
+MAX_BATCHES_PER_RUN = 20
+PRUNE_BATCH_SIZE = 5000
+
+# A run that dies between claiming and marking leaves its rows claimed;
+# later runs take them over after this long and re-send them
+CLAIM_TIMEOUT = timedelta(minutes=1)
+
+
+async def _claim_batch(conn: AsyncConnection) -> list[Row]:
+    now = datetime.now(timezone.utc)
+    # SKIP LOCKED lets overlapping relay runs split the backlog
+    claimable = (
+        select(OutboxEvent.id)
+        .where(
+            OutboxEvent.sent_at.is_(None),
+            or_(
+                OutboxEvent.claimed_at.is_(None),
+                OutboxEvent.claimed_at < now - CLAIM_TIMEOUT,
+            ),
+        )
+        .order_by(OutboxEvent.id)
+        .limit(settings.outbox_batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    events = (
+        await conn.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id.in_(claimable))
+            .values(claimed_at=now)
+            .returning(
+                OutboxEvent.id,
+                OutboxEvent.task_name,
+                OutboxEvent.payload,
+                OutboxEvent.created_at,
+            )
+        )
+    ).all()
+    return sorted(events, key=lambda event: event.id)
+
+
+async def _relay_outbox() -> int:
+    published = 0
+
+    async for _, engine in shard_worker_engines():
+        for _ in range(MAX_BATCHES_PER_RUN):
+            # Claim and commit first: send_task can stall on the broker, and
+            # no row locks may be held while it does
+            async with engine.begin() as conn:
+                events = await _claim_batch(conn)
+            if not events:
+                break
+
+            # Publish before marking: a crash in between re-sends the
+            # batch (at-least-once) rather than losing it
+            sent_ids = []
+            try:
+                for event in events:
+                    start = time.perf_counter()
+                    current_app.send_task(event.task_name, kwargs=event.payload)
+                    CELERY_ENQUEUE_DURATION.labels(event.task_name).observe(
+                        time.perf_counter() - start
+                    )
+                    OUTBOX_PUBLISH_DELAY.labels(event.task_name).observe(
+                        (datetime.now(timezone.utc) - event.created_at).total_seconds()
+                    )
+                    sent_ids.append(event.id)
+            finally:
+                async with engine.begin() as conn:
+                    if sent_ids:
+                        await conn.execute(
+                            update(OutboxEvent)
+                            .where(OutboxEvent.id.in_(sent_ids))
+                            .values(sent_at=datetime.now(timezone.utc))
+                        )
+                    # Release what didn't go out so the next run retries it
+                    # without waiting for the claim to time out
+                    unsent_ids = [event.id for event in events[len(sent_ids) :]]
+                    if unsent_ids:
+                        await conn.execute(
+                            update(OutboxEvent)
+                            .where(OutboxEvent.id.in_(unsent_ids))
+                            .values(claimed_at=None)
+                        )
+
+            published += len(events)
+            if len(events) < settings.outbox_batch_size:
+                break
+
+        async with engine.begin() as conn:
+            cutoff = datetime.now(timezone.utc) - timedelta(
+                hours=settings.outbox_retention_hours
+            )
+            expired = (
+                select(OutboxEvent.id)
+                .where(OutboxEvent.sent_at < cutoff)
+                .limit(PRUNE_BATCH_SIZE)
+                .scalar_subquery()
+            )
+            await conn.execute(delete(OutboxEvent).where(OutboxEvent.id.in_(expired)))
+
+    if published:
+        logger.info("Outbox relay published %d events", published)
+    return published
+
+
+@shared_task(name="app.tasks.outbox.relay_outbox", ignore_result=True)
+def relay_outbox() -> int:
+    """Publish committed outbox rows to Celery and mark them sent."""
+    return run_async(_relay_outbox())
@@ -0,0 +1,98 @@
+import logging
+from datetime import date, datetime, timezone
+
+from celery import shared_task
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.core.settings import get_settings
+from app.db.partitions import add_months
+from app.db.worker import run_async, shard_worker_engines
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PARTITIONED_TABLES = ("moods", "celebrations")
+
+
+async def _maintain_partitions(today: date) -> dict:
+    current_month = today.replace(day=1)
+    created: list[str] = []
+    failed: list[str] = []
+    detached: list[str] = []
+
+    async for shard, engine in shard_worker_engines():
+        for table in PARTITIONED_TABLES:
+            # Create upcoming partitions ahead of time so inserts never
+            # land in the default partition. One transaction each: a month
+            # that can't be created (e.g. the default partition already
+            # holds rows for it) must not stop the others.
+            for offset in range(settings.partition_premake_months + 1):
+                month = add_months(current_month, offset)
+                try:
+                    async with engine.begin() as conn:
+                        name = await conn.scalar(
+                            text("SELECT ensure_monthly_partition(:parent, :month)"),
+                            {"parent": table, "month": month},
+                        )
+                except DBAPIError as e:
+                    failed.append(f"{shard}:{table}:{month:%Y_%m}")
+                    logger.error(
+                        "Could not create %s partition for %s on %s: %s",
+                        table,
+                        f"{month:%Y-%m}",
+                        shard,
+                        e,
+                    )
+                    continue
+                created.append(f"{shard}:{name}")
+
+        if settings.partition_retention_months <= 0:
+            continue
+
+        cutoff = add_months(current_month, -settings.partition_retention_months)
+        cutoff_suffix = cutoff.strftime("%Y_%m")
+
+        for table in PARTITIONED_TABLES:
+            async with engine.begin() as conn:
+                result = await conn.execute(
+                    text("""
+                        SELECT child.relname
+                        FROM pg_inherits
+                        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                        WHERE parent.relname = :parent
+                          AND child.relname ~ ('^' || :parent || '_p[0-9]{4}_[0-9]{2}$')
+                    """),
+                    {"parent": table},
+                )
+                # Names sort chronologically: moods_p2024_01 < moods_p2024_02
+                expired = sorted(
+                    name
+                    for (name,) in result
+                    if name.rsplit("_p", 1)[1] < cutoff_suffix
+                )
+
+            # One transaction per partition keeps lock hold times short
+            for name in expired:
+                async with engine.begin() as conn:
+                    await conn.execute(
+                        text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"')
+                    )
+                    if settings.partition_drop_detached:
+                        await conn.execute(text(f'DROP TABLE "{name}"'))
+                detached.append(f"{shard}:{name}")
+                logger.info(
+                    "Partition %s on %s past retention, detached (dropped=%s)",
+                    name,
+                    shard,
+                    settings.partition_drop_detached,
+                )
+
+    return {"ensured": created, "failed": failed, "detached": detached}
+
+
+@shared_task(name="app.tasks.partitions.maintain_partitions")
+def maintain_partitions() -> dict:
+    """Create upcoming monthly partitions and retire ones past retention."""
+    return run_async(_maintain_partitions(datetime.now(timezone.utc).date()))
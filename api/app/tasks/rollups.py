@@ -0,0 +1,44 @@
+import logging
+
+from celery import shared_task
+from sqlalchemy import select
+
+from app.db.models import User
+from app.db.worker import run_async, shard_worker_engines
+from app.services.moods import rollup_backfill_statement
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_USER_BATCH = 500
+
+
+async def _backfill_mood_rollups() -> int:
+    users_done = 0
+
+    async for shard, engine in shard_worker_engines():
+        last_user_id = None
+        while True:
+            # Keyset over users so each transaction stays small
+            async with engine.begin() as conn:
+                query = select(User.id).order_by(User.id).limit(BACKFILL_USER_BATCH)
+                if last_user_id is not None:
+                    query = query.where(User.id > last_user_id)
+                user_ids = list((await conn.execute(query)).scalars())
+                if not user_ids:
+                    break
+
+                await conn.execute(rollup_backfill_statement(user_ids))
+
+            users_done += len(user_ids)
+            last_user_id = user_ids[-1]
+            logger.info(
+                "Mood rollup backfill: %d users processed (%s)", users_done, shard
+            )
+
+    return users_done
+
+
+@shared_task(name="app.tasks.rollups.backfill_mood_rollups")
+def backfill_mood_rollups() -> int:
+    """One-off: recompute mood_daily_rollups days from the raw moods."""
+    return run_async(_backfill_mood_rollups())
@@ -0,0 +1,41 @@
+import logging
+from datetime import datetime, timedelta, timezone
+
+from celery import shared_task
+from sqlalchemy import delete
+
+from app.core.settings import get_settings
+from app.db.models import SyncTombstone
+from app.db.worker import run_async, shard_worker_engines
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+async def _prune_sync_tombstones() -> int:
+    # Cursors older than the retention window get a full resync, so their
+    # tombstones are no longer needed
+    cutoff = datetime.now(timezone.utc) - timedelta(
+        days=settings.sync_tombstone_retention_days
+    )
+    pruned = 0
+    async for shard, engine in shard_worker_engines():
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                delete(SyncTombstone).where(SyncTombstone.deleted_at < cutoff)
+            )
+        if result.rowcount:
+            logger.info(
+                "Pruned %d sync tombstones older than %s on %s",
+                result.rowcount,
+                cutoff.isoformat(),
+                shard,
+            )
+        pruned += result.rowcount
+    return pruned
+
+
+@shared_task(name="app.tasks.sync.prune_sync_tombstones")
+def prune_sync_tombstones() -> int:
+    """Drop tombstones no live sync cursor can still ask for."""
+    return run_async(_prune_sync_tombstones())
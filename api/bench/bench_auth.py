@@ -0,0 +1,122 @@
+"""Per-request CPU cost of bearer token authentication.
+
+Compares the previous path (rebuild the RSA JWK dict from the JWKS, let jose
+parse it, full RS256 verification) with the new one: a precompiled key on a
+cache miss, and a verified-token cache hit for repeat requests. No network
+or database needed; a throwaway RSA key signs the tokens.
+
+Run from api/:  python -m bench.bench_auth [--iterations N]
+"""
+
+import argparse
+import hashlib
+import json
+import time
+
+from cachetools import TLRUCache
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from app.deps.auth import _token_expiry, verify_jwt_token
+
+AUDIENCE = "authenticated"
+KID = "bench-key"
+
+
+def make_keys() -> tuple[str, dict]:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode("ascii")
+    public_jwk = jwk.construct(private_key.public_key(), algorithm="RS256").to_dict()
+    public_jwk.update(kid=KID, use="sig")
+    return private_pem, {"keys": [public_jwk]}
+
+
+def make_token(private_pem: str) -> str:
+    now = int(time.time())
+    claims = {
+        "sub": "12345678-1234-1234-1234-123456789012",
+        "aud": AUDIENCE,
+        "iat": now,
+        "exp": now + 3600,
+    }
+    return jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": KID})
+
+
+def legacy_verify(token: str, jwks: dict) -> dict:
+    # What verify_jwt_token used to do on every request
+    unverified_header = jwt.get_unverified_header(token)
+    rsa_key = None
+    for key in jwks["keys"]:
+        if key["kid"] == unverified_header["kid"]:
+            rsa_key = {
+                "kty": key["kty"],
+                "kid": key["kid"],
+                "use": key["use"],
+                "n": key["n"],
+                "e": key["e"],
+            }
+            break
+    return jwt.decode(token, rsa_key, algorithms=["RS256"], audience=AUDIENCE)
+
+
+def cpu_per_call(fn, *args, iterations: int) -> float:
+    fn(*args)  # warm up
+    start = time.process_time()
+    for _ in range(iterations):
+        fn(*args)
+    return (time.process_time() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    private_pem, jwks = make_keys()
+    token = make_token(private_pem)
+    compiled = {
+        key["kid"]: jwk.construct(key, algorithm="RS256") for key in jwks["keys"]
+    }
+    cache: TLRUCache = TLRUCache(maxsize=10000, ttu=_token_expiry, timer=time.time)
+
+    def precompiled_miss(token: str) -> dict:
+        kid = jwt.get_unverified_header(token)["kid"]
+        return verify_jwt_token(token, compiled[kid], AUDIENCE)
+
+    def cached_hit(token: str) -> dict:
+        token_hash = hashlib.sha256(token.encode("utf-8")).digest()
+        cached = cache.get(token_hash)
+        if cached is not None and cached[0] in compiled:
+            return cached[1]
+        claims = precompiled_miss(token)
+        cache[token_hash] = (KID, claims)
+        return claims
+
+    # All paths must agree on the claims
+    assert legacy_verify(token, jwks) == precompiled_miss(token) == cached_hit(token)
+
+    legacy = cpu_per_call(legacy_verify, token, jwks, iterations=args.iterations)
+    miss = cpu_per_call(precompiled_miss, token, iterations=args.iterations)
+    hit = cpu_per_call(cached_hit, token, iterations=args.iterations)
+
+    print(
+        json.dumps(
+            {
+                "legacy_cpu_us": round(legacy * 1e6, 1),
+                "precompiled_miss_cpu_us": round(miss * 1e6, 1),
+                "cached_hit_cpu_us": round(hit * 1e6, 1),
+                "miss_speedup": round(legacy / miss, 1) if miss else None,
+                "hit_speedup": round(legacy / hit, 1) if hit else None,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
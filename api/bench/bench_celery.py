@@ -0,0 +1,158 @@
+"""Celery queue throughput and Redis memory under sustained step completions.
+
+Publishes send_celebration messages at a fixed rate (what the outbox relay
+does as steps complete) to the broker in REDIS_URL, samples queue depth and
+Redis memory every second, then waits for the queue to drain. Start an
+interactive worker first (see docker-compose.yml) and point REDIS_URL at a
+throwaway Redis database.
+
+Run the same command on an older checkout to compare: before results were
+ignored every run left a celery-task-meta-* key behind for result_expires.
+
+Run from api/:  python -m bench.bench_celery [--rate N] [--duration S]
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+
+import redis
+
+from app.celery_app import INTERACTIVE_QUEUE, PRIORITY_STEPS, celery_app
+from app.core.settings import get_settings
+from app.services.outbox import SEND_CELEBRATION
+
+RESULT_KEY_PATTERN = "celery-task-meta-*"
+DRAIN_TIMEOUT_SECONDS = 300
+
+
+def queue_keys(queue: str) -> list[str]:
+    # kombu keeps one list per priority step; step 0 uses the bare name
+    return [queue if step == 0 else f"{queue}:{step}" for step in PRIORITY_STEPS]
+
+
+def queue_depth(client: redis.Redis, queue: str) -> int:
+    pipe = client.pipeline()
+    for key in queue_keys(queue):
+        pipe.llen(key)
+    # Reserved but not yet acked (late acks), including worker prefetch
+    pipe.hlen("unacked")
+    return sum(pipe.execute())
+
+
+def count_keys(client: redis.Redis, pattern: str) -> int:
+    return sum(1 for _ in client.scan_iter(match=pattern, count=1000))
+
+
+def used_memory(client: redis.Redis) -> int:
+    return int(client.info("memory")["used_memory"])
+
+
+class Sampler(threading.Thread):
+    """Queue depth and Redis memory once a second until stopped."""
+
+    def __init__(self, client: redis.Redis, queue: str):
+        super().__init__(daemon=True)
+        self.client = client
+        self.queue = queue
+        self.samples: list[dict] = []
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        started = time.monotonic()
+        while not self.stopped.is_set():
+            self.samples.append(
+                {
+                    "t": round(time.monotonic() - started, 1),
+                    "depth": queue_depth(self.client, self.queue),
+                    "used_memory": used_memory(self.client),
+                }
+            )
+            self.stopped.wait(1.0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--rate", type=int, default=500, help="messages published per second"
+    )
+    parser.add_argument(
+        "--duration", type=int, default=30, help="seconds of sustained load"
+    )
+    args = parser.parse_args()
+
+    client = redis.Redis.from_url(get_settings().redis_url)
+    if queue_depth(client, INTERACTIVE_QUEUE):
+        raise SystemExit(
+            f"Queue {INTERACTIVE_QUEUE!r} is not empty; drain it before benchmarking"
+        )
+
+    memory_before = used_memory(client)
+    results_before = count_keys(client, RESULT_KEY_PATTERN)
+    user_id = str(uuid.uuid4())
+
+    sampler = Sampler(client, INTERACTIVE_QUEUE)
+    sampler.start()
+
+    # Publish in per-tick bursts so the rate holds even when a send is slow
+    published = 0
+    publish_seconds = 0.0
+    started = time.monotonic()
+    with celery_app.producer_or_acquire() as producer:
+        for tick in range(args.duration * 10):
+            tick_start = time.monotonic()
+            for _ in range(args.rate // 10):
+                celery_app.send_task(
+                    SEND_CELEBRATION,
+                    kwargs={
+                        "user_id": user_id,
+                        "step_id": str(uuid.uuid4()),
+                        "kind": "step_completed",
+                    },
+                    producer=producer,
+                )
+                published += 1
+            publish_seconds += time.monotonic() - tick_start
+            time.sleep(max(0.0, started + (tick + 1) / 10 - time.monotonic()))
+    load_seconds = time.monotonic() - started
+
+    deadline = time.monotonic() + DRAIN_TIMEOUT_SECONDS
+    while queue_depth(client, INTERACTIVE_QUEUE) and time.monotonic() < deadline:
+        time.sleep(0.2)
+    drain_seconds = time.monotonic() - started
+    remaining = queue_depth(client, INTERACTIVE_QUEUE)
+
+    sampler.stopped.set()
+    sampler.join()
+    time.sleep(1.0)  # let the worker flush any trailing result writes
+
+    samples = sampler.samples
+    print(
+        json.dumps(
+            {
+                "published": published,
+                "publish_per_second": (
+                    round(published / publish_seconds) if publish_seconds else None
+                ),
+                "offered_per_second": round(published / load_seconds),
+                "completed_per_second": round((published - remaining) / drain_seconds),
+                "drained": remaining == 0,
+                "max_queue_depth": max(sample["depth"] for sample in samples),
+                "peak_memory_delta_bytes": max(
+                    sample["used_memory"] for sample in samples
+                )
+                - memory_before,
+                "final_memory_delta_bytes": used_memory(client) - memory_before,
+                "result_keys_added": count_keys(client, RESULT_KEY_PATTERN)
+                - results_before,
+                "samples": samples,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
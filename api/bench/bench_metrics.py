@@ -0,0 +1,130 @@
+"""Per-request CPU cost of the Prometheus instrumentation.
+
+Drives a bare FastAPI app (one parameterised route, a few simulated SQL
+statements per request) straight through ASGI, with and without
+MetricsMiddleware, sequentially and with many requests in flight. Also times
+a /metrics scrape once every route has series. No network or database needed.
+
+Run from api/:  python -m bench.bench_metrics [--iterations N] [--statements N]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.timing import _after_cursor_execute, _before_cursor_execute
+
+ROUTES = 20
+
+
+class FakeConnection:
+    """Stands in for the sync Connection the cursor events receive."""
+
+    def __init__(self) -> None:
+        self.info: dict = {}
+
+
+def make_app(statements: int) -> FastAPI:
+    app = FastAPI(default_response_class=ORJSONResponse)
+    conn = FakeConnection()
+
+    async def handler(task_id: str) -> dict:
+        for _ in range(statements):
+            _before_cursor_execute(conn, None, "SELECT 1", None, None, False)
+            _after_cursor_execute(conn, None, "SELECT 1", None, None, False)
+        return {"id": task_id, "title": "Bench task", "state": "pending"}
+
+    for i in range(ROUTES):
+        app.add_api_route(f"/v1/bench{i}/{{task_id}}", handler, methods=["GET"])
+    return app
+
+
+def scope_for(path: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+
+async def call(app, path: str) -> None:
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        pass
+
+    await app(scope_for(path), receive, send)
+
+
+async def cpu_per_request(app, iterations: int, concurrency: int) -> float:
+    paths = [f"/v1/bench{i % ROUTES}/{i}" for i in range(iterations)]
+    for path in paths[:ROUTES]:
+        await call(app, path)  # warm up routing and label caches
+
+    start = time.process_time()
+    for offset in range(0, iterations, concurrency):
+        await asyncio.gather(
+            *(call(app, path) for path in paths[offset : offset + concurrency])
+        )
+    return (time.process_time() - start) / iterations
+
+
+async def run(args: argparse.Namespace) -> dict:
+    bare = make_app(args.statements)
+    instrumented = MetricsMiddleware(make_app(args.statements))
+
+    report = {}
+    for concurrency in (1, args.concurrency):
+        # Interleaved rounds, best of each, to keep scheduler noise out
+        base, with_metrics = float("inf"), float("inf")
+        for _ in range(args.rounds):
+            base = min(base, await cpu_per_request(bare, args.iterations, concurrency))
+            with_metrics = min(
+                with_metrics,
+                await cpu_per_request(instrumented, args.iterations, concurrency),
+            )
+        report[f"concurrency_{concurrency}"] = {
+            "bare_cpu_us": round(base * 1e6, 1),
+            "instrumented_cpu_us": round(with_metrics * 1e6, 1),
+            "overhead_cpu_us": round((with_metrics - base) * 1e6, 1),
+            "overhead_pct": (
+                round((with_metrics - base) / base * 100, 1) if base else None
+            ),
+        }
+
+    start = time.perf_counter()
+    payload, _ = render_metrics()
+    report["scrape_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    report["scrape_bytes"] = len(payload)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument(
+        "--statements", type=int, default=5, help="simulated SQL statements per request"
+    )
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""Search latency against a seeded Postgres (GET /v1/search query path).
+
+Seeds synthetic users/tasks/steps into DATABASE_URL (run migrations first,
+and point it at a throwaway database), then times the search statement for
+a heavy user with as-you-type prefixes and reports latency percentiles.
+Seeded users share an id prefix; --reseed deletes only those.
+
+Run from api/:  python -m bench.bench_search [--users N] [--reseed]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.settings import get_settings
+from app.services.search import prefix_tsquery, search
+
+# Own prefix, apart from bench.seed's, so --reseed removes only these users
+SEARCH_ID_PREFIX = "be4c5ea4-0000-4000-8000-"
+SEARCH_USER_SQL = f"('{SEARCH_ID_PREFIX}' || lpad(to_hex(g.i), 12, '0'))::uuid"
+# Fixed id so reruns reuse the seeded data unless --reseed is passed
+HEAVY_USER_ID = uuid.UUID(f"{SEARCH_ID_PREFIX}ffffffffffff")
+TARGET_P95_MS = 50.0
+
+VOCABULARY = [
+    "buy",
+    "groceries",
+    "call",
+    "mom",
+    "email",
+    "landlord",
+    "laundry",
+    "dishes",
+    "write",
+    "report",
+    "draft",
+    "slides",
+    "book",
+    "dentist",
+    "appointment",
+    "pay",
+    "rent",
+    "invoice",
+    "clean",
+    "kitchen",
+    "bathroom",
+    "walk",
+    "dog",
+    "water",
+    "plants",
+    "reply",
+    "messages",
+    "schedule",
+    "meeting",
+    "review",
+    "notes",
+    "pack",
+    "bag",
+    "return",
+    "package",
+    "refill",
+    "prescription",
+    "stretch",
+    "journal",
+    "budget",
+    "taxes",
+    "renew",
+    "passport",
+    "fix",
+    "bike",
+    "tidy",
+    "desk",
+    "sort",
+    "mail",
+    "charge",
+    "phone",
+    "backup",
+    "laptop",
+    "order",
+]
+
+# Random phrase built per row; the reference to the outer row stops Postgres
+# from evaluating the subquery once and reusing it
+PHRASE_SQL = """
+    (SELECT string_agg(
+         w.words[1 + floor(random() * array_length(w.words, 1))::int], ' '
+     )
+     FROM generate_series(1, {words}) AS n(i),
+          (SELECT CAST(:vocab AS text[]) AS words) AS w
+     WHERE n.i > 0 AND {outer} IS NOT NULL)
+"""
+
+
+async def seed(
+    session: AsyncSession,
+    users: int,
+    tasks_per_user: int,
+    steps_per_task: int,
+    heavy_tasks: int,
+) -> None:
+    vocab = list(VOCABULARY)
+    prefix = f"{SEARCH_ID_PREFIX}%"
+    await session.execute(
+        text(
+            f"INSERT INTO users (id) SELECT {SEARCH_USER_SQL} "
+            "FROM generate_series(1, :users) AS g(i)"
+        ),
+        {"users": users},
+    )
+    await session.execute(
+        text("INSERT INTO users (id) VALUES (:id)"), {"id": HEAVY_USER_ID}
+    )
+
+    task_sql = f"""
+        INSERT INTO tasks (id, user_id, title, state, created_at, updated_at)
+        SELECT gen_random_uuid(), u.id, {PHRASE_SQL.format(words=4, outer="g.i")},
+               'active', now(), now()
+        FROM users u, generate_series(1, :per_user) AS g(i)
+        WHERE u.id::text LIKE :prefix AND u.id {{filter}}
+    """
+    await session.execute(
+        text(task_sql.replace("{filter}", "<> :heavy")),
+        {
+            "vocab": vocab,
+            "per_user": tasks_per_user,
+            "heavy": HEAVY_USER_ID,
+            "prefix": prefix,
+        },
+    )
+    await session.execute(
+        text(task_sql.replace("{filter}", "= :heavy")),
+        {
+            "vocab": vocab,
+            "per_user": heavy_tasks,
+            "heavy": HEAVY_USER_ID,
+            "prefix": prefix,
+        },
+    )
+
+    await session.execute(
+        text(f"""
+        INSERT INTO steps (id, task_id, content, "order", state, created_at)
+        SELECT gen_random_uuid(), t.id, {PHRASE_SQL.format(words=7, outer="g.i")},
+               g.i, 'pending', now()
+        FROM tasks t, generate_series(1, :per_task) AS g(i)
+        WHERE t.user_id::text LIKE :prefix
+    """),
+        {"vocab": vocab, "per_task": steps_per_task, "prefix": prefix},
+    )
+    await session.commit()
+    await session.execute(text("ANALYZE tasks"))
+    await session.execute(text("ANALYZE steps"))
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def run(args: argparse.Namespace) -> dict:
+    engine = create_async_engine(get_settings().database_url)
+    try:
+        async with AsyncSession(engine) as session:
+            seeded = (
+                await session.execute(
+                    text("SELECT 1 FROM users WHERE id = :id"), {"id": HEAVY_USER_ID}
+                )
+            ).first()
+            if seeded and args.reseed:
+                # Only this bench's users; tasks and steps cascade from them
+                await session.execute(
+                    text("DELETE FROM users WHERE id::text LIKE :prefix"),
+                    {"prefix": f"{SEARCH_ID_PREFIX}%"},
+                )
+                await session.commit()
+                seeded = None
+            if not seeded:
+                start = time.perf_counter()
+                await seed(
+                    session,
+                    args.users,
+                    args.tasks_per_user,
+                    args.steps_per_task,
+                    args.heavy_tasks,
+                )
+                print(f"seeded in {time.perf_counter() - start:.1f}s")
+
+            step_count = (
+                await session.execute(text("SELECT count(*) FROM steps"))
+            ).scalar_one()
+
+            rng = random.Random(42)
+            timings = []
+            for i in range(args.queries):
+                # As-you-type: a 2-5 character prefix, sometimes after a full word
+                word = rng.choice(VOCABULARY)
+                typed = word[: rng.randint(2, max(2, min(5, len(word))))]
+                if i % 3 == 0:
+                    typed = f"{rng.choice(VOCABULARY)} {typed}"
+                tsquery = prefix_tsquery(typed)
+
+                start = time.perf_counter()
+                rows = await search(session, HEAVY_USER_ID, tsquery, args.limit + 1)
+                if rows and i % 2 == 0:
+                    # Second page through the keyset cursor
+                    last = rows[min(len(rows), args.limit) - 1]
+                    await search(
+                        session,
+                        HEAVY_USER_ID,
+                        tsquery,
+                        args.limit + 1,
+                        (last["rank"], last["hit_id"]),
+                    )
+                timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        await engine.dispose()
+
+    p95 = percentile(timings, 0.95)
+    return {
+        "steps_total": step_count,
+        "queries": len(timings),
+        "p50_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(p95, 2),
+        "p99_ms": round(percentile(timings, 0.99), 2),
+        "target_p95_ms": TARGET_P95_MS,
+        "target_met": p95 < TARGET_P95_MS,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--tasks-per-user", type=int, default=100)
+    parser.add_argument("--steps-per-task", type=int, default=12)
+    parser.add_argument(
+        "--heavy-tasks",
+        type=int,
+        default=5000,
+        help="Tasks for the user being searched",
+    )
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument(
+        "--reseed", action="store_true", help="Delete the seeded users and seed again"
+    )
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Per-request CPU cost of serializing task list / task detail responses.
+
+Compares the previous path (ORM objects -> Pydantic models built field by
+field -> response_model validation -> JSONResponse) with the ORJSON path
+(Core row mappings -> dicts -> orjson). No database needed.
+
+Run from api/:  python -m bench.bench_serialization [--iterations N]
+"""
+
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import List
+
+from asyncpg.pgproto.pgproto import UUID as AsyncpgUUID
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.core.responses import rows_to_dicts, trusted_json
+from app.schemas.steps import StepResponse
+from app.schemas.tasks import TaskDetailResponse, TaskListItem
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def row_uuid() -> uuid.UUID:
+    # What asyncpg hands back for uuid columns
+    return AsyncpgUUID(str(uuid.uuid4()))
+
+
+def make_task_rows(count: int) -> list[dict]:
+    return [
+        {
+            "id": row_uuid(),
+            "title": f"Task number {i} with a reasonably sized title",
+            "state": ("pending", "active", "done", "archived")[i % 4],
+            "created_at": NOW - timedelta(minutes=i),
+            "updated_at": NOW - timedelta(minutes=i // 2),
+        }
+        for i in range(count)
+    ]
+
+
+def make_step_rows(task_id: uuid.UUID, count: int) -> list[dict]:
+    return [
+        {
+            "id": row_uuid(),
+            "task_id": task_id,
+            "content": f"Step {i}: do one small, concrete thing towards the goal",
+            "order": i + 1,
+            "state": "done" if i % 3 == 0 else "pending",
+            "created_at": NOW + timedelta(seconds=i),
+        }
+        for i in range(count)
+    ]
+
+
+def legacy_task_list(rows: list[dict]) -> bytes:
+    # What the router used to do: ORM objects, then models built by hand...
+    tasks = [SimpleNamespace(**row) for row in rows]
+    items = [
+        TaskListItem(
+            id=task.id,
+            title=task.title,
+            state=task.state,
+            created_at=task.created_at,
+            updated_at=task.updated_at,
+        )
+        for task in tasks
+    ]
+    # ...then FastAPI validates against response_model and encodes again
+    validated = TypeAdapter(List[TaskListItem]).validate_python(
+        [item.model_dump() for item in items]
+    )
+    return JSONResponse(content=jsonable_encoder(validated)).body
+
+
+def orjson_task_list(rows: list[dict]) -> bytes:
+    return trusted_json(rows_to_dicts(rows)).body
+
+
+def legacy_task_detail(task_row: dict, step_rows: list[dict]) -> bytes:
+    task = SimpleNamespace(
+        **task_row, steps=[SimpleNamespace(**row) for row in step_rows]
+    )
+    steps = sorted(task.steps, key=lambda s: s.order)
+    detail = TaskDetailResponse(
+        id=task.id,
+        title=task.title,
+        state=task.state,
+        created_at=task.created_at,
+        updated_at=task.updated_at,
+        steps=[
+            StepResponse(
+                id=step.id,
+                task_id=step.task_id,
+                content=step.content,
+                order=step.order,
+                state=step.state,
+                created_at=step.created_at,
+            )
+            for step in steps
+        ],
+    )
+    validated = TypeAdapter(TaskDetailResponse).validate_python(detail.model_dump())
+    return JSONResponse(content=jsonable_encoder(validated)).body
+
+
+def orjson_task_detail(task_row: dict, step_rows: list[dict]) -> bytes:
+    return trusted_json({**task_row, "steps": rows_to_dicts(step_rows)}).body
+
+
+def cpu_per_call(fn, *args, iterations: int) -> float:
+    fn(*args)  # warm up
+    start = time.process_time()
+    for _ in range(iterations):
+        fn(*args)
+    return (time.process_time() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--steps", type=int, default=12)
+    args = parser.parse_args()
+
+    task_rows = make_task_rows(args.tasks)
+    detail_task = task_rows[0]
+    step_rows = make_step_rows(detail_task["id"], args.steps)
+
+    # Both paths must produce the same document
+    assert json.loads(legacy_task_list(task_rows[:3]))[0]["id"] == str(
+        task_rows[0]["id"]
+    )
+    assert (
+        len(json.loads(orjson_task_detail(detail_task, step_rows))["steps"])
+        == args.steps
+    )
+
+    results = {}
+    for name, legacy, fast, fn_args in (
+        (f"task_list_{args.tasks}", legacy_task_list, orjson_task_list, (task_rows,)),
+        (
+            f"task_detail_{args.steps}_steps",
+            legacy_task_detail,
+            orjson_task_detail,
+            (detail_task, step_rows),
+        ),
+    ):
+        before = cpu_per_call(legacy, *fn_args, iterations=args.iterations)
+        after = cpu_per_call(fast, *fn_args, iterations=args.iterations)
+        results[name] = {
+            "before_cpu_ms": round(before * 1000, 4),
+            "after_cpu_ms": round(after * 1000, 4),
+            "speedup": round(before / after, 1) if after else None,
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
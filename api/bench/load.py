@@ -0,0 +1,573 @@
+"""Drive every /v1 route under concurrent load and report per-endpoint JSON.
+
+Seeds DATABASE_URL with bench.seed unless already seeded, starts the JWKS
+and OpenAI stubs (bench.stubs) in this process and the API (bench.server)
+in a subprocess pointed at them, then loads one endpoint at a time with
+--concurrency clients for --duration seconds after a short warm-up. Per
+endpoint it reports throughput, p50/p95/p99 latency, status codes and DB
+queries per request. Needs a migrated, unsharded Postgres and Redis,
+configured as for the API.
+
+Run from api/:
+    python -m bench.load [--concurrency N] [--duration S] [--only NAME ...]
+        [--output FILE]
+    python -m bench.load --compare before.json after.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.settings import get_settings
+from app.schemas.export import EXPORT_VERSION
+from bench.seed import add_seed_arguments, bench_user_id, ensure_seeded
+from bench.server import ENDPOINT_HEADER, QUERIES_PATH
+from bench.stubs import (
+    AUDIENCE,
+    BenchKeys,
+    free_port,
+    jwks_app,
+    openai_app,
+    serve_in_thread,
+)
+
+REPORT_VERSION = 1
+API_START_TIMEOUT_SECONDS = 60
+
+
+@dataclass
+class BenchUser:
+    id: uuid.UUID
+    token: str
+    open_task_ids: list[uuid.UUID] = field(default_factory=list)
+    pending_step_ids: list[uuid.UUID] = field(default_factory=list)
+    step_ids: list[uuid.UUID] = field(default_factory=list)
+    archived_task_ids: list[uuid.UUID] = field(default_factory=list)
+    sync_cursor: str | None = None
+
+
+# (method, path, **httpx kwargs) -> status code, bound to one user and endpoint
+Call = Callable[..., Awaitable[int]]
+ENDPOINTS: dict[str, Callable[[Call, BenchUser, random.Random], Awaitable[int]]] = {}
+
+
+def endpoint(name: str):
+    def register(fn):
+        ENDPOINTS[name] = fn
+        return fn
+
+    return register
+
+
+@endpoint("GET /v1/ping")
+async def ping(call: Call, user: BenchUser, rng: random.Random) -> int:
+    return await call("GET", "/v1/ping")
+
+
+@endpoint("GET /v1/tasks")
+async def list_tasks(call: Call, user: BenchUser, rng: random.Random) -> int:
+    return await call("GET", "/v1/tasks")
+
+
+@endpoint("POST /v1/tasks")
+async def create_task(call: Call, user: BenchUser, rng: random.Random) -> int:
+    return await call(
+        "POST", "/v1/tasks", json={"title": f"Load task {rng.randrange(10**6)}"}
+    )
+
+
+@endpoint("GET /v1/tasks/history")
+async def task_history(call: Call, user: BenchUser, rng: random.Random) -> int:
+    return await call("GET", "/v1/tasks/history")
+
+
+@endpoint("GET /v1/tasks/history/{task_id}")
+async def archived_task(call: Call, user: BenchUser, rng: random.Random) -> int:
+    return await call("GET", f"/v1/tasks/history/{rng.choice(user.archived_task_ids)}")
+
+
+@endpoint("GET /v1/tasks/{task_id}")
+async def task_detail(call: Call, user: BenchUser, rng: random.Random) -> int:
+    return await call("GET", f"/v1/tasks/{rng.choice(user.open_task_ids)}")
+
+
+@endpoint("GET /v1/tasks/{task_id}/next-step")
+async def task_next_step(call: Call, user: BenchUser, rng: random.Random) -> int:
+    return await call("GET", f"/v1/tasks/{rng.choice(user.open_task_ids)}/next-step")
+
+
+@endpoint("POST /v1/tasks/{task_id}/breakdown")
+async def breakdown(call: Call, user: BenchUser, rng: random.Random) -> int:
+    return await call(
+        "POST",
+        f"/v1/tasks/{rng.choice(user.open_task_ids)}/breakdown",
+        params={"energy": 2},
+    )
+
+
+@endpoint("POST /v1/mood/checkin")
+async def mood_checkin(call: Call, user: BenchUser, rng: random.Random) -> int:
+    return await call(
+        "POST",
+        "/v1/mood/checkin",
+        json={"energy": rng.randint(0, 4), "emotion": "calm"},
+    )
+
+
+@endpoint("GET /v1/mood/trends")
+async def mood_trends(call: Call, user: BenchUser, rng: random.Random) -> int:
+    return await call("GET", "/v1/mood/trends", params={"days": 30})
+
+
+@endpoint("GET /v1/steps/next")
+async def next_step(call: Call, user: BenchUser, rng: random.Random) -> int:
+    return await call("GET", "/v1/steps/next")
+
+
+@endpoint("POST /v1/steps/batch")
+async def step_batch(call: Call, user: BenchUser, rng: random.Random) -> int:
+    operations = [
+        {
+            "op": "reorder",
+            "step_id": str(rng.choice(user.step_ids)),
+            "order": rng.randint(1, 8),
+        }
+    ]
+    if user.pending_step_ids:
+        operations.append(
+            {"op": "complete", "step_id": str(user.pending_step_ids.pop())}
+        )
+    return await call("POST", "/v1/steps/batch", json={"operations": operations})
+
+
+@endpoint("POST /v1/steps/{step_id}/complete")
+async def complete_step(call: Call, user: BenchUser, rng: random.Random) -> int:
+    # Fresh steps while they last; completing a done step again is allowed
+    step_id = (
+        user.pending_step_ids.pop()
+        if user.pending_step_ids
+        else rng.choice(user.step_ids)
+    )
+    return await call("POST", f"/v1/steps/{step_id}/complete")
+
+
+@endpoint("POST /v1/steps/{step_id}/too-big")
+async def too_big(call: Call, user: BenchUser, rng: random.Random) -> int:
+    return await call("POST", f"/v1/steps/{rng.choice(user.step_ids)}/too-big")
+
+
+@endpoint("GET /v1/stats")
+async def stats(call: Call, user: BenchUser, rng: random.Random) -> int:
+    return await call("GET", "/v1/stats")
+
+
+@endpoint("GET /v1/search")
+async def search(call: Call, user: BenchUser, rng: random.Random) -> int:
+    return await call(
+        "GET",
+        "/v1/search",
+        params={"q": rng.choice(["bench", "bench st", "task 1", "step 3"])},
+    )
+
+
+@endpoint("GET /v1/sync")
+async def full_sync(call: Call, user: BenchUser, rng: random.Random) -> int:
+    return await call("GET", "/v1/sync")
+
+
+@endpoint("GET /v1/sync?since=")
+async def delta_sync(call: Call, user: BenchUser, rng: random.Random) -> int:
+    params = {"since": user.sync_cursor} if user.sync_cursor else {}
+    return await call("GET", "/v1/sync", params=params)
+
+
+@endpoint("POST /v1/sync/push")
+async def sync_push(call: Call, user: BenchUser, rng: random.Random) -> int:
+    return await call(
+        "POST",
+        "/v1/sync/push",
+        json={
+            "tasks": [{"id": str(uuid.uuid4()), "title": "Offline load task"}],
+            "moods": [
+                {
+                    "id": str(uuid.uuid4()),
+                    "energy": 2,
+                    "emotion": "tired",
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                }
+            ],
+        },
+    )
+
+
+@endpoint("GET /v1/export")
+async def export(call: Call, user: BenchUser, rng: random.Random) -> int:
+    return await call("GET", "/v1/export")
+
+
+@endpoint("POST /v1/import")
+async def import_(call: Call, user: BenchUser, rng: random.Random) -> int:
+    now = datetime.now(timezone.utc).isoformat()
+    lines = [
+        {"type": "export", "version": EXPORT_VERSION},
+        {
+            "type": "task",
+            "id": str(uuid.uuid4()),
+            "title": "Imported load task",
+            "state": "pending",
+            "created_at": now,
+            "updated_at": now,
+        },
+    ]
+    body = b"".join(json.dumps(line).encode() + b"\n" for line in lines)
+    return await call(
+        "POST",
+        "/v1/import",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+
+@endpoint("GET /v1/events")
+async def events(call: Call, user: BenchUser, rng: random.Random) -> int:
+    # Time to the ready event; the stream itself never ends
+    return await call("GET", "/v1/events", first_line_only=True)
+
+
+def bind_call(client: httpx.AsyncClient, user: BenchUser, name: str) -> Call:
+    async def call(
+        method: str,
+        url: str,
+        first_line_only: bool = False,
+        headers: dict | None = None,
+        **kwargs,
+    ) -> int:
+        headers = {
+            "Authorization": f"Bearer {user.token}",
+            ENDPOINT_HEADER.decode(): name,
+            **(headers or {}),
+        }
+        async with client.stream(method, url, headers=headers, **kwargs) as response:
+            if first_line_only:
+                async for _ in response.aiter_lines():
+                    break
+            else:
+                async for _ in response.aiter_raw():
+                    pass
+            return response.status_code
+
+    return call
+
+
+async def load_users(count: int, keys: BenchKeys) -> list[BenchUser]:
+    users = {
+        bench_user_id(i): BenchUser(
+            id=bench_user_id(i), token=keys.token(bench_user_id(i))
+        )
+        for i in range(count)
+    }
+    engine = create_async_engine(get_settings().database_url)
+    try:
+        async with engine.connect() as conn:
+            ids = list(users)
+            for user_id, task_id in await conn.execute(
+                text(
+                    "SELECT user_id, id FROM tasks "
+                    "WHERE user_id = ANY(:ids) AND state <> 'done'"
+                ),
+                {"ids": ids},
+            ):
+                users[user_id].open_task_ids.append(task_id)
+            for user_id, step_id, state in await conn.execute(
+                text(
+                    "SELECT t.user_id, s.id, s.state "
+                    "FROM steps s JOIN tasks t ON t.id = s.task_id "
+                    "WHERE t.user_id = ANY(:ids) AND t.state <> 'done'"
+                ),
+                {"ids": ids},
+            ):
+                users[user_id].step_ids.append(step_id)
+                if state == "pending":
+                    users[user_id].pending_step_ids.append(step_id)
+            for user_id, task_id in await conn.execute(
+                text(
+                    "SELECT user_id, id FROM archived_tasks WHERE user_id = ANY(:ids)"
+                ),
+                {"ids": ids},
+            ):
+                users[user_id].archived_task_ids.append(task_id)
+    finally:
+        await engine.dispose()
+
+    missing = [
+        str(user.id)
+        for user in users.values()
+        if not (user.open_task_ids and user.step_ids and user.archived_task_ids)
+    ]
+    if missing:
+        raise SystemExit(
+            f"{len(missing)} bench users have no seeded tasks; rerun with --reset"
+        )
+    return list(users.values())
+
+
+def start_api(port: int, env: dict) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "bench.server", "--port", str(port)], env=env
+    )
+    deadline = time.monotonic() + API_START_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"API exited with code {process.returncode}")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/healthz", timeout=1.0)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit("API did not start")
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def run_endpoint(
+    client: httpx.AsyncClient,
+    name: str,
+    users: list[BenchUser],
+    concurrency: int,
+    duration: float,
+    warmup: float,
+) -> dict:
+    handler = ENDPOINTS[name]
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+
+    async def worker(seed: int, deadline: float, record: bool) -> None:
+        rng = random.Random(seed)
+        while time.monotonic() < deadline:
+            user = rng.choice(users)
+            start = time.perf_counter()
+            try:
+                status = str(await handler(bind_call(client, user, name), user, rng))
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            if record:
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses[status] += 1
+
+    # Warm-up fills caches and pools; its requests and queries aren't reported
+    deadline = time.monotonic() + warmup
+    await asyncio.gather(*(worker(i, deadline, False) for i in range(concurrency)))
+    await client.get(QUERIES_PATH)
+
+    started = time.monotonic()
+    await asyncio.gather(
+        *(worker(concurrency + i, started + duration, True) for i in range(concurrency))
+    )
+    elapsed = time.monotonic() - started
+    queries = (await client.get(QUERIES_PATH)).json().get(name, [])
+
+    if not latencies:
+        return {"requests": 0}
+    return {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "max_ms": round(max(latencies), 2),
+        "statuses": dict(sorted(statuses.items())),
+        "error_rate": round(
+            sum(n for s, n in statuses.items() if not s.startswith(("2", "3")))
+            / len(latencies),
+            4,
+        ),
+        "db_queries_per_request": round(statistics.mean(queries), 2) if queries else 0,
+        "db_queries_max": max(queries, default=0),
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict:
+    started_at = datetime.now(timezone.utc)
+    seeded = await ensure_seeded(args)
+
+    keys = BenchKeys()
+    jwks_port, openai_port, api_port = free_port(), free_port(), free_port()
+    serve_in_thread(jwks_app(keys), jwks_port)
+    serve_in_thread(openai_app(args.openai_latency_ms), openai_port)
+
+    env = {
+        **os.environ,
+        # Anything but dev, which bypasses token verification
+        "APP_ENV": "bench",
+        "SUPABASE_JWKS_URL": f"http://127.0.0.1:{jwks_port}/keys",
+        "SUPABASE_AUDIENCE": AUDIENCE,
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{openai_port}/v1",
+        "OPENAI_API_KEY": "sk-bench",
+    }
+    api = start_api(api_port, env)
+    try:
+        users = await load_users(min(args.load_users, args.users), keys)
+        names = [
+            name
+            for name in ENDPOINTS
+            if not args.only or any(part in name for part in args.only)
+        ]
+        limits = httpx.Limits(
+            max_connections=args.concurrency + 1,
+            max_keepalive_connections=args.concurrency + 1,
+        )
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{api_port}", limits=limits, timeout=30.0
+        ) as client:
+            # Delta syncs need a cursor from a full sync first
+            for user in users:
+                response = await client.get(
+                    "/v1/sync", headers={"Authorization": f"Bearer {user.token}"}
+                )
+                user.sync_cursor = (
+                    response.json().get("cursor")
+                    if response.status_code == 200
+                    else None
+                )
+            await client.get(QUERIES_PATH)
+
+            results = {}
+            for name in names:
+                results[name] = await run_endpoint(
+                    client, name, users, args.concurrency, args.duration, args.warmup
+                )
+                result = results[name]
+                print(
+                    f"{name}: {result.get('throughput_rps', 0)} rps, "
+                    f"p95 {result.get('p95_ms')} ms",
+                    file=sys.stderr,
+                )
+    finally:
+        api.terminate()
+        api.wait()
+
+    return {
+        "version": REPORT_VERSION,
+        "meta": {
+            "started_at": started_at.isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "concurrency": args.concurrency,
+            "duration_seconds": args.duration,
+            "warmup_seconds": args.warmup,
+            "load_users": len(users),
+            "seed": {
+                "users": args.users,
+                "tasks_per_user": args.tasks_per_user,
+                "steps_per_task": args.steps_per_task,
+                "mood_days": args.mood_days,
+                **seeded,
+            },
+            "openai_latency_ms": args.openai_latency_ms,
+        },
+        "endpoints": results,
+    }
+
+
+def compare(before: dict, after: dict) -> dict:
+    """Per-endpoint change from one report to another (positive = more)."""
+
+    def change_pct(old, new):
+        return round((new - old) / old * 100, 1) if old else None
+
+    changes = {}
+    for name, new in after["endpoints"].items():
+        old = before["endpoints"].get(name)
+        if not old or not old.get("requests") or not new.get("requests"):
+            continue
+        changes[name] = {
+            "throughput_change_pct": change_pct(
+                old["throughput_rps"], new["throughput_rps"]
+            ),
+            "p50_change_pct": change_pct(old["p50_ms"], new["p50_ms"]),
+            "p95_change_pct": change_pct(old["p95_ms"], new["p95_ms"]),
+            "p99_change_pct": change_pct(old["p99_ms"], new["p99_ms"]),
+            "db_queries_change": round(
+                new["db_queries_per_request"] - old["db_queries_per_request"], 2
+            ),
+        }
+    return {
+        "before": before["meta"].get("git_commit"),
+        "after": after["meta"].get("git_commit"),
+        "endpoints": changes,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_seed_arguments(parser)
+    parser.add_argument(
+        "--load-users", type=int, default=200, help="seeded users the clients act as"
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="measured seconds per endpoint"
+    )
+    parser.add_argument(
+        "--warmup", type=float, default=2.0, help="unreported seconds per endpoint"
+    )
+    parser.add_argument("--openai-latency-ms", type=float, default=300.0)
+    parser.add_argument(
+        "--only", nargs="*", help="endpoints whose name contains any of these"
+    )
+    parser.add_argument("--output", help="write the report here as well as to stdout")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BEFORE", "AFTER"),
+        help="diff two reports and exit",
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as before, open(args.compare[1]) as after:
+            print(json.dumps(compare(json.load(before), json.load(after)), indent=2))
+        return
+
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
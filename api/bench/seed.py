@@ -0,0 +1,204 @@
+"""Seed DATABASE_URL with realistic volumes of bench users and their data.
+
+Users get fixed ids (bench_user_id), so the load generator and the JWKS stub
+can mint tokens for them without reading the database. Each user gets
+tasks in every state with steps, about three months of moods (with the
+rollups rebuilt), and a few archived tasks. Run migrations first and point
+DATABASE_URL at a throwaway, unsharded database.
+
+Run from api/:  python -m bench.seed [--users N] [--reset]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from datetime import date, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.core.settings import get_settings
+from app.services.moods import rollup_backfill_statement
+
+# Bench ids share a prefix so they can be found (and removed) as a group
+BENCH_ID_PREFIX = "be4c0000-0000-4000-8000-"
+ROLLUP_USER_BATCH = 500
+
+
+def bench_user_id(index: int) -> uuid.UUID:
+    return uuid.UUID(f"{BENCH_ID_PREFIX}{index:012x}")
+
+
+BENCH_USER_SQL = f"('{BENCH_ID_PREFIX}' || lpad(to_hex(g.i), 12, '0'))::uuid"
+
+
+async def is_seeded(conn: AsyncConnection) -> bool:
+    return (
+        await conn.scalar(
+            text("SELECT 1 FROM users WHERE id = :id"), {"id": bench_user_id(0)}
+        )
+    ) is not None
+
+
+async def remove_bench_users(conn: AsyncConnection) -> None:
+    # Everything else, archive included, cascades from users
+    await conn.execute(
+        text("DELETE FROM users WHERE id::text LIKE :prefix"),
+        {"prefix": f"{BENCH_ID_PREFIX}%"},
+    )
+
+
+async def seed(
+    conn: AsyncConnection,
+    users: int,
+    tasks_per_user: int,
+    steps_per_task: int,
+    mood_days: int,
+    archived_per_user: int,
+) -> None:
+    await conn.execute(
+        text(
+            f"INSERT INTO users (id) SELECT {BENCH_USER_SQL} "
+            "FROM generate_series(0, :last) AS g(i)"
+        ),
+        {"last": users - 1},
+    )
+
+    # Half pending, a third active, the rest done; timestamps over 90 days
+    await conn.execute(
+        text(f"""
+        INSERT INTO tasks (id, user_id, title, state, created_at, updated_at)
+        SELECT gen_random_uuid(), {BENCH_USER_SQL}, 'Bench task ' || t.n,
+               (CASE WHEN t.n % 6 < 3 THEN 'pending'
+                     WHEN t.n % 6 < 5 THEN 'active'
+                     ELSE 'done' END)::task_state_enum,
+               now() - (random() * interval '90 days'),
+               now() - (random() * interval '7 days')
+        FROM generate_series(0, :last) AS g(i), generate_series(1, :per_user) AS t(n)
+    """),
+        {"last": users - 1, "per_user": tasks_per_user},
+    )
+
+    # Done tasks have every step done; open tasks the first couple
+    await conn.execute(
+        text("""
+        INSERT INTO steps (id, task_id, content, "order", state, created_at)
+        SELECT gen_random_uuid(), t.id, 'Bench step ' || s.n || ' of ' || t.title, s.n,
+               (CASE WHEN t.state = 'done' OR s.n <= 2 THEN 'done'
+                     ELSE 'pending' END)::step_state_enum,
+               t.created_at
+        FROM tasks t, generate_series(1, :per_task) AS s(n)
+        WHERE t.user_id::text LIKE :prefix
+    """),
+        {"per_task": steps_per_task, "prefix": f"{BENCH_ID_PREFIX}%"},
+    )
+
+    # Moods land in their monthly partitions, as live check-ins would
+    month = (date.today() - timedelta(days=mood_days)).replace(day=1)
+    while month <= date.today():
+        await conn.execute(
+            text("SELECT ensure_monthly_partition(:parent, :month)"),
+            {"parent": "moods", "month": month},
+        )
+        month = (month + timedelta(days=32)).replace(day=1)
+    await conn.execute(
+        text(f"""
+        INSERT INTO moods (id, user_id, energy, emotion, note, created_at)
+        SELECT gen_random_uuid(), {BENCH_USER_SQL}, floor(random() * 5)::int,
+               (ARRAY['calm', 'anxious', 'tired', 'energized', 'low', 'mixed'])
+                   [1 + floor(random() * 6)::int]::emotion_enum,
+               CASE WHEN d.n % 3 = 0 THEN 'Bench note ' || d.n END,
+               now() - d.n * interval '1 day' - random() * interval '12 hours'
+        FROM generate_series(0, :last) AS g(i), generate_series(0, :days) AS d(n)
+    """),
+        {"last": users - 1, "days": mood_days},
+    )
+
+    await conn.execute(
+        text(f"""
+        INSERT INTO archived_tasks (id, user_id, title, state, created_at, updated_at)
+        SELECT gen_random_uuid(), {BENCH_USER_SQL}, 'Archived bench task ' || a.n,
+               'done'::task_state_enum,
+               now() - interval '200 days' - a.n * interval '1 day',
+               now() - interval '120 days'
+        FROM generate_series(0, :last) AS g(i), generate_series(1, :per_user) AS a(n)
+    """),
+        {"last": users - 1, "per_user": archived_per_user},
+    )
+    await conn.execute(
+        text("""
+        INSERT INTO archived_steps (id, task_id, content, "order", state, created_at)
+        SELECT gen_random_uuid(), a.id, 'Archived step ' || s.n, s.n,
+               'done'::step_state_enum, a.created_at
+        FROM archived_tasks a, generate_series(1, 5) AS s(n)
+        WHERE a.user_id::text LIKE :prefix
+    """),
+        {"prefix": f"{BENCH_ID_PREFIX}%"},
+    )
+
+    for start in range(0, users, ROLLUP_USER_BATCH):
+        user_ids = [
+            bench_user_id(i)
+            for i in range(start, min(users, start + ROLLUP_USER_BATCH))
+        ]
+        await conn.execute(rollup_backfill_statement(user_ids))
+
+
+async def ensure_seeded(args: argparse.Namespace) -> dict:
+    """Seed unless bench users exist already (or --reset was given)."""
+    engine = create_async_engine(get_settings().database_url)
+    try:
+        async with engine.begin() as conn:
+            if args.reset:
+                await remove_bench_users(conn)
+            elif await is_seeded(conn):
+                return {"seeded": False}
+            start = time.perf_counter()
+            await seed(
+                conn,
+                args.users,
+                args.tasks_per_user,
+                args.steps_per_task,
+                args.mood_days,
+                args.archived_per_user,
+            )
+            seconds = time.perf_counter() - start
+
+        async with engine.connect() as conn:
+            await conn.execution_options(isolation_level="AUTOCOMMIT")
+            for table in (
+                "users",
+                "tasks",
+                "steps",
+                "moods",
+                "archived_tasks",
+                "archived_steps",
+                "mood_daily_rollups",
+            ):
+                await conn.execute(text(f"ANALYZE {table}"))
+    finally:
+        await engine.dispose()
+    return {"seeded": True, "seconds": round(seconds, 1)}
+
+
+def add_seed_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--tasks-per-user", type=int, default=50)
+    parser.add_argument("--steps-per-task", type=int, default=8)
+    parser.add_argument("--mood-days", type=int, default=90)
+    parser.add_argument("--archived-per-user", type=int, default=10)
+    parser.add_argument(
+        "--reset", action="store_true", help="Delete bench users and seed again"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_seed_arguments(parser)
+    print(json.dumps(asyncio.run(ensure_seeded(parser.parse_args())), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""The API as bench.load runs it: app.main:app plus per-request query counting.
+
+Every SQL statement sent through the app's engines is counted against the
+request that issued it, keyed by the X-Bench-Endpoint header the load
+generator sets. GET /__bench/queries returns (and resets) the counts.
+Configure it through the environment exactly like the API.
+
+Run from api/:  python -m bench.server [--port N]
+"""
+
+import argparse
+from collections import defaultdict
+from contextvars import ContextVar
+
+import orjson
+import uvicorn
+from sqlalchemy import event
+
+ENDPOINT_HEADER = b"x-bench-endpoint"
+QUERIES_PATH = "/__bench/queries"
+
+# Statement count for the request being served, None outside requests
+_request_queries: ContextVar[list[int] | None] = ContextVar(
+    "bench_request_queries", default=None
+)
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    counter = _request_queries.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+class QueryCountingApp:
+    """ASGI wrapper recording queries per request under the endpoint header."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self.counts: dict[str, list[int]] = defaultdict(list)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if scope["path"] == QUERIES_PATH:
+            body = orjson.dumps(self.counts)
+            self.counts = defaultdict(list)
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [(b"content-type", b"application/json")],
+                }
+            )
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        endpoint = (
+            dict(scope["headers"]).get(ENDPOINT_HEADER, b"").decode() or scope["path"]
+        )
+        counter = [0]
+        token = _request_queries.set(counter)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_queries.reset(token)
+            self.counts[endpoint].append(counter[0])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    # Imported here so bench.load can use the constants above without
+    # building the app (and its engines) in the load generator process
+    from app.db.session import replica_engine, shard_engines
+    from app.main import app
+
+    for engine in [*shard_engines.values(), replica_engine]:
+        if engine is not None:
+            event.listen(engine.sync_engine, "before_cursor_execute", _count_statement)
+    uvicorn.run(
+        QueryCountingApp(app), host="127.0.0.1", port=args.port, log_level="warning"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Local stand-ins for Supabase's JWKS endpoint and the OpenAI API.
+
+The JWKS server publishes a throwaway RSA key and BenchKeys signs tokens
+with it, so the API's real verification path runs. The OpenAI stub answers
+chat completions with canned JSON after a configurable delay.
+
+Run from api/ to serve both for a separately started API:
+    python -m bench.stubs [--openai-latency-ms N] [--users N]
+then start the API with the SUPABASE_JWKS_URL / OPENAI_BASE_URL it prints.
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import uvicorn
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from bench.seed import bench_user_id
+
+AUDIENCE = "authenticated"
+KID = "bench-key"
+TOKEN_TTL_SECONDS = 24 * 3600
+
+
+class BenchKeys:
+    """One RSA key pair: its public half as a JWKS, its private half signs tokens."""
+
+    def __init__(self) -> None:
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.private_pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ).decode("ascii")
+        public_jwk = jwk.construct(
+            private_key.public_key(), algorithm="RS256"
+        ).to_dict()
+        public_jwk.update(kid=KID, use="sig", alg="RS256")
+        self.jwks = {"keys": [public_jwk]}
+
+    def token(self, user_id: str) -> str:
+        now = int(time.time())
+        claims = {
+            "sub": str(user_id),
+            "aud": AUDIENCE,
+            "iat": now,
+            "exp": now + TOKEN_TTL_SECONDS,
+        }
+        return jwt.encode(
+            claims, self.private_pem, algorithm="RS256", headers={"kid": KID}
+        )
+
+
+def jwks_app(keys: BenchKeys) -> Starlette:
+    async def keys_endpoint(request: Request) -> JSONResponse:
+        return JSONResponse(keys.jwks)
+
+    return Starlette(routes=[Route("/keys", keys_endpoint)])
+
+
+def canned_completion(system_prompt: str) -> str:
+    # Shaped after what each prompt in app.services.ai asks for
+    if '"rationale"' in system_prompt:
+        return json.dumps(
+            {
+                "content": "Drink a glass of water",
+                "rationale": "A small win to start with",
+            }
+        )
+    if '"emoji"' in system_prompt:
+        return json.dumps({"message": "You did it!", "emoji": "🎉"})
+    return json.dumps([{"content": f"Bench step {i}"} for i in range(1, 6)])
+
+
+def openai_app(latency_ms: float) -> Starlette:
+    async def chat_completions(request: Request) -> JSONResponse:
+        body = await request.json()
+        await asyncio.sleep(latency_ms / 1000)
+        system_prompt = next(
+            (
+                message["content"]
+                for message in body.get("messages", [])
+                if message.get("role") == "system"
+            ),
+            "",
+        )
+        return JSONResponse(
+            {
+                "id": "chatcmpl-bench",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "bench"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {
+                            "role": "assistant",
+                            "content": canned_completion(system_prompt),
+                        },
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "total_tokens": 0,
+                },
+            }
+        )
+
+    return Starlette(
+        routes=[Route("/v1/chat/completions", chat_completions, methods=["POST"])]
+    )
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve_in_thread(app, port: int) -> uvicorn.Server:
+    """Run an ASGI app on 127.0.0.1:port in a daemon thread; returns once it
+    accepts connections."""
+    server = uvicorn.Server(
+        uvicorn.Config(
+            app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"
+        )
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.monotonic() + 30
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Server on port {port} did not start")
+        time.sleep(0.05)
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jwks-port", type=int, default=8100)
+    parser.add_argument("--openai-port", type=int, default=8101)
+    parser.add_argument("--openai-latency-ms", type=float, default=300.0)
+    parser.add_argument(
+        "--users", type=int, default=3, help="print tokens for the first N seeded users"
+    )
+    args = parser.parse_args()
+
+    keys = BenchKeys()
+    serve_in_thread(jwks_app(keys), args.jwks_port)
+    serve_in_thread(openai_app(args.openai_latency_ms), args.openai_port)
+
+    print(
+        json.dumps(
+            {
+                "SUPABASE_JWKS_URL": f"http://127.0.0.1:{args.jwks_port}/keys",
+                "SUPABASE_AUDIENCE": AUDIENCE,
+                "OPENAI_BASE_URL": f"http://127.0.0.1:{args.openai_port}/v1",
+                "OPENAI_API_KEY": "sk-bench",
+                "tokens": {
+                    str(bench_user_id(i)): keys.token(bench_user_id(i))
+                    for i in range(args.users)
+                },
+            },
+            indent=2,
+        )
+    )
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def query_budgets():
+    """Fail the test if a request it made ran over its endpoint's @query_budget.
+
+    Budgets are declared on the endpoints (app.core.timing.query_budget), so
+    any test that drives the app through a client is checked; an N+1 that
+    slips in fails here instead of showing up in production latency.
+    """
+    # Imported lazily so collecting tests doesn't need the app's settings
+    from app.core import timing
+
+    violations: list[str] = []
+
+    def record(route: str, queries: int, budget: int) -> None:
+        violations.append(f"{route}: {queries} statements, budget {budget}")
+
+    timing.budget_listeners.append(record)
+    try:
+        yield violations
+    finally:
+        timing.budget_listeners.remove(record)
+    if violations:
+        pytest.fail("Query budget exceeded:\n" + "\n".join(violations), pytrace=False)
@@ -0,0 +1,27 @@
+"""gunicorn settings for running the API with several worker processes.
+
+    PROMETHEUS_MULTIPROC_DIR=/tmp/prometheus \\
+        gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker app.main:app
+
+The hooks keep /metrics right across worker restarts; see Metrics in the
+README.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+
+
+def on_starting(server) -> None:
+    # Master only, before any worker writes: drop the previous run's samples
+    from app.core.metrics import reset_multiproc_dir
+
+    reset_multiproc_dir()
+
+
+def child_exit(server, worker) -> None:
+    # Also covers workers that were killed and never ran their shutdown
+    from app.core.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
@@ -0,0 +1,124 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, text, update
+from sqlalchemy.dialects import postgresql
+
+from app.db.models import Celebration, Task
+from app.services.moods import MOOD_TASK_TITLE
+from app.tasks.archive import STALE_TASKS, _archive_stale_tasks, stale_batch_statement
+from tests.test_tasks import create_task_with_steps
+
+
+async def age_tasks(session, task_ids: list[str], days: int = 365) -> None:
+    await session.execute(
+        update(Task)
+        .where(Task.id.in_([uuid.UUID(task_id) for task_id in task_ids]))
+        .values(updated_at=datetime.now(timezone.utc) - timedelta(days=days))
+    )
+    await session.commit()
+
+
+async def test_archives_old_finished_tasks_and_keeps_celebrations(client, session):
+    task = await create_task_with_steps(client)
+    for step in task["steps"]:
+        await client.post(f"/v1/steps/{step['id']}/complete")
+    open_task = await create_task_with_steps(client, "Still going")
+    await age_tasks(session, [task["id"], open_task["id"]])
+
+    assert await _archive_stale_tasks() == 1
+
+    assert (await client.get(f"/v1/tasks/{task['id']}")).status_code == 404
+    assert (await client.get(f"/v1/tasks/{open_task['id']}")).status_code == 200
+    archived = (await client.get(f"/v1/tasks/history/{task['id']}")).json()
+    assert [step["id"] for step in archived["steps"]] == [
+        step["id"] for step in task["steps"]
+    ]
+    # Celebrations outlive the steps, with the reference cleared
+    step_ids = (await session.execute(select(Celebration.step_id))).scalars().all()
+    assert len(step_ids) == len(task["steps"])
+    assert set(step_ids) == {None}
+
+
+async def test_archives_abandoned_mood_tasks_by_kind(client, session, user_id):
+    await client.post("/v1/mood/checkin", json={"energy": 2, "emotion": "calm"})
+    mood_task_id = (
+        await session.execute(
+            select(Task.id).where(Task.user_id == user_id, Task.kind == "mood")
+        )
+    ).scalar_one()
+    # A user's own task that merely shares the title stays live
+    lookalike = await create_task_with_steps(client, MOOD_TASK_TITLE)
+    await session.execute(
+        update(Task).where(Task.id == uuid.UUID(lookalike["id"])).values(state="active")
+    )
+    await age_tasks(session, [str(mood_task_id), lookalike["id"]])
+
+    assert await _archive_stale_tasks() == 1
+
+    history = (await client.get("/v1/tasks/history")).json()
+    assert [item["id"] for item in history["items"]] == [str(mood_task_id)]
+    assert history["items"][0]["state"] == "active"
+    assert (await client.get(f"/v1/tasks/{lookalike['id']}")).status_code == 200
+
+
+async def test_each_archive_pass_reads_its_partial_index(db):
+    cutoff = datetime.now(timezone.utc)
+    plans = []
+    async with db.connect() as conn:
+        await conn.exec_driver_sql("SET enable_seqscan = off")
+        for stale in STALE_TASKS:
+            compiled = stale_batch_statement(stale, cutoff).compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+            result = await conn.exec_driver_sql(f"EXPLAIN {compiled}")
+            plans.append("\n".join(result.scalars()))
+
+    assert "ix_tasks_finished_updated_at" in plans[0]
+    assert "ix_tasks_mood_active_updated_at" in plans[1]
+
+
+async def test_history_pages_with_a_keyset_cursor(client, session):
+    task_ids = []
+    for i in range(5):
+        task = (await client.post("/v1/tasks", json={"title": f"Task {i}"})).json()
+        task_ids.append(task["id"])
+    await session.execute(update(Task).values(state="done"))
+    await session.commit()
+    await age_tasks(session, task_ids)
+    await _archive_stale_tasks()
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = (await client.get("/v1/tasks/history", params=params)).json()
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert sorted(seen) == sorted(task_ids)
+    assert len(seen) == len(set(seen))
+    assert (
+        await client.get("/v1/tasks/history", params={"cursor": "junk"})
+    ).status_code == 400
+
+
+async def test_celebration_step_ids_are_indexed(db):
+    async with db.connect() as conn:
+        indexes = (
+            (
+                await conn.execute(
+                    text(
+                        "SELECT indexdef FROM pg_indexes "
+                        "WHERE tablename = 'celebrations' "
+                        "AND indexdef LIKE '%(step_id)%'"
+                    )
+                )
+            )
+            .scalars()
+            .all()
+        )
+
+    assert indexes
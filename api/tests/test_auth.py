@@ -0,0 +1,78 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+from starlette.requests import Request
+
+from app.core.settings import get_settings
+from app.deps import auth
+from tests.test_jwks import AUDIENCE, FakeIdP, SigningKey
+
+
+@pytest.fixture(scope="module")
+def signing_key() -> SigningKey:
+    return SigningKey("key-1")
+
+
+@pytest.fixture
+def production(monkeypatch, signing_key):
+    """get_current_user's real verification path against a FakeIdP."""
+    idp = FakeIdP(signing_key)
+    monkeypatch.setattr(auth, "jwks_manager", idp.manager())
+    auth.verified_tokens.clear()
+    settings = get_settings().model_copy(
+        update={"app_env": "production", "supabase_audience": AUDIENCE}
+    )
+
+    async def authenticate(token: str) -> str:
+        request = Request({"type": "http", "headers": []})
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+        return (await auth.get_current_user(request, credentials, settings)).user_id
+
+    yield idp, authenticate
+    auth.verified_tokens.clear()
+
+
+async def test_verified_tokens_skip_verification_until_their_key_goes(
+    production, signing_key, monkeypatch
+):
+    idp, authenticate = production
+    verified = []
+    real_verify = auth.verify_jwt_token
+    monkeypatch.setattr(
+        auth, "verify_jwt_token", lambda *args: verified.append(1) or real_verify(*args)
+    )
+    token = signing_key.token()
+
+    assert await authenticate(token) == "user-1"
+    assert await authenticate(token) == "user-1"
+    assert len(verified) == 1
+
+    # The key is rotated out: the cached token no longer counts
+    idp.keys = [SigningKey("key-2")]
+    await auth.jwks_manager.refresh()
+    with pytest.raises(HTTPException) as raised:
+        await authenticate(token)
+    assert raised.value.status_code == 401
+
+
+async def test_tokens_without_exp_are_not_cached(production, signing_key):
+    _, authenticate = production
+    token = jwt.encode(
+        {"sub": "user-1", "aud": AUDIENCE},
+        signing_key.private_pem,
+        algorithm="RS256",
+        headers={"kid": "key-1"},
+    )
+
+    assert await authenticate(token) == "user-1"
+    assert len(auth.verified_tokens) == 0
+
+
+async def test_bad_signature_is_401(production):
+    _, authenticate = production
+    forged = SigningKey("key-1").token()
+
+    with pytest.raises(HTTPException) as raised:
+        await authenticate(forged)
+    assert raised.value.status_code == 401
@@ -0,0 +1,33 @@
+import pytest
+
+from app.celery_app import BULK_QUEUE, HIGH_PRIORITY, INTERACTIVE_QUEUE, celery_app
+from app.services.outbox import SEND_CELEBRATION, SEND_CELEBRATION_BATCH
+
+
+def route(task_name: str) -> dict:
+    return celery_app.amqp.router.route({}, task_name)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def registered_tasks():
+    celery_app.loader.import_default_modules()
+
+
+@pytest.mark.parametrize(
+    "task_name",
+    [SEND_CELEBRATION, SEND_CELEBRATION_BATCH, "app.tasks.outbox.relay_outbox"],
+)
+def test_user_facing_tasks_go_to_the_interactive_queue(task_name):
+    assert task_name in celery_app.tasks
+    assert route(task_name)["queue"].name == INTERACTIVE_QUEUE
+
+
+def test_relay_outruns_everything_else():
+    assert route("app.tasks.outbox.relay_outbox")["priority"] == HIGH_PRIORITY
+
+
+def test_every_scheduled_task_exists_and_maintenance_stays_bulk():
+    for entry in celery_app.conf.beat_schedule.values():
+        assert entry["task"] in celery_app.tasks
+        if not entry["task"].startswith("app.tasks.outbox."):
+            assert route(entry["task"])["queue"].name == BULK_QUEUE
@@ -0,0 +1,37 @@
+from sqlalchemy import text
+
+from app.core.settings import get_settings
+from app.db import worker
+from app.db.connect import connect_args
+
+
+def test_connect_args_only_with_pgbouncer(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "db_pgbouncer", False)
+    assert connect_args(settings) == {}
+
+    monkeypatch.setattr(settings, "db_pgbouncer", True)
+    args = connect_args(settings)
+    assert args["statement_cache_size"] == 0
+    assert args["prepared_statement_cache_size"] == 0
+    assert (
+        args["prepared_statement_name_func"]() != args["prepared_statement_name_func"]()
+    )
+
+
+async def test_worker_engine_uses_pgbouncer_args(db, monkeypatch):
+    monkeypatch.setattr(worker.settings, "db_pgbouncer", True)
+    seen = {}
+    create = worker.create_async_engine
+
+    def spy(url, **kwargs):
+        seen.update(kwargs)
+        return create(url, **kwargs)
+
+    monkeypatch.setattr(worker, "create_async_engine", spy)
+    async with worker.worker_engine() as engine:
+        async with engine.connect() as conn:
+            for _ in range(2):
+                assert (await conn.execute(text("SELECT 1"))).scalar() == 1
+
+    assert seen["connect_args"]["statement_cache_size"] == 0
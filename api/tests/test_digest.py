@@ -0,0 +1,100 @@
+from datetime import date, datetime, timedelta, timezone
+
+import orjson
+import pytest
+from sqlalchemy import text, update
+
+from app.db.models import Celebration, JobWatermark, Task, UserStats
+from app.services.digest import DigestBackend, FileDigestBackend
+from app.tasks import digest
+from app.tasks.digest import DIGEST_JOB, _send_celebration_digests
+from tests.test_tasks import create_task_with_steps
+
+
+@pytest.fixture
+def digest_file(tmp_path, monkeypatch):
+    path = tmp_path / "digests.ndjson"
+    monkeypatch.setattr(
+        digest, "get_digest_backend", lambda: FileDigestBackend(str(path))
+    )
+    return path
+
+
+def read_digests(path) -> list[dict]:
+    return (
+        [orjson.loads(line) for line in path.read_bytes().splitlines()]
+        if path.exists()
+        else []
+    )
+
+
+async def backdate(session, minutes: int = 5) -> None:
+    """Move everything so far out of DIGEST_LAG_SECONDS and open the window."""
+    at = datetime.now(timezone.utc) - timedelta(minutes=minutes)
+    await session.execute(update(Celebration).values(created_at=at))
+    await session.execute(
+        update(Task).where(Task.updated_at > at).values(updated_at=at)
+    )
+    await session.execute(
+        update(Task).where(Task.completed_at > at).values(completed_at=at)
+    )
+    await session.execute(text("DELETE FROM job_watermarks"))
+    session.add(JobWatermark(name=DIGEST_JOB, watermark=at - timedelta(hours=1)))
+    await session.commit()
+
+
+def test_backends_must_implement_deliver():
+    with pytest.raises(TypeError):
+        DigestBackend()
+
+
+async def test_digest_counts_a_window_once(client, session, user_id, digest_file):
+    task = await create_task_with_steps(client)
+    for step in task["steps"]:
+        await client.post(f"/v1/steps/{step['id']}/complete")
+    await backdate(session)
+
+    assert await _send_celebration_digests() == 1
+    assert await _send_celebration_digests() == 0
+
+    [sent] = read_digests(digest_file)
+    assert sent["user_id"] == str(user_id)
+    assert sent["celebrations"] == len(task["steps"])
+    assert sent["tasks_finished"] == 1
+    assert sent["streak"] == 1
+
+
+async def test_tasks_finished_before_the_window_are_not_counted(
+    client, session, digest_file
+):
+    task = await create_task_with_steps(client)
+    for step in task["steps"]:
+        await client.post(f"/v1/steps/{step['id']}/complete")
+    # Finished long ago; completing a step again touches the done task
+    two_days_ago = datetime.now(timezone.utc) - timedelta(days=2)
+    await session.execute(update(Task).values(completed_at=two_days_ago))
+    await session.commit()
+    await client.post(f"/v1/steps/{task['steps'][0]['id']}/complete")
+    await backdate(session)
+
+    assert await _send_celebration_digests() == 1
+
+    [sent] = read_digests(digest_file)
+    assert sent["celebrations"] == len(task["steps"]) + 1
+    assert sent["tasks_finished"] == 0
+
+
+async def test_digest_streak_decays_like_stats(client, session, digest_file):
+    task = await create_task_with_steps(client)
+    await client.post(f"/v1/steps/{task['steps'][0]['id']}/complete")
+    await session.execute(
+        update(UserStats).values(
+            current_streak=4, last_completion_day=date.today() - timedelta(days=5)
+        )
+    )
+    await backdate(session)
+
+    assert await _send_celebration_digests() == 1
+
+    [sent] = read_digests(digest_file)
+    assert sent["streak"] == 0
@@ -0,0 +1,17 @@
+from app.core.etag import etag_matches, make_etag
+
+
+def test_make_etag_is_stable_and_quoted():
+    etag = make_etag("task", "abc", None, 3)
+    assert etag == make_etag("task", "abc", None, 3)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag != make_etag("task", "abc", None, 4)
+
+
+def test_etag_matches_lists_weak_and_star():
+    etag = make_etag("x")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"nope", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"nope"', etag)
@@ -0,0 +1,97 @@
+import asyncio
+import time
+import uuid
+
+import orjson
+import pytest
+from asyncpg.pgproto.pgproto import UUID as AsyncpgUUID
+
+from app.core import events
+from app.core.events import (
+    PING_FRAME,
+    RESYNC_FRAME,
+    STEPS_COMPLETED,
+    EventHub,
+    encode_event,
+    publish_event,
+    sse_stream,
+)
+
+
+def test_encode_event_takes_database_ids():
+    step_id = AsyncpgUUID(str(uuid.uuid4()))
+
+    event = orjson.loads(encode_event(STEPS_COMPLETED, {"step_ids": [step_id]}))
+
+    assert event["type"] == STEPS_COMPLETED
+    assert event["data"] == {"step_ids": [str(step_id)]}
+
+
+async def test_publish_gives_up_on_a_stalled_redis(monkeypatch):
+    class StalledRedis:
+        async def publish(self, *args):
+            await asyncio.sleep(10)
+
+    monkeypatch.setattr(events, "get_redis", lambda: StalledRedis())
+
+    start = time.perf_counter()
+    await publish_event("user-1", STEPS_COMPLETED, step_ids=[])
+
+    assert time.perf_counter() - start < 1
+
+
+@pytest.fixture
+async def hub(db):
+    hub = EventHub(queue_size=2, heartbeat_seconds=60, max_connections=10)
+    await hub.start()
+    yield hub
+    await hub.stop()
+
+
+async def next_frame(queue: asyncio.Queue) -> bytes:
+    return await asyncio.wait_for(queue.get(), 2)
+
+
+async def test_published_events_reach_every_stream_of_the_user(hub):
+    async with (
+        hub.subscribe("user-1") as first,
+        hub.subscribe("user-1") as second,
+        hub.subscribe("user-2") as other,
+    ):
+        await publish_event("user-1", STEPS_COMPLETED, step_ids=["a"])
+
+        for queue in (first, second):
+            frame = await next_frame(queue)
+            assert frame.startswith(b"data: ")
+            assert orjson.loads(frame[len(b"data: ") :])["data"] == {"step_ids": ["a"]}
+        assert other.empty()
+        assert hub.connections == 3
+    assert hub.connections == 0
+
+
+async def test_a_slow_stream_is_told_to_resync(hub):
+    async with hub.subscribe("user-1") as queue:
+        for i in range(5):
+            await publish_event("user-1", STEPS_COMPLETED, step_ids=[str(i)])
+        await asyncio.sleep(0.2)
+
+        frames = [queue.get_nowait() for _ in range(queue.qsize())]
+        assert RESYNC_FRAME in frames
+        # Pings never push a backlog out
+        hub._broadcast(PING_FRAME)
+        hub._broadcast(PING_FRAME)
+        hub._broadcast(PING_FRAME)
+        assert RESYNC_FRAME not in [queue.get_nowait() for _ in range(queue.qsize())]
+
+
+async def test_sse_stream_starts_ready_and_ends_on_close(hub):
+    stream = sse_stream("user-1", hub)
+    assert b'"ready"' in await stream.__anext__()
+
+    await publish_event("user-1", STEPS_COMPLETED, step_ids=["a"])
+    assert b'"step_ids":["a"]' in await asyncio.wait_for(stream.__anext__(), 2)
+
+    await hub.stop()
+    with pytest.raises(StopAsyncIteration):
+        await asyncio.wait_for(stream.__anext__(), 2)
+    await hub.start()
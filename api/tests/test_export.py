@@ -0,0 +1,134 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import orjson
+
+from tests.test_tasks import create_task_with_steps
+
+
+def ndjson(*records: dict) -> bytes:
+    return b"".join(orjson.dumps(record) + b"\n" for record in records)
+
+
+async def test_export_round_trips_through_import(client, db):
+    task = await create_task_with_steps(client)
+    await client.post(f"/v1/steps/{task['steps'][0]['id']}/complete")
+    await client.post("/v1/mood/checkin", json={"energy": 3, "emotion": "calm"})
+
+    exported = await client.get("/v1/export")
+    assert exported.status_code == 200
+    lines = [orjson.loads(line) for line in exported.content.splitlines()]
+    assert lines[0]["type"] == "export"
+    counts = {
+        kind: sum(line["type"] == kind for line in lines)
+        for kind in ("task", "step", "mood", "celebration")
+    }
+    # The check-in adds its own micro-task and step
+    assert counts == {
+        "task": 2,
+        "step": len(task["steps"]) + 1,
+        "mood": 1,
+        "celebration": 1,
+    }
+
+    async with db.begin() as conn:
+        await conn.exec_driver_sql(
+            "TRUNCATE tasks, moods, celebrations, mood_daily_rollups CASCADE"
+        )
+
+    imported = await client.post("/v1/import", content=exported.content)
+    assert imported.status_code == 200
+    assert imported.json() == {
+        "tasks": 2,
+        "steps": len(task["steps"]) + 1,
+        "moods": 1,
+        "celebrations": 1,
+        "skipped": 0,
+    }
+    detail = (await client.get(f"/v1/tasks/{task['id']}")).json()
+    assert [step["id"] for step in detail["steps"]] == [
+        step["id"] for step in task["steps"]
+    ]
+    assert (await client.get("/v1/mood/trends")).json()["days"]
+
+    # Ids are kept, so the same file again inserts nothing
+    again = await client.post("/v1/import", content=exported.content)
+    assert again.json() == {
+        "tasks": 0,
+        "steps": 0,
+        "moods": 0,
+        "celebrations": 0,
+        "skipped": 0,
+    }
+
+
+async def test_import_skips_moods_outside_the_partitioned_range(client):
+    now = datetime.now(timezone.utc)
+    body = ndjson(
+        {"type": "export", "version": 1},
+        {
+            "type": "mood",
+            "id": str(uuid.uuid4()),
+            "energy": 2,
+            "emotion": "calm",
+            "created_at": now.isoformat(),
+        },
+        {
+            "type": "mood",
+            "id": str(uuid.uuid4()),
+            "energy": 2,
+            "emotion": "calm",
+            "created_at": "2001-01-01T00:00:00Z",
+        },
+        {
+            "type": "celebration",
+            "id": str(uuid.uuid4()),
+            "kind": "confetti",
+            "created_at": (now + timedelta(days=400)).isoformat(),
+        },
+    )
+
+    response = await client.post("/v1/import", content=body)
+
+    assert response.status_code == 200
+    assert response.json()["moods"] == 1
+    assert response.json()["celebrations"] == 0
+    assert response.json()["skipped"] == 2
+
+
+async def test_imported_moods_count_on_days_with_checkins(client):
+    await client.post("/v1/mood/checkin", json={"energy": 4, "emotion": "calm"})
+    earlier = datetime.now(timezone.utc) - timedelta(seconds=1)
+    body = ndjson(
+        {"type": "export", "version": 1},
+        {
+            "type": "mood",
+            "id": str(uuid.uuid4()),
+            "energy": 0,
+            "emotion": "low",
+            "created_at": earlier.isoformat(),
+        },
+    )
+
+    assert (await client.post("/v1/import", content=body)).json()["moods"] == 1
+
+    trends = (await client.get("/v1/mood/trends", params={"days": 1})).json()
+    assert trends["checkins"] == 2
+    assert trends["emotions"]["low"] == 1
+
+
+async def test_import_rejects_bad_lines(client):
+    naive = ndjson(
+        {
+            "type": "mood",
+            "id": str(uuid.uuid4()),
+            "energy": 2,
+            "emotion": "calm",
+            "created_at": "2026-01-01T00:00:00",
+        }
+    )
+    assert (await client.post("/v1/import", content=naive)).status_code == 400
+
+    response = await client.post("/v1/import", content=b'{"type": "task"}\nnot json\n')
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Line 1")
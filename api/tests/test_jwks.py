@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from app.core.jwks import JWKSManager, JWKSUnavailable
+
+AUDIENCE = "authenticated"
+
+
+class SigningKey:
+    def __init__(self, kid: str) -> None:
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.kid = kid
+        self.private_pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ).decode("ascii")
+        self.public_jwk = {
+            **jwk.construct(private_key.public_key(), algorithm="RS256").to_dict(),
+            "kid": kid,
+            "use": "sig",
+            "alg": "RS256",
+        }
+
+    def token(self, sub: str = "user-1", **claims) -> str:
+        claims = {"sub": sub, "aud": AUDIENCE, "exp": int(time.time()) + 3600, **claims}
+        return jwt.encode(
+            claims, self.private_pem, algorithm="RS256", headers={"kid": self.kid}
+        )
+
+
+class FakeIdP:
+    """Serves a JWKS over httpx.MockTransport and counts fetches."""
+
+    def __init__(self, *keys: SigningKey) -> None:
+        self.keys = list(keys)
+        self.fetches = 0
+        self.failing = False
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.fetches += 1
+        await asyncio.sleep(0.01)
+        if self.failing:
+            return httpx.Response(502)
+        return httpx.Response(200, json={"keys": [key.public_jwk for key in self.keys]})
+
+    def manager(self, **kwargs) -> JWKSManager:
+        manager = JWKSManager("http://idp.test/keys", **kwargs)
+        manager._client = httpx.AsyncClient(transport=httpx.MockTransport(self.handle))
+        return manager
+
+
+@pytest.fixture(scope="module")
+def signing_key() -> SigningKey:
+    return SigningKey("key-1")
+
+
+async def test_cold_lookups_share_one_fetch(signing_key):
+    idp = FakeIdP(signing_key)
+    manager = idp.manager()
+
+    keys = await asyncio.gather(*(manager.get_key("key-1") for _ in range(20)))
+
+    assert idp.fetches == 1
+    assert all(key is keys[0] is not None for key in keys)
+
+
+async def test_unknown_kids_refetch_once_per_cooldown(signing_key):
+    idp = FakeIdP(signing_key)
+    manager = idp.manager(unknown_kid_cooldown=60)
+    await manager.refresh()
+
+    assert await manager.get_key("rotated") is None
+    assert await manager.get_key("another") is None
+    assert idp.fetches == 2
+
+
+async def test_failed_refresh_keeps_serving_keys(signing_key):
+    idp = FakeIdP(signing_key)
+    manager = idp.manager()
+    await manager.refresh()
+    idp.failing = True
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await manager.refresh()
+    assert await manager.get_key("key-1") is not None
+
+
+async def test_unreachable_idp_on_cold_start_is_unavailable(signing_key):
+    idp = FakeIdP(signing_key)
+    idp.failing = True
+
+    with pytest.raises(JWKSUnavailable):
+        await idp.manager().get_key("key-1")
@@ -0,0 +1,157 @@
+import os
+import subprocess
+import sys
+
+from prometheus_client.parser import text_string_to_metric_families
+
+from tests.conftest import API_ROOT
+from tests.test_tasks import create_task_with_steps
+
+
+def sample(payload: str, name: str, **labels) -> float | None:
+    for family in text_string_to_metric_families(payload):
+        for metric in family.samples:
+            if metric.name == name and all(
+                metric.labels.get(key) == value for key, value in labels.items()
+            ):
+                return metric.value
+    return None
+
+
+async def test_requests_are_labelled_by_route_template(client):
+    task = await create_task_with_steps(client)
+    await client.get(f"/v1/tasks/{task['id']}")
+    await client.get("/v1/no-such-route")
+
+    payload = (await client.get("/metrics")).text
+
+    assert sample(
+        payload,
+        "gentle_http_request_duration_seconds_count",
+        method="GET",
+        route="/v1/tasks/{task_id}",
+        status="200",
+    )
+    # Raw paths never become labels
+    assert task["id"] not in payload
+    assert "no-such-route" not in payload
+    assert sample(
+        payload,
+        "gentle_db_request_queries_total",
+        method="GET",
+        route="/v1/tasks/{task_id}",
+    )
+
+
+def test_multiprocess_scrape_sums_every_worker(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    count_one = (
+        "from app.core.metrics import AI_FALLBACKS\n"
+        "AI_FALLBACKS.labels('breakdown', 'timeout').inc()\n"
+    )
+    for _ in range(2):
+        subprocess.run(
+            [sys.executable, "-c", count_one], cwd=API_ROOT, env=env, check=True
+        )
+
+    scrape = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import app.core.jwks\n"
+            "from app.core.metrics import render_metrics\n"
+            "print(render_metrics()[0].decode())",
+        ],
+        cwd=API_ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+    assert (
+        sample(
+            scrape, "gentle_ai_fallbacks_total", operation="breakdown", reason="timeout"
+        )
+        == 2
+    )
+    # Scrape-time collectors still report, from the scraping process
+    assert sample(scrape, "gentle_jwks_keys") == 0
+
+
+def test_restarts_and_dead_workers_leave_no_stale_samples(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    scrape = (
+        "import sys\n"
+        "from app.core.metrics import mark_process_dead, render_metrics\n"
+        "for pid in sys.argv[1:]:\n"
+        "    mark_process_dead(int(pid))\n"
+        "print(render_metrics()[0].decode())"
+    )
+    # A worker killed mid-request never decrements its in-flight gauge
+    stuck = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            (
+                "from app.core.metrics import AI_FALLBACKS, HTTP_REQUESTS_IN_FLIGHT\n"
+                "AI_FALLBACKS.labels('breakdown', 'timeout').inc()\n"
+                "HTTP_REQUESTS_IN_FLIGHT.labels('GET').inc()\n"
+            ),
+        ],
+        cwd=API_ROOT,
+        env=env,
+    )
+    assert stuck.wait() == 0
+
+    def run(*args) -> str:
+        return subprocess.run(
+            [sys.executable, "-c", scrape, *args],
+            cwd=API_ROOT,
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+
+    in_flight = "gentle_http_requests_in_flight"
+    assert sample(run(), in_flight, method="GET") == 1
+    assert not sample(run(str(stuck.pid)), in_flight, method="GET")
+
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "from app.core.metrics import reset_multiproc_dir\n"
+            "reset_multiproc_dir()",
+        ],
+        cwd=API_ROOT,
+        env=env,
+        check=True,
+    )
+    after_restart = run()
+    assert not sample(
+        after_restart,
+        "gentle_ai_fallbacks_total",
+        operation="breakdown",
+        reason="timeout",
+    )
+
+
+async def test_metrics_token_guards_the_endpoint(monkeypatch):
+    import httpx
+
+    from app import main
+    from app.core.settings import get_settings
+
+    settings = get_settings().model_copy(update={"metrics_token": "scraper"})
+    monkeypatch.setattr(main, "get_settings", lambda: settings)
+    app = main.create_app()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.get("/metrics")).status_code == 401
+        wrong = {"Authorization": "Bearer guess"}
+        assert (await client.get("/metrics", headers=wrong)).status_code == 401
+        right = {"Authorization": "Bearer scraper"}
+        assert (await client.get("/metrics", headers=right)).status_code == 200
@@ -0,0 +1,131 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, text
+
+from app.db.models import Mood, MoodDailyRollup, User
+from app.routers import mood as mood_router
+from app.services.moods import rollup_backfill_statement
+
+
+async def test_checkin_feeds_trends_on_the_local_day(client):
+    headers = {"X-Timezone": "Pacific/Kiritimati"}
+
+    for energy, emotion in ((1, "tired"), (3, "calm")):
+        response = await client.post(
+            "/v1/mood/checkin",
+            json={"energy": energy, "emotion": emotion},
+            headers=headers,
+        )
+        assert response.status_code == 200
+
+    trends = (
+        await client.get("/v1/mood/trends", params={"days": 7}, headers=headers)
+    ).json()
+    assert trends["checkins"] == 2
+    assert trends["avg_energy"] == 2
+    assert trends["emotions"]["tired"] == 1 and trends["emotions"]["calm"] == 1
+    assert (
+        trends["days"][-1]["day"]
+        == datetime.now(timezone(timedelta(hours=14))).date().isoformat()
+    )
+
+
+async def test_checkin_holds_no_lock_during_the_ai_call(client, db, monkeypatch):
+    await client.post("/v1/mood/checkin", json={"energy": 2, "emotion": "calm"})
+    probes = []
+    generate = mood_router.generate_tiny_step_from_mood
+
+    async def probing_ai(**kwargs):
+        # Today's rollup row must be lockable by others while the AI runs
+        async with db.connect() as conn:
+            await conn.execute(text("SET lock_timeout = '100ms'"))
+            locked = await conn.execute(
+                text("SELECT 1 FROM mood_daily_rollups FOR UPDATE NOWAIT")
+            )
+            probes.append(locked.all())
+        return await generate(**kwargs)
+
+    monkeypatch.setattr(mood_router, "generate_tiny_step_from_mood", probing_ai)
+    response = await client.post(
+        "/v1/mood/checkin", json={"energy": 4, "emotion": "energized"}
+    )
+
+    assert response.status_code == 200
+    assert probes == [[(1,)]]
+
+
+async def test_backfill_recomputes_days_live_checkins_started(session):
+    user_id = uuid.uuid4()
+    session.add(User(id=user_id))
+    await session.flush()
+    today = datetime.now(timezone.utc).replace(
+        hour=12, minute=0, second=0, microsecond=0
+    )
+    yesterday = today - timedelta(days=1)
+    moods = (
+        (today - timedelta(hours=2), 1),
+        (today, 4),
+        (yesterday, 2),
+        (yesterday, 0),
+    )
+    for created_at, energy in moods:
+        session.add(
+            Mood(user_id=user_id, energy=energy, emotion="calm", created_at=created_at)
+        )
+    # Deploy day: the live path only saw the check-in after the deploy
+    session.add(
+        MoodDailyRollup(
+            user_id=user_id,
+            day=today.date(),
+            checkin_count=1,
+            energy_sum=4,
+            energy_min=4,
+            energy_max=4,
+            calm_count=1,
+        )
+    )
+    await session.commit()
+
+    for _ in range(2):
+        await session.execute(rollup_backfill_statement([user_id]))
+        await session.commit()
+
+    rollups = await session.execute(
+        select(MoodDailyRollup).where(MoodDailyRollup.user_id == user_id)
+    )
+    rows = {
+        row.day: (
+            row.checkin_count,
+            row.energy_sum,
+            row.energy_min,
+            row.energy_max,
+            row.calm_count,
+        )
+        for row in rollups.scalars()
+    }
+    assert rows == {today.date(): (2, 5, 1, 4, 2), yesterday.date(): (2, 2, 0, 2, 2)}
+
+
+async def test_backfill_buckets_in_the_given_timezone(session):
+    user_id = uuid.uuid4()
+    session.add(User(id=user_id))
+    await session.flush()
+    # 23:30 UTC is already the next day in Berlin
+    created_at = datetime(2026, 10, 10, 23, 30, tzinfo=timezone.utc)
+    session.add(Mood(user_id=user_id, energy=1, emotion="low", created_at=created_at))
+    await session.commit()
+
+    await session.execute(rollup_backfill_statement([user_id], "Europe/Berlin"))
+    await session.commit()
+
+    days = (
+        (
+            await session.execute(
+                select(MoodDailyRollup.day).where(MoodDailyRollup.user_id == user_id)
+            )
+        )
+        .scalars()
+        .all()
+    )
+    assert [day.isoformat() for day in days] == ["2026-10-11"]
@@ -0,0 +1,130 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.db.models import OutboxEvent
+from app.services.outbox import enqueue_task
+from app.tasks import outbox
+from app.tasks.outbox import CLAIM_TIMEOUT, _relay_outbox
+
+
+class Broker:
+    """Stands in for current_app: records send_task calls, can be made to fail."""
+
+    def __init__(self) -> None:
+        self.sent: list[tuple[str, dict]] = []
+        self.fail_on: str | None = None
+
+    def send_task(self, name: str, kwargs: dict) -> None:
+        if name == self.fail_on:
+            raise ConnectionError("broker down")
+        self.sent.append((name, kwargs))
+
+
+@pytest.fixture
+def broker(monkeypatch, db):
+    broker = Broker()
+    monkeypatch.setattr(outbox, "current_app", broker)
+    return broker
+
+
+async def outbox_rows(session) -> list[OutboxEvent]:
+    session.expire_all()
+    return (
+        (await session.execute(select(OutboxEvent).order_by(OutboxEvent.id)))
+        .scalars()
+        .all()
+    )
+
+
+async def test_relay_publishes_committed_rows_once(session, broker):
+    enqueue_task(session, "app.tasks.example.first", n=1)
+    enqueue_task(session, "app.tasks.example.second", n=2)
+    await session.commit()
+
+    assert await _relay_outbox() == 2
+    assert await _relay_outbox() == 0
+
+    assert broker.sent == [
+        ("app.tasks.example.first", {"n": 1}),
+        ("app.tasks.example.second", {"n": 2}),
+    ]
+    assert all(row.sent_at is not None for row in await outbox_rows(session))
+
+
+async def test_publishing_holds_no_row_locks(session, broker):
+    enqueue_task(session, "app.tasks.example.first", n=1)
+    await session.commit()
+
+    async def try_lock() -> None:
+        engine = create_async_engine(os.environ["DATABASE_URL"], poolclass=NullPool)
+        try:
+            async with engine.begin() as conn:
+                await conn.exec_driver_sql(
+                    "SELECT id FROM outbox_events FOR UPDATE NOWAIT"
+                )
+        finally:
+            await engine.dispose()
+
+    def send_task(name: str, kwargs: dict) -> None:
+        # send_task is synchronous: probe from another thread and loop,
+        # while the relay is mid-publish
+        with ThreadPoolExecutor(1) as pool:
+            pool.submit(asyncio.run, try_lock()).result()
+        broker.sent.append((name, kwargs))
+
+    broker.send_task = send_task
+
+    assert await _relay_outbox() == 1
+
+
+async def test_failed_publish_marks_what_went_out_and_releases_the_rest(
+    session, broker
+):
+    enqueue_task(session, "app.tasks.example.first", n=1)
+    enqueue_task(session, "app.tasks.example.broken", n=2)
+    enqueue_task(session, "app.tasks.example.third", n=3)
+    await session.commit()
+    broker.fail_on = "app.tasks.example.broken"
+
+    with pytest.raises(ConnectionError):
+        await _relay_outbox()
+
+    first, broken, third = await outbox_rows(session)
+    assert first.sent_at is not None
+    assert broken.sent_at is None and broken.claimed_at is None
+    assert third.sent_at is None and third.claimed_at is None
+
+    broker.fail_on = None
+    assert await _relay_outbox() == 2
+    assert [name for name, _ in broker.sent] == [
+        "app.tasks.example.first",
+        "app.tasks.example.broken",
+        "app.tasks.example.third",
+    ]
+
+
+async def test_abandoned_claims_are_taken_over_after_the_timeout(session, broker):
+    enqueue_task(session, "app.tasks.example.first", n=1)
+    await session.commit()
+    # A relay run that claimed the row and died
+    await session.execute(
+        update(OutboxEvent).values(claimed_at=datetime.now(timezone.utc))
+    )
+    await session.commit()
+
+    assert await _relay_outbox() == 0
+
+    await session.execute(
+        update(OutboxEvent).values(
+            claimed_at=datetime.now(timezone.utc) - CLAIM_TIMEOUT * 2
+        )
+    )
+    await session.commit()
+    assert await _relay_outbox() == 1
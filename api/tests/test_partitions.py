@@ -0,0 +1,75 @@
+import uuid
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+
+from app.core.settings import get_settings
+from app.db.models import Mood, User
+from app.db.partitions import (
+    MAX_CLOCK_SKEW,
+    accepted_created_at_range,
+    add_months,
+    in_accepted_range,
+)
+from app.tasks.partitions import _maintain_partitions
+
+
+async def test_premake_continues_past_a_month_it_cannot_create(session, db):
+    this_month = datetime.now(timezone.utc).date().replace(day=1)
+    start = add_months(this_month, 6)
+    blocked = add_months(start, 1)
+    user_id = uuid.uuid4()
+    session.add(User(id=user_id))
+    await session.flush()
+    # No partition that far ahead yet, so the row lands in moods_default
+    session.add(
+        Mood(
+            user_id=user_id,
+            energy=2,
+            emotion="calm",
+            created_at=datetime(blocked.year, blocked.month, 15, tzinfo=timezone.utc),
+        )
+    )
+    await session.commit()
+
+    try:
+        result = await _maintain_partitions(start)
+
+        assert f"primary:moods:{blocked:%Y_%m}" in result["failed"]
+        assert f"primary:moods_p{start:%Y_%m}" in result["ensured"]
+        # Later months and the other table are still created
+        assert f"primary:moods_p{add_months(start, 3):%Y_%m}" in result["ensured"]
+        assert f"primary:celebrations_p{blocked:%Y_%m}" in result["ensured"]
+    finally:
+        async with db.begin() as conn:
+            for offset in range(4):
+                month = add_months(start, offset)
+                for table in ("moods", "celebrations"):
+                    await conn.execute(
+                        text(f'DROP TABLE IF EXISTS "{table}_p{month:%Y_%m}"')
+                    )
+
+
+def test_add_months_wraps_years():
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+
+def test_accepted_created_at_range(monkeypatch):
+    settings = get_settings()
+    now = datetime(2026, 10, 19, 12, tzinfo=timezone.utc)
+    monkeypatch.setattr(settings, "partition_retention_months", 24)
+    accepted = accepted_created_at_range(settings, now)
+
+    assert accepted == (
+        datetime(2024, 10, 1, tzinfo=timezone.utc),
+        now + MAX_CLOCK_SKEW,
+    )
+    assert in_accepted_range(datetime(2024, 10, 1, tzinfo=timezone.utc), accepted)
+    assert not in_accepted_range(
+        datetime(2024, 9, 30, 23, tzinfo=timezone.utc), accepted
+    )
+    assert not in_accepted_range(now + MAX_CLOCK_SKEW * 2, accepted)
+
+    monkeypatch.setattr(settings, "partition_retention_months", 0)
+    assert accepted_created_at_range(settings, now)[0] is None
@@ -0,0 +1,79 @@
+import json
+import os
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from app.core.profiling import (
+    PROFILE_SUFFIX,
+    PYINSTRUMENT_AVAILABLE,
+    ProfilingMiddleware,
+)
+from app.core.settings import get_settings
+
+pytestmark = pytest.mark.skipif(
+    not PYINSTRUMENT_AVAILABLE, reason="pyinstrument is not installed"
+)
+
+TOKEN = "profile-me"
+
+
+@pytest.fixture
+def profiled(tmp_path):
+    app = FastAPI()
+
+    @app.get("/v1/tasks/{task_id}")
+    async def task(task_id: str) -> dict:
+        return {"id": task_id}
+
+    @app.get("/v1/events")
+    async def events() -> StreamingResponse:
+        async def stream():
+            yield b"data: {}\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    settings = get_settings().model_copy(
+        update={
+            "profiling_token": TOKEN,
+            "profiling_sample_rate": 0.0,
+            "profiling_dir": str(tmp_path),
+        }
+    )
+    middleware = ProfilingMiddleware(app, settings)
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=middleware), base_url="http://test"
+    )
+    return client, tmp_path
+
+
+def profiles(directory) -> list[str]:
+    return [name for name in os.listdir(directory) if name.endswith(PROFILE_SUFFIX)]
+
+
+async def test_token_profiles_the_request_by_route(profiled):
+    client, directory = profiled
+
+    response = await client.get("/v1/tasks/abc", headers={"X-Gentle-Profile": TOKEN})
+
+    profile_id = response.headers["x-gentle-profile-id"]
+    [name] = profiles(directory)
+    assert name.startswith(profile_id)
+    with open(directory / name) as f:
+        metadata = json.load(f)["gentle"]
+    assert metadata["route"] == "/v1/tasks/{task_id}"
+    assert metadata["status"] == 200
+
+
+async def test_wrong_token_and_streams_are_not_profiled(profiled):
+    client, directory = profiled
+
+    wrong = await client.get("/v1/tasks/abc", headers={"X-Gentle-Profile": "guess"})
+    stream = await client.get("/v1/events", headers={"X-Gentle-Profile": TOKEN})
+
+    assert "x-gentle-profile-id" not in wrong.headers
+    assert stream.status_code == 200
+    assert "x-gentle-profile-id" not in stream.headers
+    assert profiles(directory) == []
@@ -0,0 +1,38 @@
+import uuid
+
+from app.core.redis import get_redis
+from app.db.models import User
+from app.db.replica import _local_sticky, is_sticky, stick_after_commit
+from app.db.session import AsyncSessionLocal
+
+
+async def test_commit_with_writes_marks_sticky_before_returning(db):
+    user_id = str(uuid.uuid4())
+    async with AsyncSessionLocal() as session:
+        stick_after_commit(session, user_id)
+        session.add(User(id=uuid.UUID(user_id)))
+        await session.commit()
+
+        # Already shared with other processes when commit() returns
+        assert await get_redis().exists(f"gentle:sticky:{user_id}")
+        assert await is_sticky(user_id)
+
+
+async def test_read_only_commit_does_not_mark_sticky(db):
+    user_id = str(uuid.uuid4())
+    async with AsyncSessionLocal() as session:
+        stick_after_commit(session, user_id)
+        await session.get(User, uuid.UUID(user_id))
+        await session.commit()
+
+    assert user_id not in _local_sticky
+    assert not await get_redis().exists(f"gentle:sticky:{user_id}")
+
+
+async def test_commit_without_sticky_user_marks_nothing(db):
+    user_id = uuid.uuid4()
+    async with AsyncSessionLocal() as session:
+        session.add(User(id=user_id))
+        await session.commit()
+
+    assert str(user_id) not in _local_sticky
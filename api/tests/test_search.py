@@ -0,0 +1,41 @@
+from sqlalchemy import update
+
+from app.db.models import Task
+from app.tasks.archive import _archive_stale_tasks
+from tests.test_archive import age_tasks
+from tests.test_tasks import create_task_with_steps
+
+
+async def search(client, q: str, **params) -> dict:
+    response = await client.get("/v1/search", params={"q": q, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_prefixes_match_titles_and_pages_by_cursor(client):
+    for title in ("Groceries for the week", "Grout the bathroom", "Call mum"):
+        await client.post("/v1/tasks", json={"title": title})
+
+    first = await search(client, "gro", limit=1)
+    second = await search(client, "gro", limit=1, cursor=first["next_cursor"])
+
+    titles = {hit["title"] for hit in first["items"] + second["items"]}
+    assert titles == {"Groceries for the week", "Grout the bathroom"}
+    assert second["next_cursor"] is None
+    assert (await search(client, "&|!"))["items"] == []
+
+
+async def test_archived_tasks_stay_searchable(client, session):
+    task = await create_task_with_steps(client, "Renew the passport")
+    await session.execute(update(Task).values(state="done"))
+    await session.commit()
+    await age_tasks(session, [task["id"]])
+    assert await _archive_stale_tasks() == 1
+
+    hits = (await search(client, "passp"))["items"]
+
+    assert ("task", task["id"]) in [(hit["kind"], hit["task_id"]) for hit in hits]
+    assert all(hit["archived"] and hit["task_id"] == task["id"] for hit in hits)
+    step = task["steps"][0]
+    step_hits = (await search(client, step["content"]))["items"]
+    assert step["id"] in {hit["step_id"] for hit in step_hits}
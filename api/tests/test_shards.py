@@ -0,0 +1,241 @@
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy import delete, select, text, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.redis import get_redis
+from app.db import reshard, shards
+from app.db.models import Step, Task, User
+from app.db.reshard import move_user
+from app.db.shards import (
+    MOVING_USERS_KEY,
+    HashRing,
+    ensure_not_moving,
+    mark_moving,
+    parse_shards,
+)
+from tests.conftest import API_ROOT
+from tests.test_tasks import create_task_with_steps
+
+
+def test_ring_moves_about_one_nth_of_users_when_a_shard_is_added():
+    users = [str(uuid.UUID(int=i)) for i in range(20000)]
+    before = HashRing(["a", "b", "c"])
+    after = HashRing(["a", "b", "c", "d"])
+
+    moved = [user for user in users if before.shard_for(user) != after.shard_for(user)]
+
+    # Everyone who moves goes to the new shard, and only about a quarter do
+    assert {after.shard_for(user) for user in moved} == {"d"}
+    assert 0.2 < len(moved) / len(users) < 0.3
+
+
+def test_parse_shards_rejects_bad_entries():
+    assert parse_shards("a=postgresql://x, b=postgresql://y") == {
+        "a": "postgresql://x",
+        "b": "postgresql://y",
+    }
+    for value in ("a", "a=x,a=y", " , "):
+        with pytest.raises(ValueError):
+            parse_shards(value)
+
+
+@pytest.fixture
+def sharded(monkeypatch):
+    monkeypatch.setattr(
+        shards, "SHARDS", {"a": "postgresql+asyncpg://a", "b": "postgresql+asyncpg://b"}
+    )
+
+
+async def test_moving_users_get_503(db, sharded):
+    await mark_moving(["mover"])
+
+    with pytest.raises(HTTPException) as raised:
+        await ensure_not_moving("mover")
+    assert raised.value.status_code == 503
+    await ensure_not_moving("someone-else")
+
+
+async def test_move_check_fails_closed_without_redis(sharded, monkeypatch):
+    class DownRedis:
+        async def sismember(self, *args):
+            raise RedisConnectionError("down")
+
+    monkeypatch.setattr(shards, "get_redis", lambda: DownRedis())
+
+    with pytest.raises(HTTPException) as raised:
+        await ensure_not_moving("anyone")
+    assert raised.value.status_code == 503
+
+
+@pytest.fixture(scope="session")
+def target_shard_url(migrated_database):
+    """A second, migrated database next to TEST_DATABASE_URL to move users into."""
+    source = make_url(os.environ["DATABASE_URL"])
+    target = source.set(database=f"{source.database}_move_target")
+
+    async def recreate() -> None:
+        engine = create_async_engine(source, isolation_level="AUTOCOMMIT")
+        async with engine.connect() as conn:
+            await conn.exec_driver_sql(f'DROP DATABASE IF EXISTS "{target.database}"')
+            await conn.exec_driver_sql(f'CREATE DATABASE "{target.database}"')
+        await engine.dispose()
+
+    asyncio.run(recreate())
+    url = target.render_as_string(hide_password=False)
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=API_ROOT,
+        check=True,
+        env={**os.environ, "DATABASE_URL": url},
+    )
+    return url
+
+
+async def test_move_user_copies_then_deletes(client, db, user_id, target_shard_url):
+    task = await create_task_with_steps(client)
+
+    copied = await move_user(user_id, os.environ["DATABASE_URL"], target_shard_url)
+
+    assert copied["tasks"] == 1
+    assert copied["steps"] == len(task["steps"])
+    async with db.connect() as conn:
+        assert (
+            await conn.execute(select(User.id).where(User.id == user_id))
+        ).first() is None
+    target = create_async_engine(target_shard_url)
+    try:
+        async with target.begin() as conn:
+            steps = (
+                (
+                    await conn.execute(
+                        select(Step.id).join(Task).where(Task.user_id == user_id)
+                    )
+                )
+                .scalars()
+                .all()
+            )
+            assert len(steps) == len(task["steps"])
+            await conn.execute(text("TRUNCATE users CASCADE"))
+    finally:
+        await target.dispose()
+
+
+async def test_move_user_waits_for_in_flight_writes(
+    client, db, user_id, target_shard_url
+):
+    task = await create_task_with_steps(client)
+    step_id = uuid.UUID(task["steps"][0]["id"])
+
+    target = create_async_engine(target_shard_url)
+    try:
+        async with db.connect() as writer:
+            # A request that started before the user was marked moving
+            await writer.begin()
+            await writer.execute(
+                update(Step).where(Step.id == step_id).values(state="done")
+            )
+
+            move = asyncio.create_task(
+                move_user(user_id, os.environ["DATABASE_URL"], target_shard_url)
+            )
+            await asyncio.sleep(0.3)
+            assert not move.done()
+            await writer.commit()
+            await move
+
+        async with target.begin() as conn:
+            state = (
+                await conn.execute(select(Step.state).where(Step.id == step_id))
+            ).scalar_one()
+            await conn.execute(text("TRUNCATE users CASCADE"))
+        assert state == "done"
+    finally:
+        await target.dispose()
+
+
+@pytest.fixture
+async def target_shard(target_shard_url):
+    """Engine on the move target, emptied again after the test."""
+    target = create_async_engine(target_shard_url)
+    yield target
+    async with target.begin() as conn:
+        await conn.execute(text("TRUNCATE users, sync_tombstones CASCADE"))
+    await target.dispose()
+
+
+async def test_failed_delete_undoes_the_copy(
+    client, db, user_id, target_shard, monkeypatch
+):
+    task = await create_task_with_steps(client)
+    # A users row the target already had is not the copy's to undo
+    async with target_shard.begin() as conn:
+        await conn.execute(User.__table__.insert().values(id=user_id))
+
+    def failing_delete(model):
+        if model is User:
+            raise RuntimeError("source went away")
+        return delete(model)
+
+    monkeypatch.setattr(reshard, "delete", failing_delete)
+    with pytest.raises(RuntimeError):
+        await move_user(user_id, os.environ["DATABASE_URL"], target_shard.url)
+
+    async with target_shard.connect() as conn:
+        assert (await conn.execute(select(Task.id))).first() is None
+        assert (await conn.execute(select(User.id))).scalars().all() == [user_id]
+    assert (await client.get(f"/v1/tasks/{task['id']}")).status_code == 200
+
+
+async def test_move_replans_and_locks_users_created_after_lock(
+    client, db, user_id, target_shard, target_shard_url, monkeypatch
+):
+    await create_task_with_steps(client)
+    # Deployed ring: only the target; the user was never locked
+    monkeypatch.setattr(reshard, "SHARDS", {"b": target_shard_url})
+    locked = []
+    move = reshard.move_user
+
+    async def recording_move(moved_user_id, source_url, target_url):
+        moving = await get_redis().sismember(MOVING_USERS_KEY, str(moved_user_id))
+        locked.append(moving)
+        return await move(moved_user_id, source_url, target_url)
+
+    monkeypatch.setattr(reshard, "move_user", recording_move)
+    args = argparse.Namespace(
+        command="move", previous=f"a={os.environ['DATABASE_URL']}"
+    )
+    await reshard.main(args)
+
+    assert locked == [True]
+    assert not await get_redis().sismember(MOVING_USERS_KEY, str(user_id))
+    async with target_shard.connect() as conn:
+        assert (await conn.execute(select(Task.id))).first() is not None
+
+
+async def test_failed_move_keeps_the_user_locked(
+    client, db, user_id, target_shard_url, monkeypatch
+):
+    await create_task_with_steps(client)
+    monkeypatch.setattr(reshard, "SHARDS", {"b": target_shard_url})
+
+    async def failing_move(*args):
+        raise RuntimeError("target went away")
+
+    monkeypatch.setattr(reshard, "move_user", failing_move)
+    args = argparse.Namespace(
+        command="move", previous=f"a={os.environ['DATABASE_URL']}"
+    )
+    with pytest.raises(SystemExit):
+        await reshard.main(args)
+
+    assert await get_redis().sismember(MOVING_USERS_KEY, str(user_id))
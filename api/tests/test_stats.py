@@ -0,0 +1,75 @@
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import update
+
+from app.db.models import UserStats
+from app.services.stats import stats_response
+from tests.test_tasks import create_task_with_steps
+
+
+async def test_stats_are_zero_before_any_completion(client):
+    response = await client.get("/v1/stats")
+
+    assert response.status_code == 200
+    assert response.json()["completions_total"] == 0
+    assert response.json()["current_streak"] == 0
+
+
+async def test_completing_counts_once_and_starts_a_streak(client):
+    task = await create_task_with_steps(client)
+    step_id = task["steps"][0]["id"]
+
+    first = await client.post(f"/v1/steps/{step_id}/complete")
+    again = await client.post(f"/v1/steps/{step_id}/complete")
+
+    assert first.json()["stats"]["completions_total"] == 1
+    assert again.json()["stats"]["completions_total"] == 1
+    stats = (await client.get("/v1/stats")).json()
+    assert stats["completions_today"] == 1
+    assert stats["current_streak"] == 1
+    assert stats["longest_streak"] == 1
+
+
+async def test_completing_the_day_after_extends_the_streak(client, session, user_id):
+    task = await create_task_with_steps(client)
+    await client.post(f"/v1/steps/{task['steps'][0]['id']}/complete")
+    yesterday = datetime.now(timezone.utc).date() - timedelta(days=1)
+    await session.execute(
+        update(UserStats)
+        .where(UserStats.user_id == user_id)
+        .values(last_completion_day=yesterday)
+    )
+    await session.commit()
+
+    response = await client.post(
+        f"/v1/steps/{task['steps'][1]['id']}/complete", headers={"X-Timezone": "UTC"}
+    )
+
+    stats = response.json()["stats"]
+    assert stats["current_streak"] == 2
+    assert stats["longest_streak"] == 2
+    assert stats["completions_today"] == 1
+    assert "2-day streak" in response.json()["message"]
+
+
+def test_response_decays_stale_counters():
+    tz = ZoneInfo("UTC")
+    stale = UserStats(
+        completions_total=9,
+        completions_today=3,
+        completions_week=5,
+        last_completion_day=date(2020, 1, 6),
+        week_start=date(2020, 1, 6),
+        current_streak=4,
+        longest_streak=6,
+        last_completion_at=None,
+    )
+
+    response = stats_response(stale, tz)
+
+    assert response.completions_today == 0
+    assert response.completions_this_week == 0
+    assert response.current_streak == 0
+    assert response.completions_total == 9
+    assert response.longest_streak == 6
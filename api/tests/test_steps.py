@@ -0,0 +1,248 @@
+import uuid
+
+from tests.test_tasks import create_task_with_steps
+
+
+async def step_orders(client, task_id: str) -> list[tuple[str, int]]:
+    detail = (await client.get(f"/v1/tasks/{task_id}")).json()
+    return [(step["id"], step["order"]) for step in detail["steps"]]
+
+
+async def test_batch_completes_steps_and_task(client):
+    task = await create_task_with_steps(client)
+    step_ids = [step["id"] for step in task["steps"]]
+
+    response = await client.post(
+        "/v1/steps/batch",
+        json={
+            "operations": [
+                {"op": "complete", "step_id": step_id} for step_id in step_ids
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["completed"] == len(step_ids)
+    assert body["completed_task_ids"] == [task["id"]]
+    assert body["stats"]["completions_total"] == len(step_ids)
+
+    # Replaying the same batch changes nothing
+    replay = await client.post(
+        "/v1/steps/batch",
+        json={
+            "operations": [
+                {"op": "complete", "step_id": step_id} for step_id in step_ids
+            ]
+        },
+    )
+    assert replay.json()["completed"] == 0
+    assert replay.json()["completed_task_ids"] == []
+
+
+async def test_batch_reopen_reactivates_done_task(client):
+    task = await create_task_with_steps(client)
+    first = task["steps"][0]["id"]
+    await client.post(
+        "/v1/steps/batch",
+        json={
+            "operations": [
+                {"op": "complete", "step_id": step["id"]} for step in task["steps"]
+            ]
+        },
+    )
+
+    await client.post(
+        "/v1/steps/batch", json={"operations": [{"op": "reopen", "step_id": first}]}
+    )
+
+    detail = (await client.get(f"/v1/tasks/{task['id']}")).json()
+    assert detail["state"] == "active"
+    assert detail["steps"][0]["state"] == "pending"
+
+
+async def test_completed_at_is_stamped_once_and_cleared_on_reopen(client, session):
+    from sqlalchemy import select
+
+    from app.db.models import Task
+
+    task = await create_task_with_steps(client)
+    *rest, last = task["steps"]
+
+    async def completed_at():
+        query = select(Task.completed_at).where(Task.id == uuid.UUID(task["id"]))
+        return await session.scalar(query)
+
+    for step in rest:
+        await client.post(f"/v1/steps/{step['id']}/complete")
+    assert await completed_at() is None
+
+    await client.post(f"/v1/steps/{last['id']}/complete")
+    finished = await completed_at()
+    assert finished is not None
+    # Completing a step of a done task again doesn't move it
+    await client.post(f"/v1/steps/{last['id']}/complete")
+    assert await completed_at() == finished
+
+    reopen = {"operations": [{"op": "reopen", "step_id": last["id"]}]}
+    await client.post("/v1/steps/batch", json=reopen)
+    assert await completed_at() is None
+
+
+async def test_reorder_moves_step_and_renumbers(client):
+    task = await create_task_with_steps(client)
+    ids = [step["id"] for step in task["steps"]]
+    assert len(ids) >= 3
+
+    # Moving the last step up to the front shifts the others down
+    await client.post(
+        "/v1/steps/batch",
+        json={"operations": [{"op": "reorder", "step_id": ids[-1], "order": 1}]},
+    )
+    assert await step_orders(client, task["id"]) == [
+        (step_id, position) for position, step_id in enumerate([ids[-1], *ids[:-1]], 1)
+    ]
+
+    # Moving the (new) first step down to 2 swaps it with its neighbour
+    await client.post(
+        "/v1/steps/batch",
+        json={"operations": [{"op": "reorder", "step_id": ids[-1], "order": 2}]},
+    )
+    assert await step_orders(client, task["id"]) == [
+        (step_id, position)
+        for position, step_id in enumerate([ids[0], ids[-1], *ids[1:-1]], 1)
+    ]
+
+
+async def test_reorder_past_the_end_goes_last_without_gaps(client):
+    task = await create_task_with_steps(client)
+    ids = [step["id"] for step in task["steps"]]
+
+    await client.post(
+        "/v1/steps/batch",
+        json={"operations": [{"op": "reorder", "step_id": ids[0], "order": 99}]},
+    )
+
+    assert await step_orders(client, task["id"]) == [
+        (step_id, position) for position, step_id in enumerate([*ids[1:], ids[0]], 1)
+    ]
+
+
+async def test_batch_with_unknown_step_is_404_and_changes_nothing(client):
+    task = await create_task_with_steps(client)
+
+    response = await client.post(
+        "/v1/steps/batch",
+        json={
+            "operations": [
+                {"op": "complete", "step_id": task["steps"][0]["id"]},
+                {"op": "complete", "step_id": str(uuid.uuid4())},
+            ]
+        },
+    )
+
+    assert response.status_code == 404
+    detail = (await client.get(f"/v1/tasks/{task['id']}")).json()
+    assert all(step["state"] == "pending" for step in detail["steps"])
+
+
+async def test_complete_step_counts_once(client):
+    task = await create_task_with_steps(client)
+    step_id = task["steps"][0]["id"]
+
+    first = await client.post(f"/v1/steps/{step_id}/complete")
+    again = await client.post(f"/v1/steps/{step_id}/complete")
+
+    assert first.status_code == 200
+    assert first.json()["stats"]["completions_total"] == 1
+    assert again.json()["stats"]["completions_total"] == 1
+
+
+async def test_too_big_appends_smaller_steps(client):
+    task = await create_task_with_steps(client)
+    count = len(task["steps"])
+
+    response = await client.post(f"/v1/steps/{task['steps'][0]['id']}/too-big")
+
+    assert response.status_code == 200
+    assert [step["order"] for step in response.json()] == list(
+        range(count + 1, count + 1 + len(response.json()))
+    )
+
+
+async def test_next_step_follows_completion(client):
+    task = await create_task_with_steps(client)
+    first, second = task["steps"][0], task["steps"][1]
+
+    response = await client.get("/v1/steps/next")
+    assert response.json()["step"]["id"] == first["id"]
+    assert response.json()["remaining"] == len(task["steps"])
+    etag = response.headers["etag"]
+    assert (
+        await client.get("/v1/steps/next", headers={"If-None-Match": etag})
+    ).status_code == 304
+
+    await client.post(f"/v1/steps/{first['id']}/complete")
+
+    response = await client.get(f"/v1/tasks/{task['id']}/next-step")
+    assert response.json()["step"]["id"] == second["id"]
+    assert response.json()["remaining"] == len(task["steps"]) - 1
+
+
+async def test_next_step_with_nothing_pending(client):
+    response = await client.get("/v1/steps/next")
+
+    assert response.status_code == 200
+    assert response.json()["step"] is None
+    etag = response.headers["etag"]
+    assert (
+        await client.get("/v1/steps/next", headers={"If-None-Match": etag})
+    ).status_code == 304
+
+
+async def test_next_step_prefers_active_tasks(client):
+    started = await create_task_with_steps(client, "Started")
+    await create_task_with_steps(client, "Newer but untouched")
+    # Completing one step makes the task active
+    await client.post(
+        "/v1/steps/batch",
+        json={"operations": [{"op": "complete", "step_id": started["steps"][0]["id"]}]},
+    )
+
+    response = await client.get("/v1/steps/next")
+
+    assert response.json()["task_id"] == started["id"]
+    assert response.json()["step"]["id"] == started["steps"][1]["id"]
+
+
+async def test_task_next_step_of_finished_and_unknown_tasks(client):
+    task = await create_task_with_steps(client)
+    await client.post(
+        "/v1/steps/batch",
+        json={
+            "operations": [
+                {"op": "complete", "step_id": step["id"]} for step in task["steps"]
+            ]
+        },
+    )
+
+    finished = await client.get(f"/v1/tasks/{task['id']}/next-step")
+    assert finished.status_code == 200
+    assert finished.json()["step"] is None
+    assert finished.json()["remaining"] == 0
+    assert (await client.get(f"/v1/tasks/{uuid.uuid4()}/next-step")).status_code == 404
+
+
+async def test_next_step_uses_the_pending_steps_index(db, user_id):
+    from sqlalchemy.dialects import postgresql
+
+    from app.services.steps import next_step_statement
+
+    compiled = next_step_statement(user_id).compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    async with db.connect() as conn:
+        await conn.exec_driver_sql("SET enable_seqscan = off")
+        plan = "\n".join((await conn.exec_driver_sql(f"EXPLAIN {compiled}")).scalars())
+
+    assert "ix_steps_pending_task_order" in plan
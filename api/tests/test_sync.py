@@ -0,0 +1,104 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, select
+
+from app.db.models import Mood, Step
+from tests.test_tasks import create_task_with_steps
+
+
+async def test_delta_sync_returns_only_changes_and_tombstones(client):
+    task = await create_task_with_steps(client)
+    snapshot = (await client.get("/v1/sync")).json()
+    assert snapshot["reset"] is True
+    assert [row["id"] for row in snapshot["tasks"]] == [task["id"]]
+    assert len(snapshot["steps"]) == len(task["steps"])
+
+    await client.post(f"/v1/steps/{task['steps'][0]['id']}/complete")
+    other = (await client.post("/v1/tasks", json={"title": "Another"})).json()
+
+    delta = (await client.get("/v1/sync", params={"since": snapshot["cursor"]})).json()
+    assert delta["reset"] is False
+    assert {row["id"] for row in delta["tasks"]} == {task["id"], other["id"]}
+    assert [row["id"] for row in delta["steps"]] == [task["steps"][0]["id"]]
+    assert delta["deleted"] == []
+
+    # Nothing changed since the latest cursor
+    quiet = (await client.get("/v1/sync", params={"since": delta["cursor"]})).json()
+    assert quiet["tasks"] == [] and quiet["steps"] == [] and quiet["moods"] == []
+
+
+async def test_deleted_steps_come_back_as_tombstones(client, session):
+    task = await create_task_with_steps(client)
+    cursor = (await client.get("/v1/sync")).json()["cursor"]
+
+    # No endpoint deletes steps, so delete one directly
+    await session.execute(
+        delete(Step).where(Step.id == uuid.UUID(task["steps"][0]["id"]))
+    )
+    await session.commit()
+
+    delta = (await client.get("/v1/sync", params={"since": cursor})).json()
+    assert {"entity": "step", "id": task["steps"][0]["id"]} in delta["deleted"]
+
+
+async def test_invalid_cursor_is_400(client):
+    assert (await client.get("/v1/sync", params={"since": "nope"})).status_code == 400
+
+
+async def test_push_is_idempotent(client):
+    task_id = str(uuid.uuid4())
+    mood_id = str(uuid.uuid4())
+    payload = {
+        "tasks": [{"id": task_id, "title": "Call the bank"}],
+        "moods": [
+            {
+                "id": mood_id,
+                "energy": 2,
+                "emotion": "tired",
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }
+        ],
+    }
+
+    first = (await client.post("/v1/sync/push", json=payload)).json()
+    again = (await client.post("/v1/sync/push", json=payload)).json()
+
+    assert (first["tasks_created"], first["moods_recorded"]) == (1, 1)
+    assert (again["tasks_created"], again["moods_recorded"]) == (0, 0)
+
+
+async def test_push_rejects_moods_outside_partition_range(client, session):
+    now = datetime.now(timezone.utc)
+    moods = {
+        "ok": now - timedelta(days=3),
+        "future": now + timedelta(days=400),
+        "ancient": now - timedelta(days=365 * 10),
+    }
+    ids = {name: str(uuid.uuid4()) for name in moods}
+
+    response = await client.post(
+        "/v1/sync/push",
+        json={
+            "moods": [
+                {
+                    "id": ids[name],
+                    "energy": 1,
+                    "emotion": "calm",
+                    "created_at": created_at.isoformat(),
+                }
+                for name, created_at in moods.items()
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["moods_recorded"] == 1
+    assert sorted(body["rejected_mood_ids"]) == sorted([ids["future"], ids["ancient"]])
+    default_rows = await session.scalar(
+        select(func.count())
+        .select_from(Mood)
+        .where(Mood.id.in_([uuid.UUID(ids["future"]), uuid.UUID(ids["ancient"])]))
+    )
+    assert default_rows == 0
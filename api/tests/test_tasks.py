@@ -0,0 +1,80 @@
+import uuid
+
+
+async def create_task_with_steps(client, title: str = "Water the plants") -> dict:
+    task = (await client.post("/v1/tasks", json={"title": title})).json()
+    # No OPENAI_API_KEY in tests, so breakdown uses the fallback steps
+    steps = (await client.post(f"/v1/tasks/{task['id']}/breakdown")).json()
+    return {**task, "steps": steps}
+
+
+async def test_list_serializes_database_rows(client):
+    task = await create_task_with_steps(client)
+
+    response = await client.get("/v1/tasks")
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "id": task["id"],
+            "title": "Water the plants",
+            "state": "pending",
+            "created_at": response.json()[0]["created_at"],
+            "updated_at": response.json()[0]["updated_at"],
+        }
+    ]
+
+
+async def test_detail_returns_steps_in_order(client):
+    task = await create_task_with_steps(client)
+
+    response = await client.get(f"/v1/tasks/{task['id']}")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["id"] == task["id"]
+    assert [step["id"] for step in body["steps"]] == [
+        step["id"] for step in task["steps"]
+    ]
+    assert [step["order"] for step in body["steps"]] == list(
+        range(1, len(task["steps"]) + 1)
+    )
+
+
+async def test_detail_of_someone_elses_task_is_404(client):
+    response = await client.get(f"/v1/tasks/{uuid.uuid4()}")
+    assert response.status_code == 404
+
+
+async def test_list_revalidates_with_etag(client):
+    await client.post("/v1/tasks", json={"title": "First"})
+    first = await client.get("/v1/tasks")
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    unchanged = await client.get("/v1/tasks", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+    assert unchanged.headers["etag"] == etag
+
+    await client.post("/v1/tasks", json={"title": "Second"})
+    changed = await client.get("/v1/tasks", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+async def test_detail_etag_changes_when_steps_change(client):
+    task = await create_task_with_steps(client)
+    etag = (await client.get(f"/v1/tasks/{task['id']}")).headers["etag"]
+
+    weak = await client.get(
+        f"/v1/tasks/{task['id']}", headers={"If-None-Match": f'"other", W/{etag}'}
+    )
+    assert weak.status_code == 304
+
+    await client.post(f"/v1/steps/{task['steps'][0]['id']}/complete")
+    changed = await client.get(
+        f"/v1/tasks/{task['id']}", headers={"If-None-Match": etag}
+    )
+    assert changed.status_code == 200
+    assert changed.json()["steps"][0]["state"] == "done"
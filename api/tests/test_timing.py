@@ -0,0 +1,62 @@
+import logging
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+
+from app.core import timing
+from app.core.timing import _log_slow_statement
+
+
+async def test_failed_statements_leave_no_start_time_behind(db):
+    async with db.connect() as conn:
+        with pytest.raises(ProgrammingError):
+            await conn.execute(text("SELECT no_such_column FROM users"))
+        await conn.rollback()
+        await conn.execute(text("SELECT 1"))
+
+        info = (await conn.get_raw_connection()).info
+        assert info["query_started"] == []
+
+
+async def test_failed_explain_keeps_the_transaction_usable(db, caplog, monkeypatch):
+    monkeypatch.setattr(timing.settings, "slow_query_explain", True)
+
+    async with db.begin() as conn:
+        await conn.execute(text("SELECT 1"))
+        with caplog.at_level(logging.WARNING, logger="app.core.timing"):
+            await conn.run_sync(
+                lambda sync_conn: _log_slow_statement(
+                    sync_conn, "SELECT no_such_column FROM users", (), False, 1.0
+                )
+            )
+
+        assert "EXPLAIN failed" in caplog.text
+        assert (await conn.execute(text("SELECT 1"))).scalar_one() == 1
+
+
+async def test_slow_statements_are_logged_with_their_plan(db, caplog, monkeypatch):
+    monkeypatch.setattr(timing.settings, "slow_query_explain", True)
+    monkeypatch.setattr(timing.settings, "slow_query_ms", 0.001)
+
+    async with db.begin() as conn:
+        with caplog.at_level(logging.WARNING, logger="app.core.timing"):
+            await conn.execute(text("SELECT count(*) FROM tasks"))
+        await conn.execute(text("SELECT 1"))
+
+    assert "Slow query" in caplog.text
+    assert "Aggregate" in caplog.text
+
+
+async def test_requests_report_server_timing_within_budget(client, monkeypatch):
+    reported = []
+    monkeypatch.setattr(
+        timing, "budget_listeners", [lambda *args: reported.append(args)]
+    )
+    monkeypatch.setattr(timing.settings, "slow_query_ms", 0)
+
+    response = await client.get("/v1/tasks")
+
+    assert response.status_code == 200
+    assert "db;dur=" in response.headers["server-timing"]
+    assert reported == []
@@ -0,0 +1,60 @@
+import uuid
+
+from sqlalchemy import func, select
+
+from app.db.models import User
+from app.db.session import AsyncSessionLocal
+from app.services.users import ensure_user, known_user_key, known_users
+
+
+def known_users_of(session) -> set:
+    return {user_id for shard, user_id in known_users if shard == session.info["shard"]}
+
+
+async def test_ensure_user_inserts_once_and_caches_after_commit(session):
+    user_id = uuid.uuid4()
+
+    await ensure_user(session, user_id)
+    # Not trusted until the insert commits
+    assert user_id not in known_users_of(session)
+    await session.commit()
+    assert user_id in known_users_of(session)
+
+    await ensure_user(session, str(user_id))
+    count = await session.scalar(
+        select(func.count()).select_from(User).where(User.id == user_id)
+    )
+    assert count == 1
+
+
+async def test_ensure_user_forgets_rolled_back_insert(session):
+    user_id = uuid.uuid4()
+
+    await ensure_user(session, user_id)
+    await session.rollback()
+
+    assert user_id not in known_users_of(session)
+    assert await session.get(User, user_id) is None
+
+
+async def test_ensure_user_caches_existing_row(session):
+    user_id = uuid.uuid4()
+    session.add(User(id=user_id))
+    await session.commit()
+
+    await ensure_user(session, user_id)
+    assert user_id in known_users_of(session)
+
+
+async def test_known_users_are_per_shard(session):
+    user_id = uuid.uuid4()
+    session.add(User(id=user_id))
+    await session.commit()
+    await ensure_user(session, user_id)
+
+    # The same id on another shard (after a move) is not known there yet
+    async with AsyncSessionLocal(info={"shard": "other"}) as other:
+        assert known_user_key(other, user_id) not in known_users
+        await ensure_user(other, user_id)
+        assert known_user_key(other, user_id) in known_users
+    assert known_user_key(session, user_id) in known_users